@@ -13,6 +13,7 @@ AGENTS = {
         "emoji": "🌟",
         "spec": "NOVA_SPEC.md",
         "mentions": ["nova", "Nova", "@nova"],
+        "keywords": ["requirements", "goals", "scope", "priorities", "timeline", "milestones"],  # Doc excerpt ranking
     },
     "pixel": {
         "name": "Pixel",
@@ -20,6 +21,8 @@ AGENTS = {
         "emoji": "🎨",
         "spec": "PIXEL_SPEC.md",
         "mentions": ["pixel", "Pixel", "@pixel"],
+        "labels": ["design"],  # GitHub issue labels this agent owns
+        "keywords": ["ux", "ui", "mockups", "wireframes", "colors", "typography", "styles", "accessibility"],
     },
     "bolt": {
         "name": "Bolt",
@@ -27,6 +30,8 @@ AGENTS = {
         "emoji": "⚡",
         "spec": "BOLT_SPEC.md",
         "mentions": ["bolt", "Bolt", "@bolt"],
+        "labels": ["development"],
+        "keywords": ["frontend", "backend", "api", "endpoint", "implementation", "deploy", "component"],
     },
     "scout": {
         "name": "Scout",
@@ -34,6 +39,8 @@ AGENTS = {
         "emoji": "🔍",
         "spec": "SCOUT_SPEC.md",
         "mentions": ["scout", "Scout", "@scout"],
+        "labels": ["qa"],
+        "keywords": ["testing", "tests", "bugs", "acceptance", "criteria", "regression", "validation"],
     },
 }
 
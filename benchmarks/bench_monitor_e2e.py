@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Monitor End-to-End Latency Benchmark
+
+Runs the real monitor.py against the local fake Slack server (fake_slack.py)
+with the stub Claude CLI (stub_claude.py) standing in for the model, injects
+@mentions at fixed rates and measures how long each one takes to be answered.
+
+For every rate it reports:
+    - mention -> reply latency (p50/p95/p99/max), from the mention's Slack ts
+      to the ts of the reply recorded in the outbox log
+    - missed mentions (never answered) and duplicated replies
+    - Slack API calls per mention, and how many were rate limited
+    - Claude runs (batches) used
+
+Mentions are a mix of channel messages and thread replies under recent
+channel messages (--thread-ratio). Each rate runs against a fresh workspace,
+monitor state directory and HOME, so results are independent.
+
+Usage:
+    python benchmarks/bench_monitor_e2e.py                          # 1, 10 and 100 mentions/min
+    python benchmarks/bench_monitor_e2e.py --rates 30 --duration 120 --interval 5
+    python benchmarks/bench_monitor_e2e.py --claude-startup 8 --out e2e.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).parent
+REPO_ROOT = BENCH_DIR.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from bench_slack import git_commit  # noqa: E402
+from fake_slack import DEFAULT_CHANNEL_ID, FakeSlackServer, FakeWorkspace, FaultConfig, write_agent_settings  # noqa: E402
+
+STUB_CLAUDE = BENCH_DIR / "stub_claude.py"
+DEFAULT_RATES = "1,10,100"  # Mentions per minute
+DEFAULT_DURATION = 180  # Seconds of injection per rate
+DEFAULT_DRAIN = 120  # Max seconds to wait for replies after the last mention
+DEFAULT_THREAD_RATIO = 0.3  # Share of mentions posted as thread replies
+DEFAULT_INTERVAL = 10  # Monitor poll interval (seconds)
+STARTUP_TIMEOUT = 60  # Seconds to wait for the monitor's first poll
+RECENT_PARENTS = 5  # Thread replies go under one of the newest channel messages
+
+
+def _percentile(values: list, pct: float):
+    """Nearest-rank percentile of values (None if empty)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))  # ceil
+    return round(ordered[int(rank) - 1], 3)
+
+
+def _read_jsonl(path: Path) -> list:
+    records = []
+    try:
+        with open(path) as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+    except FileNotFoundError:
+        pass
+    return records
+
+
+def _request_id(agent: str, msg: dict) -> str:
+    """The request ID the monitor assigns to a mention (see collect_channel_mentions/collect_thread_replies)."""
+    if not msg.get("thread_ts"):
+        return f"{agent}:{msg['ts']}"
+    # Thread replies are keyed by the local, second-resolution time shown by `slack_interface.py replies`
+    local_time = datetime.fromtimestamp(float(msg["ts"])).strftime('%Y-%m-%d %H:%M:%S')
+    return f"{agent}:{msg['thread_ts']}:{local_time}"
+
+
+def _wait_for(predicate, timeout: float, poll: float = 0.5) -> bool:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(poll)
+    return predicate()
+
+
+def run_rate(rate: float, args, agent: str = "nova") -> dict:
+    """
+    Inject mentions at `rate` per minute into a fresh workspace and measure replies.
+
+    Args:
+        rate: Mentions per minute
+        args: Parsed command-line options
+        agent: Agent the monitor runs as and the mentions address
+
+    Returns:
+        Result dict for this rate
+    """
+    rng = random.Random(args.seed)
+    workspace = FakeWorkspace(users=5, seed=args.seed)
+    server = FakeSlackServer(workspace, FaultConfig(latency=args.latency, seed=args.seed)).start()
+    humans = [u["id"] for u in workspace.users]
+
+    with tempfile.TemporaryDirectory(prefix="bench_e2e_") as tmp:
+        tmp = Path(tmp)
+        write_agent_settings(tmp / ".agent_settings.json", agent)
+        outbox = tmp / "outbox.jsonl"
+        runs_log = tmp / "claude_runs.jsonl"
+        log_path = Path(args.logs) / f"monitor_{rate:g}pm.log" if args.logs else tmp / "monitor.log"
+        env = {
+            **os.environ,
+            "HOME": str(tmp),
+            "SLACK_API_BASE_URL": server.api_url,
+            "SLACK_OUTBOX_FILE": str(outbox),
+            "MONITOR_STATE_DIR": str(tmp),
+            "CLAUDE_BIN": str(STUB_CLAUDE),
+            "CLAUDE_SETTINGS": "",
+            "CLAUDE_RUNS_LOG": str(runs_log),
+            "STUB_CLAUDE_STARTUP": str(args.claude_startup),
+            "STUB_CLAUDE_PER_MESSAGE": str(args.claude_per_message),
+            "PYTHONUNBUFFERED": "1",
+        }
+        max_runtime_min = (args.duration + args.drain + STARTUP_TIMEOUT) / 60 + 1
+        cmd = [sys.executable, "monitor.py", "-a", agent, "--interval", str(args.interval),
+               "--metrics-port", "0", "--max-runtime", f"{max_runtime_min:.1f}"]
+
+        with open(log_path, "w") as log:
+            proc = subprocess.Popen(cmd, cwd=str(REPO_ROOT), env=env, stdout=log, stderr=subprocess.STDOUT,
+                                    start_new_session=True)
+            try:
+                if not _wait_for(lambda: server.stats()["calls"].get("conversations.history"), STARTUP_TIMEOUT):
+                    raise RuntimeError(f"monitor did not poll within {STARTUP_TIMEOUT}s (see {log_path})")
+
+                # Inject mentions at a steady rate
+                injected = []
+                parents = []
+                count = max(1, round(rate * args.duration / 60))
+                started = time.time()
+                for n in range(count):
+                    delay = started + n * 60 / rate - time.time()
+                    if delay > 0:
+                        time.sleep(delay)
+                    user = rng.choice(humans)
+                    if parents and rng.random() < args.thread_ratio:
+                        parent = rng.choice(parents[-RECENT_PARENTS:])
+                        msg = workspace.add_message(DEFAULT_CHANNEL_ID, user,
+                                                    f"@{agent} follow-up #{n + 1}: any update here?", thread_ts=parent)
+                    else:
+                        msg = workspace.add_message(DEFAULT_CHANNEL_ID, user,
+                                                    f"@{agent} request #{n + 1}: can you take a look?")
+                        parents.append(msg["ts"])
+                    injected.append({"ts": msg["ts"], "thread_ts": msg.get("thread_ts"),
+                                     "request_id": _request_id(agent, msg)})
+                injection_seconds = time.time() - started
+
+                expected = {m["request_id"] for m in injected}
+                _wait_for(lambda: expected <= {r.get("request_id") for r in _read_jsonl(outbox)}, args.drain, poll=1)
+            finally:
+                try:
+                    os.killpg(proc.pid, signal.SIGINT)
+                    proc.wait(timeout=30)
+                except (ProcessLookupError, subprocess.TimeoutExpired):
+                    os.killpg(proc.pid, signal.SIGKILL)
+                    proc.wait()
+                server.stop()
+
+        # Match replies to mentions by request ID
+        replies = {}
+        for record in _read_jsonl(outbox):
+            replies.setdefault(record.get("request_id"), []).append(record)
+        latencies = {"mention": [], "thread_reply": []}
+        missed = []
+        duplicates = 0
+        seen_ids = set()
+        for mention in injected:
+            request_id = mention["request_id"]
+            if request_id in seen_ids:
+                continue  # Two thread replies in the same second share an ID
+            seen_ids.add(request_id)
+            records = replies.get(request_id)
+            if not records:
+                missed.append(request_id)
+                continue
+            duplicates += len(records) - 1
+            kind = "thread_reply" if mention["thread_ts"] else "mention"
+            first = min(float(r["ts"]) for r in records)
+            latencies[kind].append(first - float(mention["ts"]))
+
+        every = latencies["mention"] + latencies["thread_reply"]
+        stats = server.stats()
+        runs = _read_jsonl(runs_log)
+        return {
+            "rate_per_min": rate,
+            "mentions": len(injected),
+            "channel_mentions": sum(1 for m in injected if not m["thread_ts"]),
+            "thread_mentions": sum(1 for m in injected if m["thread_ts"]),
+            "request_id_collisions": len(injected) - len(seen_ids),
+            "injection_s": round(injection_seconds, 1),
+            "answered": len(every),
+            "missed": len(missed),
+            "missed_ids": missed[:20],
+            "duplicated_replies": duplicates,
+            "unmatched_replies": sum(len(r) for rid, r in replies.items() if rid not in seen_ids),
+            "latency_s": {
+                kind: {
+                    "count": len(values),
+                    "p50": _percentile(values, 50),
+                    "p95": _percentile(values, 95),
+                    "p99": _percentile(values, 99),
+                    "max": round(max(values), 3) if values else None,
+                }
+                for kind, values in (("all", every), *latencies.items())
+            },
+            "slack_calls": {
+                "total": stats["total_calls"],
+                "per_mention": round(stats["total_calls"] / len(injected), 2) if injected else None,
+                "by_method": stats["calls"],
+                "rate_limited": stats["rate_limited"],
+            },
+            "claude_runs": len(runs),
+            "claude_runs_failed": sum(1 for r in runs if not r.get("ok")),
+            "monitor_exit_code": proc.returncode,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end mention -> reply latency of monitor.py against a fake Slack")
+    parser.add_argument("--rates", default=DEFAULT_RATES, help=f"Comma-separated mentions per minute (default: {DEFAULT_RATES})")
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION,
+                        help=f"Seconds of mention injection per rate (default: {DEFAULT_DURATION})")
+    parser.add_argument("--drain", type=float, default=DEFAULT_DRAIN,
+                        help=f"Max seconds to wait for outstanding replies (default: {DEFAULT_DRAIN})")
+    parser.add_argument("--thread-ratio", type=float, default=DEFAULT_THREAD_RATIO,
+                        help=f"Share of mentions posted as thread replies (default: {DEFAULT_THREAD_RATIO})")
+    parser.add_argument("--interval", type=int, default=DEFAULT_INTERVAL,
+                        help=f"Monitor poll interval in seconds (default: {DEFAULT_INTERVAL})")
+    parser.add_argument("--claude-startup", type=float, default=2.0, help="Stub Claude seconds before its first reply")
+    parser.add_argument("--claude-per-message", type=float, default=1.0, help="Stub Claude seconds per reply")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds of simulated latency per Slack API call")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for users and thread placement")
+    parser.add_argument("--logs", help="Directory to keep each run's monitor log in")
+    parser.add_argument("--out", "-o", help="Write the JSON results to this file as well as stdout")
+    args = parser.parse_args()
+
+    try:
+        rates = [float(r) for r in args.rates.split(",") if r.strip()]
+    except ValueError:
+        parser.error("--rates must be comma-separated numbers")
+    if not rates or min(rates) <= 0:
+        parser.error("--rates must be positive")
+    if args.logs:
+        Path(args.logs).mkdir(parents=True, exist_ok=True)
+
+    report = {
+        "commit": git_commit(),
+        "time": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "duration_s": args.duration,
+            "thread_ratio": args.thread_ratio,
+            "interval_s": args.interval,
+            "claude_startup_s": args.claude_startup,
+            "claude_per_message_s": args.claude_per_message,
+            "latency_s": args.latency,
+        },
+        "results": [],
+    }
+    for rate in rates:
+        print(f"⏱️  {rate:g} mentions/min for {args.duration:.0f}s...", file=sys.stderr, flush=True)
+        started = time.perf_counter()
+        result = run_rate(rate, args)
+        report["results"].append(result)
+        p95 = result["latency_s"]["all"]["p95"]
+        print(f"   {result['answered']}/{result['mentions']} answered, p95 {p95}s, "
+              f"{result['missed']} missed, {result['duplicated_replies']} duplicated "
+              f"({time.perf_counter() - started:.0f}s)", file=sys.stderr, flush=True)
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.out:
+        Path(args.out).write_text(output + "\n")
+        print(f"💾 Results written to {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Slack Client Benchmarks
+
+Measures the slack_interface.py hot paths against the local fake Slack
+server (fake_slack.py) and prints the results as JSON, so runs can be
+compared across commits.
+
+Benchmarks:
+    api_calls    Calls/sec through SlackClient._api_call, with and without
+                 connection reuse
+    pagination   list_channels / list_users over 10k entries
+    history      get_channel_history at 1000 messages (HTTP + JSON decode)
+    upload       upload_file_v2 throughput and peak RSS per file size
+    cli          Cold-start time of CLI subcommands
+
+Usage:
+    python benchmarks/bench_slack.py                       # Everything, JSON to stdout
+    python benchmarks/bench_slack.py --only api_calls,cli  # A subset
+    python benchmarks/bench_slack.py --upload-sizes 1,10,100,500 --out results.json
+    python benchmarks/bench_slack.py --latency 0.005       # Simulate network latency
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).parent
+REPO_ROOT = BENCH_DIR.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from fake_slack import (  # noqa: E402
+    DEFAULT_CHANNEL_ID, FAKE_TOKEN, FakeSlackServer, FakeWorkspace, FaultConfig, write_agent_settings,
+)
+
+BENCHMARKS = ("api_calls", "pagination", "history", "upload", "cli")
+DEFAULT_API_CALLS = 500
+DEFAULT_PAGINATION_ENTRIES = 10_000
+DEFAULT_HISTORY_MESSAGES = 1000
+DEFAULT_UPLOAD_SIZES_MB = "1,10,100"
+DEFAULT_CLI_RUNS = 5
+CLI_COMMANDS = (["--help"], ["agents"], ["config"], ["read", "-l", "20"])
+
+
+def _client(server: FakeSlackServer, http=None):
+    """SlackClient aimed at the fake server."""
+    import slack_interface
+    client = slack_interface.SlackClient(slack_interface.SlackTokens(bot_token=FAKE_TOKEN), http=http)
+    client.BASE_URL = server.api_url
+    return client
+
+
+def _timed(fn, repeat: int = 3) -> dict:
+    """Run fn repeat times; report best and median wall time."""
+    times = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return {"best_s": round(min(times), 4), "median_s": round(statistics.median(times), 4), "result": result}
+
+
+def bench_api_calls(faults: FaultConfig, calls: int = DEFAULT_API_CALLS) -> dict:
+    """Calls/sec through _api_call with a keep-alive session vs a connection per call."""
+    import requests
+    server = FakeSlackServer(FakeWorkspace(), faults).start()
+    results = {}
+    try:
+        for label, http in (("reuse", None), ("no_reuse", requests)):
+            client = _client(server, http)
+            for method, params in (("auth.test", None), ("conversations.info", {"channel": DEFAULT_CHANNEL_ID})):
+                client._api_call(method, FAKE_TOKEN, params)  # Warm up
+                start = time.perf_counter()
+                for _ in range(calls):
+                    client._api_call(method, FAKE_TOKEN, params)
+                elapsed = time.perf_counter() - start
+                results[f"{label}.{method}"] = {
+                    "calls": calls,
+                    "seconds": round(elapsed, 4),
+                    "calls_per_sec": round(calls / elapsed, 1),
+                    "ms_per_call": round(elapsed / calls * 1000, 3),
+                }
+    finally:
+        server.stop()
+    reuse = results["reuse.auth.test"]["calls_per_sec"]
+    no_reuse = results["no_reuse.auth.test"]["calls_per_sec"]
+    results["reuse_speedup"] = round(reuse / no_reuse, 2) if no_reuse else None
+    return results
+
+
+def bench_pagination(faults: FaultConfig, entries: int = DEFAULT_PAGINATION_ENTRIES) -> dict:
+    """Throughput of list_channels / list_users over `entries` items (200 per page)."""
+    server = FakeSlackServer(FakeWorkspace(channels=entries, users=entries), faults).start()
+    results = {}
+    try:
+        client = _client(server)
+        for name, fn in (("list_channels", lambda: len(client.list_channels(FAKE_TOKEN))),
+                         ("list_users", lambda: len(client.list_users(FAKE_TOKEN)))):
+            server.reset_stats()
+            timing = _timed(fn)
+            pages = server.stats()["total_calls"] // 3
+            results[name] = {
+                "entries": timing.pop("result"),
+                "pages": pages,
+                **timing,
+                "entries_per_sec": round(entries / timing["best_s"], 1),
+            }
+    finally:
+        server.stop()
+    return results
+
+
+def bench_history(faults: FaultConfig, messages: int = DEFAULT_HISTORY_MESSAGES) -> dict:
+    """get_channel_history at `messages` messages, split into fetch and JSON decode cost."""
+    import requests
+    server = FakeSlackServer(FakeWorkspace(users=50, messages=messages), faults).start()
+    try:
+        client = _client(server)
+        fetch = _timed(lambda: len(client.get_channel_history(FAKE_TOKEN, DEFAULT_CHANNEL_ID, messages)), repeat=5)
+        body = requests.get(f"{server.api_url}/conversations.history",
+                            params={"channel": DEFAULT_CHANNEL_ID, "limit": messages},
+                            headers={"Authorization": f"Bearer {FAKE_TOKEN}"}).content
+        decode = _timed(lambda: len(json.loads(body)["messages"]), repeat=20)
+    finally:
+        server.stop()
+    return {
+        "messages": fetch.pop("result"),
+        "payload_bytes": len(body),
+        "get_channel_history": fetch,
+        "json_decode": {k: v for k, v in decode.items() if k != "result"},
+    }
+
+
+UPLOAD_CHILD = '''
+import json, resource, sys, time
+sys.path.insert(0, {repo!r})
+import slack_interface
+client = slack_interface.SlackClient(slack_interface.SlackTokens(bot_token={token!r}))
+client.BASE_URL = {api!r}
+baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+result = client.upload_file_v2({token!r}, {channel!r}, file_path={path!r})
+elapsed = time.perf_counter() - start
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{"ok": result.get("ok"), "error": result.get("error"), "seconds": elapsed,
+                  "baseline_rss_kb": baseline, "peak_rss_kb": peak}}))
+'''
+
+
+def bench_upload(faults: FaultConfig, sizes_mb: list) -> dict:
+    """upload_file_v2 throughput and peak RSS, one fresh process per file size."""
+    server = FakeSlackServer(FakeWorkspace(), faults).start()
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for size_mb in sizes_mb:
+                path = Path(tmp) / f"upload_{size_mb}mb.bin"
+                with open(path, "wb") as f:
+                    block = os.urandom(1024 * 1024)
+                    for _ in range(size_mb):
+                        f.write(block)
+                code = UPLOAD_CHILD.format(repo=str(REPO_ROOT), token=FAKE_TOKEN, api=server.api_url,
+                                           channel=DEFAULT_CHANNEL_ID, path=str(path))
+                proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+                path.unlink()
+                try:
+                    data = json.loads(proc.stdout.strip().splitlines()[-1])
+                except (IndexError, json.JSONDecodeError):
+                    results[f"{size_mb}MB"] = {"ok": False, "error": proc.stderr.strip()[-300:]}
+                    continue
+                # ru_maxrss is KB on Linux, bytes on macOS
+                scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+                results[f"{size_mb}MB"] = {
+                    "ok": data["ok"],
+                    "error": data["error"],
+                    "seconds": round(data["seconds"], 4),
+                    "mb_per_sec": round(size_mb / data["seconds"], 1) if data["seconds"] else None,
+                    "peak_rss_mb": round(data["peak_rss_kb"] / scale, 1),
+                    "rss_growth_mb": round((data["peak_rss_kb"] - data["baseline_rss_kb"]) / scale, 1),
+                }
+    finally:
+        server.stop()
+    return results
+
+
+def bench_cli(faults: FaultConfig, runs: int = DEFAULT_CLI_RUNS) -> dict:
+    """Wall time of `python slack_interface.py <subcommand>` from a cold process."""
+    server = FakeSlackServer(FakeWorkspace(users=20, messages=50), faults).start()
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory() as home:
+            write_agent_settings(Path(home) / ".agent_settings.json")
+            env = {**os.environ, "HOME": home, "SLACK_API_BASE_URL": server.api_url}
+            for args in CLI_COMMANDS:
+                times = []
+                ok = True
+                for _ in range(runs):
+                    start = time.perf_counter()
+                    proc = subprocess.run([sys.executable, "slack_interface.py", *args], cwd=str(REPO_ROOT),
+                                          env=env, capture_output=True)
+                    times.append(time.perf_counter() - start)
+                    ok = ok and proc.returncode == 0
+                results[" ".join(args)] = {
+                    "ok": ok,
+                    "runs": runs,
+                    "best_s": round(min(times), 4),
+                    "median_s": round(statistics.median(times), 4),
+                }
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+        results["python_startup_s"] = round(time.perf_counter() - start, 4)
+    finally:
+        server.stop()
+    return results
+
+
+def git_commit() -> str:
+    """Current commit hash, if the repo is a git checkout."""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=str(REPO_ROOT),
+                              capture_output=True, text=True, timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark slack_interface.py against a local fake Slack API")
+    parser.add_argument("--only", help=f"Comma-separated benchmarks to run ({', '.join(BENCHMARKS)})")
+    parser.add_argument("--out", "-o", help="Write the JSON results to this file as well as stdout")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds of simulated latency per API call")
+    parser.add_argument("--calls", type=int, default=DEFAULT_API_CALLS, help="Calls per api_calls measurement")
+    parser.add_argument("--entries", type=int, default=DEFAULT_PAGINATION_ENTRIES, help="Channels/users for pagination")
+    parser.add_argument("--messages", type=int, default=DEFAULT_HISTORY_MESSAGES, help="Messages for history")
+    parser.add_argument("--upload-sizes", default=DEFAULT_UPLOAD_SIZES_MB,
+                        help=f"Comma-separated upload sizes in MB (default: {DEFAULT_UPLOAD_SIZES_MB})")
+    parser.add_argument("--cli-runs", type=int, default=DEFAULT_CLI_RUNS, help="Runs per CLI subcommand")
+    args = parser.parse_args()
+
+    selected = [b.strip() for b in args.only.split(",")] if args.only else list(BENCHMARKS)
+    unknown = [b for b in selected if b not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+    try:
+        sizes = [int(s) for s in args.upload_sizes.split(",") if s.strip()]
+    except ValueError:
+        parser.error("--upload-sizes must be comma-separated integers")
+
+    faults = FaultConfig(latency=args.latency)
+    runners = {
+        "api_calls": lambda: bench_api_calls(faults, args.calls),
+        "pagination": lambda: bench_pagination(faults, args.entries),
+        "history": lambda: bench_history(faults, args.messages),
+        "upload": lambda: bench_upload(faults, sizes),
+        "cli": lambda: bench_cli(faults, args.cli_runs),
+    }
+
+    report = {
+        "commit": git_commit(),
+        "time": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "latency_s": args.latency,
+        "results": {},
+    }
+    for name in selected:
+        print(f"⏱️  {name}...", file=sys.stderr, flush=True)
+        started = time.perf_counter()
+        report["results"][name] = runners[name]()
+        print(f"   done in {time.perf_counter() - started:.1f}s", file=sys.stderr, flush=True)
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.out:
+        Path(args.out).write_text(output + "\n")
+        print(f"💾 Results written to {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Stub Claude CLI
+
+Drop-in replacement for the Claude CLI when benchmarking the monitor
+(point CLAUDE_BIN at this file). It reads the monitor's prompt from stdin
+(or from the argument after -p, as passed by CLAUDE_WRAPPER), runs
+every `python slack_interface.py say ...` reply command it lists with a
+canned answer, and prints stream-json events like the real CLI, so the whole
+monitor pipeline runs without calling a model.
+
+Timing is simulated with environment variables:
+
+    STUB_CLAUDE_STARTUP      Seconds before the first reply (default: 2.0)
+    STUB_CLAUDE_PER_MESSAGE  Seconds spent composing each reply (default: 1.0)
+    STUB_CLAUDE_SKIP_RATE    Fraction of messages left unanswered (default: 0)
+"""
+
+import json
+import os
+import random
+import re
+import shlex
+import subprocess
+import sys
+import time
+import uuid
+
+REPLY_COMMAND = re.compile(r'reply with: (python slack_interface\.py say .*)\)$', re.MULTILINE)
+
+
+def emit(event: dict) -> None:
+    print(json.dumps(event), flush=True)
+
+
+def main():
+    args = sys.argv[1:]
+    # Direct launches pipe the prompt in; wrapper launches pass it as the last argument
+    prompt = args[-1] if "-p" in args and not args[-1].startswith("-") else sys.stdin.read()
+    session_id = args[args.index("--resume") + 1] if "--resume" in args else str(uuid.uuid4())
+    startup = float(os.environ.get("STUB_CLAUDE_STARTUP", "2.0"))
+    per_message = float(os.environ.get("STUB_CLAUDE_PER_MESSAGE", "1.0"))
+    skip_rate = float(os.environ.get("STUB_CLAUDE_SKIP_RATE", "0"))
+    started = time.time()
+
+    emit({"type": "system", "subtype": "init", "session_id": session_id})
+    time.sleep(startup)
+
+    commands = REPLY_COMMAND.findall(prompt)
+    for i, command in enumerate(commands):
+        time.sleep(per_message)
+        if skip_rate and random.random() < skip_rate:
+            continue
+        argv = [sys.executable if part == "python" else part for part in shlex.split(command)]
+        argv = [f"Stub reply {i + 1} 🤖" if part == "message" else part for part in argv]
+        tool_id = f"toolu_{i}"
+        emit({"type": "assistant", "session_id": session_id, "message": {"content": [
+            {"type": "tool_use", "id": tool_id, "name": "Bash", "input": {"command": shlex.join(argv)}}]}})
+        proc = subprocess.run(argv, capture_output=True, text=True)
+        emit({"type": "user", "session_id": session_id, "message": {"content": [
+            {"type": "tool_result", "tool_use_id": tool_id, "content": proc.stdout + proc.stderr,
+             "is_error": proc.returncode != 0}]}})
+
+    emit({
+        "type": "result",
+        "subtype": "success",
+        "is_error": False,
+        "session_id": session_id,
+        "duration_ms": int((time.time() - started) * 1000),
+        "num_turns": len(commands) + 1,
+        "result": f"Replied to {len(commands)} message(s)",
+        "usage": {"input_tokens": len(prompt) // 4, "output_tokens": 50 * len(commands)},
+    })
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 #!/bin/bash
-# Claude Code Wrapper Script with pseudo-TTY and file-based output
+# Claude Code Wrapper Script with pseudo-TTY and streamed output
 
 export HOME=/root
 export PATH="/usr/local/bin:$PATH"
@@ -9,10 +9,6 @@ export TERM=xterm-256color
 # Settings file location
 SETTINGS_FILE="/root/.claude/settings_arash.json"
 
-# Create a temp file for output
-TMPFILE=$(mktemp)
-trap "rm -f $TMPFILE" EXIT
-
 # Build properly quoted command
 QUOTED_ARGS=""
 for arg in "$@"; do
@@ -23,7 +19,8 @@ done
 
 # Run claude with script for pseudo-TTY (using the original binary)
 # Include --settings flag to use custom settings file
-script -q /dev/null -c "/root/.local/bin/claude --settings $SETTINGS_FILE $QUOTED_ARGS" > "$TMPFILE" 2>&1
-
-# Clean and output the result (remove ANSI codes, OSC sequences, and control chars)
-cat "$TMPFILE" | tr -d '\r' | sed 's/\x1b\[[0-9;]*[a-zA-Z]//g; s/\x1b\[[?][0-9]*[a-zA-Z]//g; s/\x1b\[<u//g; s/\x1b\][0-9]*;[^\x07]*\x07//g'
+# Output is cleaned as it streams (remove CRs, ANSI codes, OSC sequences and
+# control chars) so callers can follow progress live; sed -u flushes per line
+script -q /dev/null -c "/root/.local/bin/claude --settings $SETTINGS_FILE $QUOTED_ARGS" 2>&1 \
+    | sed -u 's/\r//g; s/\x1b\[[0-9;]*[a-zA-Z]//g; s/\x1b\[[?][0-9]*[a-zA-Z]//g; s/\x1b\[<u//g; s/\x1b\][0-9]*;[^\x07]*\x07//g'
+exit "${PIPESTATUS[0]}"
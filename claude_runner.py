@@ -0,0 +1,665 @@
+"""
+Claude CLI Runner
+
+Shared helper for invoking Claude Code CLI from the monitor and orchestrator.
+
+The CLI is launched directly: the prompt is written to a temporary file that
+becomes Claude's stdin (never argv, so a 100KB prompt needs no quoting), and
+output is read as it arrives with ANSI escapes and control characters
+stripped incrementally. Claude runs on plain pipes unless CLAUDE_PTY=1, which
+gives it a pseudo-terminal from the pty module. CLAUDE_WRAPPER switches back
+to a wrapper script such as claude-wrapper.sh, which gets the prompt as its
+last argument.
+
+Output is streamed line by line while the child runs. When Claude is asked for
+structured output (--output-format stream-json), each line is a JSON event and
+tool calls, tool results and the final result are tracked as they happen.
+Plain-text output is passed through unchanged.
+
+Runs can share a host-wide concurrency cap (CLAUDE_MAX_CONCURRENT): each run
+holds one of N flock'd slot files while Claude is running, so several agent
+processes on one machine queue for a slot instead of all running at once.
+
+Instead of a single fixed timeout, runs are guarded by a no-progress watchdog:
+a run is killed when it produces no output for `idle_timeout` seconds (longer
+while a tool call is in flight), with `max_runtime` as a hard cap.
+
+Usage:
+    from claude_runner import run_claude, STREAM_JSON_ARGS
+
+    result = run_claude(["-p", *STREAM_JSON_ARGS], prompt=prompt, idle_timeout=90)
+    if result.ok:
+        print(f"Done in {result.duration:.1f}s, {len(result.posts)} post(s)")
+"""
+
+import codecs
+import fcntl
+import json
+import os
+import pty
+import queue
+import re
+import shutil
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+REPO_ROOT = Path(__file__).parent
+WRAPPER = os.environ.get("CLAUDE_WRAPPER")  # Wrapper script to run instead of the CLI (prompt passed in argv)
+CLAUDE_BIN = os.environ.get("CLAUDE_BIN") or "/root/.local/bin/claude"  # Falls back to `claude` on PATH
+CLAUDE_SETTINGS = os.environ.get("CLAUDE_SETTINGS", "/root/.claude/settings_arash.json")  # Passed if it exists
+USE_PTY = os.environ.get("CLAUDE_PTY", "0") == "1"  # Give Claude a pseudo-terminal instead of pipes
+READ_CHUNK = 65536  # Bytes read from Claude's output at a time
+RUNS_LOG_FILE = Path(os.environ.get("CLAUDE_RUNS_LOG", REPO_ROOT / ".claude_runs.jsonl"))  # Per-run step timings
+RUNS_LOG_MAX_BYTES = 5 * 1024 * 1024  # Rotated to <log>.1 (replacing the previous one) past this size
+
+# Host-wide cap on concurrent Claude runs across processes (0 = unlimited);
+# orchestrator.py --agents exports it to every agent it starts
+MAX_CONCURRENT_RUNS = int(os.environ.get("CLAUDE_MAX_CONCURRENT", "0"))
+SLOTS_DIR = Path(os.environ.get("CLAUDE_SLOTS_DIR", REPO_ROOT / ".claude_slots"))
+SLOT_POLL_INTERVAL = 1.0  # Seconds between attempts while all slots are taken
+
+_ACTIVE_RUNS = set()  # Claude processes started by this process (see stop_active_runs)
+_ACTIVE_LOCK = threading.Lock()
+_STOPPING = threading.Event()
+
+# Ask Claude for one JSON event per line (--verbose is required with -p)
+STREAM_JSON_ARGS = ["--output-format", "stream-json", "--verbose"]
+
+# Terminal escapes removed from output: CSI (colors, cursor), OSC (titles,
+# links), other two-byte escapes, and control characters except tab/newline
+ANSI_ESCAPE = r"\x1b\[[0-9;?<>=]*[ -/]*[@-~]|\x1b\][^\x07\x1b]*(?:\x07|\x1b\\)|\x1b[@-Z\\-_]"
+ANSI_PATTERN = re.compile(ANSI_ESCAPE + r"|[\x00-\x08\x0b-\x1f\x7f]")
+# An escape cut off at the end of a chunk (CSI without its final byte, OSC without its terminator)
+PARTIAL_ESCAPE = re.compile(r"\x1b(?:\[[0-9;?<>=]*[ -/]*|\](?:[^\x07\x1b]|\x1b(?!\\))*)?\Z")
+ESCAPE_MAX_LENGTH = 256  # Longer "escapes" split across reads are passed on rather than held back
+
+# Markers printed by `slack_interface.py say` on success
+POST_SUCCESS_MARKER = "Message sent successfully"
+POST_FAILURE_MARKER = "Failed to send"
+POST_TS_MAX_LINES = 3  # Plain-text output: lines after the success marker that may carry "Timestamp:"
+THREAD_REPLY_COMMAND = re.compile(r"slack_interface\.py\s+say\b.*\s(?:-t|--thread)(?:\s|=)", re.DOTALL)
+
+
+@dataclass
+class ClaudeStep:
+    """A single tool call made by Claude during a run."""
+    tool: str
+    summary: str
+    started: float
+    duration: Optional[float] = None
+    is_error: bool = False
+    tool_use_id: Optional[str] = None
+
+
+@dataclass
+class ClaudeRunResult:
+    """
+    Outcome of a Claude CLI run.
+
+    Attributes:
+        returncode: Exit code of the child (None if it never exited cleanly)
+        output: Plain-text output (assistant text for stream-json runs)
+        session_id: Claude session ID reported by the CLI (stream-json only)
+        steps: Tool calls with their timings
+        posts: Slack timestamps of messages posted via slack_interface.py say
+        replies: The posts that were thread replies (say -t), i.e. answers
+            rather than top-level status updates
+        failed_posts: Number of say commands that reported a failure
+        is_error: True if Claude reported an error result
+        stalled: True if killed by the no-progress watchdog
+        timed_out: True if killed for exceeding max_runtime
+        duration: Wall-clock seconds for the whole run
+        queued: Seconds spent waiting for a run slot before starting
+        final: The final "result" event (stream-json only)
+    """
+    returncode: Optional[int] = None
+    output: str = ""
+    session_id: Optional[str] = None
+    steps: List[ClaudeStep] = field(default_factory=list)
+    posts: List[str] = field(default_factory=list)
+    replies: List[str] = field(default_factory=list)
+    failed_posts: int = 0
+    is_error: bool = False
+    stalled: bool = False
+    timed_out: bool = False
+    duration: float = 0.0
+    queued: float = 0.0
+    final: Optional[Dict] = None
+
+    @property
+    def ok(self) -> bool:
+        """True if the run finished on its own without reporting an error."""
+        return self.returncode == 0 and not (self.is_error or self.stalled or self.timed_out)
+
+
+def _summarize_tool_input(tool: str, tool_input: Dict) -> str:
+    """One-line description of a tool call for logs."""
+    if not isinstance(tool_input, dict):
+        return ""
+    summary = tool_input.get("command") or tool_input.get("file_path") or tool_input.get("pattern") or ""
+    summary = str(summary).replace("\n", " ")
+    return summary[:120]
+
+
+def _tool_result_text(block: Dict) -> str:
+    """Flatten a tool_result content block to text."""
+    content = block.get("content", "")
+    if isinstance(content, list):
+        return "\n".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return str(content)
+
+
+def _extract_post_ts(text: str) -> Optional[str]:
+    """Pull the message timestamp out of `slack_interface.py say` output."""
+    if POST_SUCCESS_MARKER not in text:
+        return None
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith("Timestamp:"):
+            return line.split(":", 1)[1].strip()
+    return ""
+
+
+class _StreamParser:
+    """Incrementally folds CLI output lines into a ClaudeRunResult."""
+
+    def __init__(self, result: ClaudeRunResult, start: float,
+                 on_post: Optional[Callable[[str, bool], None]] = None):
+        self.result = result
+        self.start = start
+        self.on_post = on_post
+        self.open_steps: Dict[str, ClaudeStep] = {}
+        self.reply_steps = set()  # tool_use IDs of `say -t` commands
+        self.lines_since_post: Optional[int] = None  # Plain text: a post is waiting for its "Timestamp:" line
+        self.text_parts: List[str] = []
+
+    @property
+    def tool_in_flight(self) -> bool:
+        return bool(self.open_steps)
+
+    def feed(self, line: str) -> Optional[Dict]:
+        """Process one output line. Returns the parsed event, if any."""
+        stripped = line.strip()
+        event = None
+        if stripped.startswith("{"):
+            try:
+                event = json.loads(stripped)
+            except json.JSONDecodeError:
+                event = None
+
+        if event is None:
+            # Plain-text output (text mode, or noise from the wrapper)
+            self.text_parts.append(line)
+            self._check_text_line(line)
+            return None
+
+        event_type = event.get("type")
+        if event_type == "system" and event.get("session_id"):
+            self.result.session_id = event["session_id"]
+        elif event_type == "assistant":
+            for block in event.get("message", {}).get("content", []):
+                if block.get("type") == "text":
+                    self.text_parts.append(block.get("text", ""))
+                elif block.get("type") == "tool_use":
+                    step = ClaudeStep(
+                        tool=block.get("name", "tool"),
+                        summary=_summarize_tool_input(block.get("name", ""), block.get("input", {})),
+                        started=time.time() - self.start,
+                        tool_use_id=block.get("id"),
+                    )
+                    self.result.steps.append(step)
+                    if step.tool_use_id:
+                        self.open_steps[step.tool_use_id] = step
+                        tool_input = block.get("input")
+                        command = tool_input.get("command", "") if isinstance(tool_input, dict) else ""
+                        if THREAD_REPLY_COMMAND.search(str(command)):
+                            self.reply_steps.add(step.tool_use_id)
+        elif event_type == "user":
+            for block in event.get("message", {}).get("content", []):
+                if not isinstance(block, dict) or block.get("type") != "tool_result":
+                    continue
+                step = self.open_steps.pop(block.get("tool_use_id"), None)
+                if step:
+                    step.duration = (time.time() - self.start) - step.started
+                    step.is_error = bool(block.get("is_error"))
+                reply = block.get("tool_use_id") in self.reply_steps
+                self.reply_steps.discard(block.get("tool_use_id"))
+                self._check_post(_tool_result_text(block), reply)
+        elif event_type == "result":
+            self.result.final = event
+            self.result.is_error = bool(event.get("is_error"))
+            self.result.session_id = event.get("session_id", self.result.session_id)
+            if event.get("result") and not self.text_parts:
+                self.text_parts.append(event["result"])
+        return event
+
+    def _record_post(self, ts: str, reply: bool = False) -> None:
+        self.result.posts.append(ts)
+        if reply:
+            self.result.replies.append(ts)
+        if self.on_post:
+            self.on_post(ts, True)
+
+    def _record_failed_post(self) -> None:
+        self.result.failed_posts += 1
+        if self.on_post:
+            self.on_post("", False)
+
+    def _check_post(self, text: str, reply: bool = False) -> None:
+        """Check a whole tool result for the outcome of a `say` command."""
+        ts = _extract_post_ts(text)
+        if ts is not None:
+            self._record_post(ts, reply)
+        elif POST_FAILURE_MARKER in text:
+            self._record_failed_post()
+
+    def _check_text_line(self, line: str) -> None:
+        """
+        Check one line of plain-text output for the outcome of a `say` command.
+
+        `say` prints "Timestamp:" a line or two after the success marker, so
+        a post is held until that line arrives, and recorded without a
+        timestamp if it doesn't within POST_TS_MAX_LINES lines.
+        """
+        stripped = line.strip()
+        if self.lines_since_post is not None:
+            if stripped.startswith("Timestamp:"):
+                self.lines_since_post = None
+                self._record_post(stripped.split(":", 1)[1].strip())
+                return
+            self.lines_since_post += 1
+            if (self.lines_since_post >= POST_TS_MAX_LINES
+                    or POST_SUCCESS_MARKER in line or POST_FAILURE_MARKER in line):
+                self.lines_since_post = None
+                self._record_post("")
+        if POST_SUCCESS_MARKER in line:
+            self.lines_since_post = 0
+        elif POST_FAILURE_MARKER in line:
+            self._record_failed_post()
+
+    def finish(self) -> None:
+        if self.lines_since_post is not None:
+            self.lines_since_post = None
+            self._record_post("")
+        self.result.output = "\n".join(part.rstrip("\n") for part in self.text_parts)
+
+
+def format_event(event: Dict) -> Optional[str]:
+    """Render a stream-json event as a short human-readable log line."""
+    event_type = event.get("type")
+    if event_type == "assistant":
+        lines = []
+        for block in event.get("message", {}).get("content", []):
+            if block.get("type") == "text" and block.get("text", "").strip():
+                lines.append(block["text"].strip())
+            elif block.get("type") == "tool_use":
+                summary = _summarize_tool_input(block.get("name", ""), block.get("input", {}))
+                lines.append(f"🔧 {block.get('name', 'tool')}: {summary}")
+        return "\n".join(lines) or None
+    if event_type == "result":
+        status = "❌ error" if event.get("is_error") else "✅ done"
+        seconds = (event.get("duration_ms") or 0) / 1000
+        return f"🏁 Claude {status} in {seconds:.1f}s ({event.get('num_turns', '?')} turns)"
+    return None
+
+
+class AnsiStripper:
+    """
+    Removes terminal escapes from output that arrives in arbitrary chunks.
+    
+    An escape sequence cut off at the end of a chunk is held back until the
+    next chunk completes it, so partial sequences never leak through.
+    """
+
+    def __init__(self):
+        self._pending = ""
+
+    def feed(self, text: str, final: bool = False) -> str:
+        text, self._pending = self._pending + text, ""
+        partial = None if final else PARTIAL_ESCAPE.search(text)
+        if partial and len(text) - partial.start() < ESCAPE_MAX_LENGTH:
+            text, self._pending = text[:partial.start()], text[partial.start():]
+        return ANSI_PATTERN.sub("", text)
+
+
+def find_claude() -> Optional[str]:
+    """Path of the Claude CLI (CLAUDE_BIN, else `claude` on PATH), or None if missing."""
+    if os.path.isfile(CLAUDE_BIN) and os.access(CLAUDE_BIN, os.X_OK):
+        return CLAUDE_BIN
+    return shutil.which(os.path.basename(CLAUDE_BIN)) or shutil.which("claude")
+
+
+def claude_command(args: List[str], prompt: Optional[str] = None) -> List[str]:
+    """
+    Command line for a Claude run.
+
+    Args:
+        args: Arguments for the Claude CLI
+        prompt: Prompt text; only included here when a wrapper script is used
+            (the CLI itself reads it from stdin)
+
+    Raises:
+        FileNotFoundError: If the Claude CLI cannot be found
+    """
+    if WRAPPER:
+        return [WRAPPER, *args, *([prompt] if prompt is not None else [])]
+    binary = find_claude()
+    if binary is None:
+        raise FileNotFoundError(f"Claude CLI not found ({CLAUDE_BIN} or `claude` on PATH)")
+    settings = ["--settings", CLAUDE_SETTINGS] if CLAUDE_SETTINGS and os.path.exists(CLAUDE_SETTINGS) else []
+    return [binary, *settings, *args]
+
+
+def _claude_env() -> Dict[str, str]:
+    """Environment for Claude: the caller's, plus what the CLI expects (as the wrapper set)."""
+    env = dict(os.environ)
+    env.setdefault("TERM", "xterm-256color")
+    if "/usr/local/bin" not in env.get("PATH", "").split(os.pathsep):
+        env["PATH"] = os.pathsep.join(["/usr/local/bin", env.get("PATH", "")])
+    return env
+
+
+def _read_lines(fd: int, emit: Callable[[str], None]) -> None:
+    """Read fd until EOF, emitting cleaned output one line at a time."""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    stripper = AnsiStripper()
+    partial = ""
+    while True:
+        try:
+            chunk = os.read(fd, READ_CHUNK)
+        except OSError:
+            # EIO from a pty once Claude and its children have exited
+            chunk = b""
+        if not chunk:
+            break
+        text = partial + stripper.feed(decoder.decode(chunk))
+        lines = text.split("\n")
+        partial = lines.pop()
+        for line in lines:
+            emit(line + "\n")
+    rest = partial + stripper.feed(decoder.decode(b"", final=True), final=True)
+    if rest:
+        emit(rest)
+
+
+def stop_active_runs() -> int:
+    """
+    Kill every Claude run this process has going, for shutdowns that can't wait.
+
+    Runs still waiting for a slot, and any started afterwards, raise
+    RuntimeError instead of starting. The killed runs return a result that
+    is not ok, so callers handle them like any other failed run.
+
+    Returns:
+        Number of runs killed
+    """
+    _STOPPING.set()
+    with _ACTIVE_LOCK:
+        procs = list(_ACTIVE_RUNS)
+    for proc in procs:
+        _kill_process_group(proc)
+    return len(procs)
+
+
+def _kill_process_group(proc: subprocess.Popen) -> None:
+    """Terminate the child and everything it spawned (script, claude, tools)."""
+    try:
+        os.killpg(proc.pid, signal.SIGTERM)
+    except (ProcessLookupError, PermissionError):
+        return
+    try:
+        proc.wait(timeout=5)
+    except subprocess.TimeoutExpired:
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+
+@contextmanager
+def claude_slot(limit: Optional[int] = None):
+    """
+    Hold one of `limit` host-wide run slots, waiting until one is free.
+
+    Slots are lock files in SLOTS_DIR held with flock, so a slot is released
+    automatically if its holder dies.
+
+    Args:
+        limit: Number of slots (default: MAX_CONCURRENT_RUNS; 0 = no cap)
+
+    Yields:
+        The slot index, or None when uncapped
+    """
+    limit = MAX_CONCURRENT_RUNS if limit is None else limit
+    if limit <= 0:
+        yield None
+        return
+    SLOTS_DIR.mkdir(parents=True, exist_ok=True)
+    while True:
+        if _STOPPING.is_set():
+            raise RuntimeError("Claude runs are being stopped")
+        for index in range(limit):
+            f = open(SLOTS_DIR / f"slot-{index}.lock", "a")
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                f.close()
+                continue
+            try:
+                yield index
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+                f.close()
+            return
+        time.sleep(SLOT_POLL_INTERVAL)
+
+
+def run_claude(args: List[str], cwd: Optional[Path] = None, prompt: Optional[str] = None,
+               idle_timeout: float = 120, tool_idle_timeout: float = 600,
+               max_runtime: float = 3600,
+               on_line: Optional[Callable[[str], None]] = None,
+               on_event: Optional[Callable[[Dict], None]] = None,
+               on_post: Optional[Callable[[str, bool], None]] = None) -> ClaudeRunResult:
+    """
+    Run Claude CLI, streaming and parsing its output.
+
+    Waits for a run slot first when a host-wide cap is set (see claude_slot);
+    the watchdog limits apply from when the run actually starts.
+
+    Args:
+        args: Arguments for the Claude CLI (e.g. ["-p", *STREAM_JSON_ARGS])
+        cwd: Working directory (default: repo root)
+        prompt: Prompt text, fed to Claude on stdin
+        idle_timeout: Kill the run after this many seconds without output
+        tool_idle_timeout: Idle limit while a tool call is still running
+        max_runtime: Hard cap on total runtime in seconds
+        on_line: Called with each raw output line as it arrives
+        on_event: Called with each parsed stream-json event as it arrives
+        on_post: Called with (ts, succeeded) whenever a Slack post completes
+
+    Returns:
+        ClaudeRunResult with output, step timings and detected Slack posts
+
+    Raises:
+        FileNotFoundError: If the Claude CLI (or wrapper script) cannot be executed
+        RuntimeError: If runs are being stopped (see stop_active_runs)
+    """
+    if _STOPPING.is_set():
+        raise RuntimeError("Claude runs are being stopped")
+    queued = time.time()
+    with claude_slot():
+        waited = time.time() - queued
+        result = _run_claude_process(args, cwd, prompt, idle_timeout, tool_idle_timeout, max_runtime,
+                                     on_line, on_event, on_post)
+    result.queued = waited
+    return result
+
+
+def _run_claude_process(args: List[str], cwd: Optional[Path], prompt: Optional[str],
+                        idle_timeout: float, tool_idle_timeout: float, max_runtime: float,
+                        on_line: Optional[Callable[[str], None]],
+                        on_event: Optional[Callable[[Dict], None]],
+                        on_post: Optional[Callable[[str, bool], None]]) -> ClaudeRunResult:
+    """Start Claude and watch it until it exits or the watchdog fires."""
+    result = ClaudeRunResult()
+    start = time.time()
+    parser = _StreamParser(result, start, on_post)
+    command = claude_command(args, prompt)
+
+    # The prompt reaches Claude as a file on stdin: no argv size or quoting
+    # limits, and no writer thread to deadlock against a full pipe
+    stdin = subprocess.DEVNULL
+    if prompt is not None and not WRAPPER:
+        stdin = tempfile.TemporaryFile()
+        stdin.write(prompt.encode())
+        stdin.seek(0)
+
+    out_fd = slave_fd = None
+    try:
+        if USE_PTY:
+            out_fd, slave_fd = pty.openpty()
+        proc = subprocess.Popen(
+            command,
+            cwd=str(cwd or REPO_ROOT),
+            env=_claude_env(),
+            stdin=stdin,
+            stdout=slave_fd if USE_PTY else subprocess.PIPE,
+            stderr=slave_fd if USE_PTY else subprocess.STDOUT,
+            start_new_session=True,  # So the watchdog can kill the whole tree
+        )
+    except BaseException:
+        for fd in (out_fd, slave_fd):
+            if fd is not None:
+                os.close(fd)
+        raise
+    finally:
+        if stdin is not subprocess.DEVNULL:
+            stdin.close()
+    if USE_PTY:
+        os.close(slave_fd)  # Only Claude holds the terminal now, so EOF arrives when it exits
+    else:
+        out_fd = proc.stdout.fileno()
+    with _ACTIVE_LOCK:
+        _ACTIVE_RUNS.add(proc)
+    try:
+        return _watch_claude_process(proc, out_fd, parser, result, start, idle_timeout,
+                                     tool_idle_timeout, max_runtime, on_line, on_event)
+    finally:
+        with _ACTIVE_LOCK:
+            _ACTIVE_RUNS.discard(proc)
+
+
+def _watch_claude_process(proc: subprocess.Popen, out_fd: int, parser: "_StreamParser",
+                          result: ClaudeRunResult, start: float, idle_timeout: float,
+                          tool_idle_timeout: float, max_runtime: float,
+                          on_line: Optional[Callable[[str], None]],
+                          on_event: Optional[Callable[[Dict], None]]) -> ClaudeRunResult:
+    """Stream a started Claude process into the parser until it exits or the watchdog fires."""
+
+    lines: "queue.Queue[Optional[str]]" = queue.Queue()
+
+    def reader():
+        try:
+            _read_lines(out_fd, lines.put)
+        finally:
+            lines.put(None)
+            if USE_PTY:
+                os.close(out_fd)
+            else:
+                proc.stdout.close()
+
+    threading.Thread(target=reader, daemon=True).start()
+    last_progress = time.time()
+
+    try:
+        while True:
+            now = time.time()
+            if now - start >= max_runtime:
+                result.timed_out = True
+                break
+            limit = tool_idle_timeout if parser.tool_in_flight else idle_timeout
+            if now - last_progress >= limit:
+                result.stalled = True
+                break
+
+            try:
+                line = lines.get(timeout=1)
+            except queue.Empty:
+                continue
+            if line is None:
+                break
+
+            last_progress = time.time()
+            if on_line:
+                on_line(line)
+            event = parser.feed(line)
+            if event is not None and on_event:
+                on_event(event)
+    except BaseException:
+        # Interrupted (signal, Ctrl+C): don't leave Claude running on its own
+        _kill_process_group(proc)
+        raise
+
+    if result.stalled or result.timed_out:
+        _kill_process_group(proc)
+    try:
+        result.returncode = proc.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        _kill_process_group(proc)
+
+    parser.finish()
+    result.duration = time.time() - start
+    return result
+
+
+def record_run(kind: str, agent: str, result: ClaudeRunResult, **extra) -> None:
+    """
+    Append a run summary with per-step timings to the runs log, rotating
+    the log once it passes RUNS_LOG_MAX_BYTES.
+
+    Args:
+        kind: What the run was for (e.g. "monitor", "work")
+        agent: Agent ID
+        result: The finished run
+        **extra: Additional fields to record (e.g. message counts)
+    """
+    entry = {
+        "time": datetime.now().isoformat(timespec="seconds"),
+        "kind": kind,
+        "agent": agent,
+        "duration": round(result.duration, 2),
+        "queued": round(result.queued, 2),
+        "returncode": result.returncode,
+        "ok": result.ok,
+        "stalled": result.stalled,
+        "timed_out": result.timed_out,
+        "session_id": result.session_id,
+        "posts": len(result.posts),
+        "steps": [
+            {
+                "tool": step.tool,
+                "summary": step.summary,
+                "started": round(step.started, 2),
+                "duration": round(step.duration, 2) if step.duration is not None else None,
+                "is_error": step.is_error,
+            }
+            for step in result.steps
+        ],
+        **extra,
+    }
+    try:
+        with open(RUNS_LOG_FILE, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+            size = f.tell()
+        if size > RUNS_LOG_MAX_BYTES:
+            os.replace(RUNS_LOG_FILE, RUNS_LOG_FILE.with_name(f"{RUNS_LOG_FILE.name}.1"))
+    except OSError:
+        pass
@@ -0,0 +1,261 @@
+"""
+Document Excerpts
+
+Picks the parts of a markdown document (the PRD, agent specs, protocol docs)
+that matter for an agent's role and current task, so prompts embed those
+parts instead of the whole file.
+
+Documents are split at "## " and "### " headings and the sections are ranked
+with BM25 against a query built from the agent's role, issue labels,
+keywords (agents_config) and task. The top-ranked sections, plus any whose
+heading is marked CRITICAL, are embedded verbatim, in document order;
+every other section is listed by title with the file to read it from. Small
+documents are embedded whole. Everything runs locally, and indexes are
+cached per document content, so repeated prompts don't re-tokenize.
+
+Usage:
+    from doc_excerpts import build_query, excerpt_doc
+
+    query = build_query(AGENTS["bolt"], "Implement the logo download endpoint")
+    text = excerpt_doc(prd_text, query, "agent-docs/PRD.md")
+
+    python doc_excerpts.py agent-docs/PRD.md --agent bolt --task "logo download"
+"""
+
+import argparse
+import math
+import re
+import sys
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from agents_config import AGENTS
+from prompt_budget import estimate_tokens
+
+EXCERPT_TOP_K = 4  # Sections embedded per document
+EXCERPT_MIN_TOKENS = 1500  # Documents smaller than this are embedded whole
+BM25_K1 = 1.5
+BM25_B = 0.75
+INDEX_CACHE_SIZE = 32  # Documents whose index is kept
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have", "if", "in", "is", "it",
+    "its", "of", "on", "or", "that", "the", "this", "to", "was", "will", "with", "you", "your", "we", "our",
+    "all", "any", "can", "do", "not", "use", "should", "must", "when", "what", "which", "who", "how",
+}
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+HEADING_PATTERN = re.compile(r"^(#{2,3})\s+(.*\S)\s*$")
+PINNED_TITLE_PATTERN = re.compile(r"\bCRITICAL\b")  # Sections embedded whatever their score
+
+
+@dataclass
+class DocSection:
+    """A "## " or "### " section of a markdown document."""
+    title: str  # Heading text, "Parent > Child" for "### " sections
+    level: int
+    heading: str  # The heading line as written
+    parent: str  # Heading line of the enclosing "## " section ("" for level 2)
+    text: str  # Heading line and body, up to the next heading
+
+
+def _stem(word: str) -> str:
+    """Crude suffix stripping so "designer", "designs" and "design" match."""
+    for suffix in ("ations", "ation", "ings", "ing", "ers", "er", "ies", "es", "ed", "s"):
+        if len(word) > len(suffix) + 3 and word.endswith(suffix):
+            return word[:-len(suffix)]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, stemmed words of text, without stopwords."""
+    return [_stem(word) for word in WORD_PATTERN.findall(text.lower()) if word not in STOPWORDS]
+
+
+def split_sections(text: str) -> Tuple[str, List[DocSection]]:
+    """
+    Split markdown at "## " and "### " headings (ignoring code blocks).
+
+    Returns:
+        Tuple of (text before the first heading, sections in document order)
+    """
+    preamble, sections = [], []
+    current, parent, in_fence = None, "", False
+    for line in text.splitlines(keepends=True):
+        if line.lstrip().startswith("```"):
+            in_fence = not in_fence
+        match = None if in_fence else HEADING_PATTERN.match(line.rstrip("\n"))
+        if match:
+            level, title = len(match.group(1)), match.group(2).strip()
+            if level == 2:
+                parent_title, parent = "", ""
+            else:
+                parent_title = HEADING_PATTERN.match(parent.rstrip("\n")).group(2).strip() if parent else ""
+            current = DocSection(
+                title=f"{parent_title} > {title}" if parent_title else title,
+                level=level,
+                heading=line,
+                parent=parent,
+                text=line,
+            )
+            sections.append(current)
+            if level == 2:
+                parent = line
+        elif current is None:
+            preamble.append(line)
+        else:
+            current.text += line
+    return "".join(preamble), sections
+
+
+class BM25Index:
+    """Okapi BM25 over tokenized documents."""
+
+    def __init__(self, documents: List[List[str]], k1: float = BM25_K1, b: float = BM25_B):
+        self.k1 = k1
+        self.b = b
+        self.term_counts = [Counter(doc) for doc in documents]
+        self.lengths = [len(doc) for doc in documents]
+        self.avg_length = (sum(self.lengths) / len(documents)) if documents else 0.0
+        doc_freq = Counter(term for counts in self.term_counts for term in counts)
+        n = len(documents)
+        self.idf = {term: math.log(1 + (n - df + 0.5) / (df + 0.5)) for term, df in doc_freq.items()}
+
+    def scores(self, query: List[str]) -> List[float]:
+        """BM25 score of every document for the query terms."""
+        terms = set(query)
+        scores = []
+        for counts, length in zip(self.term_counts, self.lengths):
+            norm = self.k1 * (1 - self.b + self.b * length / self.avg_length) if self.avg_length else self.k1
+            score = 0.0
+            for term in terms:
+                tf = counts.get(term)
+                if tf:
+                    score += self.idf[term] * tf * (self.k1 + 1) / (tf + norm)
+            scores.append(score)
+        return scores
+
+
+_INDEX_CACHE: Dict[Tuple[str, int, int], Tuple[str, List[DocSection], BM25Index]] = {}
+
+
+def index_doc(text: str, source: str = "") -> Tuple[str, List[DocSection], BM25Index]:
+    """Split and index a document, reusing the index while its content is unchanged."""
+    key = (source, len(text), hash(text))
+    cached = _INDEX_CACHE.get(key)
+    if cached:
+        return cached
+    preamble, sections = split_sections(text)
+    # Headings count twice: they say what a section is about
+    index = BM25Index([tokenize(section.title) + tokenize(section.text) for section in sections])
+    if len(_INDEX_CACHE) >= INDEX_CACHE_SIZE:
+        _INDEX_CACHE.pop(next(iter(_INDEX_CACHE)))
+    _INDEX_CACHE[key] = (preamble, sections, index)
+    return _INDEX_CACHE[key]
+
+
+def build_query(agent: dict, task: str = "") -> str:
+    """Search text for an agent: its role, labels and keywords (agents_config) and the task."""
+    return " ".join([agent["role"], *agent.get("labels", []), *agent.get("keywords", []), task])
+
+
+def rank_sections(text: str, query: str, source: str = "") -> List[Tuple[float, DocSection]]:
+    """Sections of a document with their BM25 scores, best first."""
+    _, sections, index = index_doc(text, source)
+    scored = zip(index.scores(tokenize(query)), sections)
+    return sorted(scored, key=lambda item: item[0], reverse=True)
+
+
+def excerpt_doc(text: str, query: str, source: str, top_k: int = EXCERPT_TOP_K,
+                min_tokens: int = EXCERPT_MIN_TOKENS) -> str:
+    """
+    Reduce a document to the sections most relevant to a query.
+
+    Args:
+        text: Markdown document
+        query: What the reader is working on (see build_query)
+        source: Path shown for the sections left out, e.g. "agent-docs/PRD.md"
+        top_k: Sections to keep
+        min_tokens: Documents smaller than this are returned whole
+
+    Returns:
+        The text before the first heading, the top_k best-matching sections
+        (topped up with the opening sections when fewer match) and every
+        section marked CRITICAL, in document order, and a list of the other
+        sections' titles
+    """
+    preamble, sections, _ = index_doc(text, source)
+    if estimate_tokens(text) < min_tokens or len(sections) <= top_k:
+        return text
+
+    ranked = rank_sections(text, query, source)
+    chosen = {id(section) for score, section in ranked[:top_k] if score > 0}
+    # Fill slots nothing matched with the document's opening sections
+    for section in sections:
+        if len(chosen) >= top_k:
+            break
+        chosen.add(id(section))
+    chosen |= {id(section) for section in sections if PINNED_TITLE_PATTERN.search(section.title)}
+    parts = [preamble] if preamble.strip() else []
+    included_parents = set()
+    for section in sections:
+        if id(section) not in chosen:
+            continue
+        # Keep the enclosing heading so a "### " section still reads in context
+        if section.parent and section.parent not in included_parents and not any(
+                s.heading == section.parent and id(s) in chosen for s in sections):
+            parts.append(section.parent + "\n")
+        included_parents.add(section.heading if section.level == 2 else section.parent)
+        parts.append(section.text if section.text.endswith("\n") else section.text + "\n")
+
+    # List what was left out; a "## " section left out entirely is listed once
+    omitted = []
+    for section in sections:
+        if id(section) in chosen:
+            continue
+        if section.level == 3 and section.parent not in included_parents and any(
+                s.heading == section.parent and id(s) not in chosen for s in sections):
+            continue
+        if section.level == 2 and any(s.parent == section.heading and id(s) in chosen for s in sections):
+            continue
+        omitted.append(section.title)
+    if omitted:
+        titles = ", ".join(f'"{title}"' for title in omitted)
+        parts.append(f"\n_Other sections of `{source}` (read the file if you need them): {titles}_\n")
+    return "".join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show which sections of a document a prompt would embed")
+    parser.add_argument("path", type=Path, help="Markdown document, e.g. agent-docs/PRD.md")
+    parser.add_argument("--agent", "-a", default="bolt", help="Agent whose role is part of the query (default: bolt)")
+    parser.add_argument("--task", "-t", default="", help="Task text added to the query")
+    parser.add_argument("--top", "-k", type=int, default=EXCERPT_TOP_K, help=f"Sections to keep (default: {EXCERPT_TOP_K})")
+    parser.add_argument("--show", action="store_true", help="Print the excerpt instead of the ranking")
+    args = parser.parse_args()
+
+    agent = AGENTS.get(args.agent.lower())
+    if agent is None:
+        parser.error(f"unknown agent: {args.agent}")
+    try:
+        text = args.path.read_text()
+    except OSError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(1)
+
+    query = build_query(agent, args.task)
+    if args.show:
+        print(excerpt_doc(text, query, str(args.path), top_k=args.top, min_tokens=0))
+        return
+    print(f"\n🔎 Query: {query}")
+    excerpt = excerpt_doc(text, query, str(args.path), top_k=args.top, min_tokens=0)
+    print(f"📄 {args.path}: {estimate_tokens(text)} → {estimate_tokens(excerpt)} tokens\n")
+    for rank, (score, section) in enumerate(rank_sections(text, query, str(args.path)), 1):
+        marker = "▶️ " if rank <= args.top and score > 0 else "   "
+        print(f"{marker}{score:6.2f}  {section.title}")
+    print()
+
+
+if __name__ == "__main__":
+    main()
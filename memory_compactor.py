@@ -0,0 +1,319 @@
+"""
+Memory Compaction
+
+Keeps agent memory files (memory/<agent>_memory.md) within a size budget.
+Agents add a "### <date> - Session N" entry under "## Session Log" every
+cycle and the whole file is embedded in every prompt, so without compaction
+prompt size grows with every session.
+
+When a memory file exceeds the byte or token budget:
+    - The newest sessions stay in the Session Log verbatim (the hot section)
+    - Older sessions move to memory/archive/<agent>_memory_archive.md
+    - A short generated summary of everything archived replaces them, as an
+      "## Earlier Sessions (compacted)" section
+Every other section of the file is left as the agent wrote it.
+
+Usage:
+    from memory_compactor import compact_memory
+
+    result = compact_memory("bolt")          # No-op while within budget
+    if result.compacted:
+        print(result.describe())
+
+    python memory_compactor.py               # Compact every agent's memory if over budget
+    python memory_compactor.py bolt --force  # Compact now, even within budget
+    python memory_compactor.py --dry-run     # Show what would happen
+"""
+
+import argparse
+import re
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from agents_config import AGENTS
+from prompt_budget import estimate_tokens
+
+REPO_ROOT = Path(__file__).parent
+MEMORY_DIR = REPO_ROOT / "memory"
+ARCHIVE_DIR = MEMORY_DIR / "archive"
+
+MEMORY_MAX_BYTES = 8 * 1024  # Compact when the file is larger than this...
+MEMORY_MAX_TOKENS = 2000  # ...or its estimated token count is higher
+HOT_SESSIONS = 5  # Newest sessions kept verbatim (fewer if they alone exceed the budget)
+SUMMARY_MAX_RECURRING = 5  # Repeated notes listed in the summary
+SUMMARY_MAX_NOTES = 8  # One-off notes from the newest archived sessions
+SUMMARY_NOTE_CHARS = 160  # Longer notes are truncated
+
+SESSION_LOG_HEADING = "## Session Log"
+SUMMARY_HEADING = "## Earlier Sessions (compacted)"
+SESSION_HEADING = re.compile(r"^###\s+(\d{4}-\d{2}-\d{2})?\s*-?\s*Session\s+(\d+)", re.IGNORECASE)
+
+
+@dataclass
+class CompactionResult:
+    """What compact_memory did to one memory file."""
+    agent: str
+    compacted: bool
+    bytes_before: int
+    bytes_after: int
+    sessions_kept: int = 0
+    sessions_archived: int = 0
+    archive_path: Optional[Path] = None
+
+    def describe(self) -> str:
+        if not self.compacted:
+            return f"{self.agent}: {self.bytes_before}B, within budget"
+        return (f"{self.agent}: {self.bytes_before / 1024:.1f}KB → {self.bytes_after / 1024:.1f}KB, "
+                f"kept {self.sessions_kept} session(s), archived {self.sessions_archived}")
+
+
+def get_memory_path(agent_id: str) -> Path:
+    return MEMORY_DIR / f"{AGENTS[agent_id]['name'].lower()}_memory.md"
+
+
+def get_archive_path(agent_id: str) -> Path:
+    return ARCHIVE_DIR / f"{AGENTS[agent_id]['name'].lower()}_memory_archive.md"
+
+
+def over_budget(text: str, max_bytes: int = MEMORY_MAX_BYTES, max_tokens: int = MEMORY_MAX_TOKENS) -> bool:
+    return len(text.encode()) > max_bytes or estimate_tokens(text) > max_tokens
+
+
+def split_sections(text: str) -> List[Tuple[str, str]]:
+    """
+    Split markdown into (heading, body) pairs at "## " headings.
+
+    The text before the first heading is returned with an empty heading.
+    Joining heading + body for every pair gives back the original text.
+    """
+    sections = []
+    heading, lines = "", []
+    for line in text.splitlines(keepends=True):
+        if line.startswith("## "):
+            sections.append((heading, "".join(lines)))
+            heading, lines = line, []
+        else:
+            lines.append(line)
+    sections.append((heading, "".join(lines)))
+    return sections
+
+
+def split_sessions(body: str) -> Tuple[str, List[str]]:
+    """
+    Split a Session Log body into its preamble and "### " session entries.
+
+    Returns:
+        Tuple of (text before the first entry, list of entries with their heading)
+    """
+    preamble, entries, current = [], [], None
+    for line in body.splitlines(keepends=True):
+        if line.startswith("### "):
+            if current is not None:
+                entries.append("".join(current))
+            current = [line]
+        elif current is None:
+            preamble.append(line)
+        else:
+            current.append(line)
+    if current is not None:
+        entries.append("".join(current))
+    return "".join(preamble), entries
+
+
+def session_key(entry: str, position: int) -> Tuple:
+    """Sort key for a session entry: (date, session number), falling back to file position."""
+    match = SESSION_HEADING.match(entry)
+    if not match:
+        return ("", -1, position)
+    return (match.group(1) or "", int(match.group(2)), position)
+
+
+def newest_first(entries: List[str]) -> List[str]:
+    """Session entries ordered newest first, whatever order the file uses."""
+    keyed = [(session_key(entry, i), entry) for i, entry in enumerate(entries)]
+    return [entry for _, entry in sorted(keyed, key=lambda item: item[0], reverse=True)]
+
+
+def _normalize_note(note: str) -> str:
+    """Note text with numbers blanked, so "since Session 52" matches "since Session 53"."""
+    return re.sub(r"\d+", "#", note.lower()).strip()
+
+
+def summarize_sessions(entries: List[str], archive_path: Path) -> str:
+    """
+    Build the compact summary section for archived session entries.
+
+    Extractive and deterministic: the session range, the latest status,
+    notes that recur across sessions (with counts) and the newest one-off
+    notes. Regenerated from the whole archive on every compaction.
+
+    Args:
+        entries: Archived session entries, newest first
+        archive_path: Where the full entries are kept
+
+    Returns:
+        Markdown for the summary section, heading included
+    """
+    keys = [session_key(entry, i) for i, entry in enumerate(entries)]
+    numbers = [key[1] for key in keys if key[1] >= 0]
+    dates = sorted(key[0] for key in keys if key[0])
+
+    notes_by_session = []
+    for entry in entries:
+        notes = [line.strip()[2:].strip() for line in entry.splitlines()[1:] if line.strip().startswith(("- ", "* "))]
+        notes_by_session.append(notes)
+
+    counts, first_seen = {}, {}
+    for notes in notes_by_session:
+        for note in notes:
+            key = _normalize_note(note)
+            counts[key] = counts.get(key, 0) + 1
+            first_seen.setdefault(key, note)
+
+    span = f"Sessions {min(numbers)}-{max(numbers)}" if numbers else f"{len(entries)} sessions"
+    if dates:
+        span += f" ({dates[0]} to {dates[-1]})" if dates[0] != dates[-1] else f" ({dates[0]})"
+    rel_archive = archive_path.relative_to(REPO_ROOT) if archive_path.is_relative_to(REPO_ROOT) else archive_path
+    lines = [
+        SUMMARY_HEADING + "\n",
+        f"<!-- Generated by memory_compactor.py; full entries are in {rel_archive} -->\n",
+        f"- {span}: {len(entries)} session(s) archived in `{rel_archive}`\n",
+    ]
+
+    status = next((note for notes in notes_by_session for note in notes
+                   if note.lower().startswith("**status:**")), None)
+    if status:
+        lines.append(f"- Last archived status: {status.split(':**', 1)[1].strip()}\n")
+
+    recurring = sorted((key for key, count in counts.items() if count > 1),
+                       key=lambda key: counts[key], reverse=True)[:SUMMARY_MAX_RECURRING]
+    if recurring:
+        lines.append("- Recurring:\n")
+        lines += [f"  - {first_seen[key][:SUMMARY_NOTE_CHARS]} (×{counts[key]})\n" for key in recurring]
+
+    one_offs = [note for notes in notes_by_session for note in notes
+                if counts[_normalize_note(note)] == 1 and note != status][:SUMMARY_MAX_NOTES]
+    if one_offs:
+        lines.append("- Notable:\n")
+        lines += [f"  - {note[:SUMMARY_NOTE_CHARS]}\n" for note in one_offs]
+    return "".join(lines) + "\n"
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.tmp")
+    tmp.write_text(text)
+    tmp.replace(path)
+
+
+def compact_memory(agent_id: str, force: bool = False, dry_run: bool = False,
+                   max_bytes: int = MEMORY_MAX_BYTES, max_tokens: int = MEMORY_MAX_TOKENS,
+                   hot_sessions: int = HOT_SESSIONS) -> CompactionResult:
+    """
+    Compact an agent's memory file if it is over budget.
+
+    Args:
+        agent_id: Agent whose memory to compact
+        force: Compact even when within budget
+        dry_run: Work out the result without writing anything
+        max_bytes: Byte budget for the memory file
+        max_tokens: Estimated token budget for the memory file
+        hot_sessions: Newest sessions to keep verbatim
+
+    Returns:
+        CompactionResult describing what was (or would be) done
+    """
+    path = get_memory_path(agent_id)
+    archive_path = get_archive_path(agent_id)
+    text = path.read_text() if path.exists() else ""
+    size = len(text.encode())
+    unchanged = CompactionResult(agent_id, False, size, size)
+    if not text or not (force or over_budget(text, max_bytes, max_tokens)):
+        return unchanged
+
+    sections = split_sections(text)
+    log_index = next((i for i, (heading, _) in enumerate(sections)
+                      if heading.strip().lower() == SESSION_LOG_HEADING.lower()), None)
+    if log_index is None:
+        return unchanged
+    preamble, entries = split_sessions(sections[log_index][1])
+    if len(entries) <= 1:
+        return unchanged
+
+    # Keep the newest sessions, fewer if they alone would blow the budget
+    ordered = newest_first(entries)
+    other = "".join(h + b for i, (h, b) in enumerate(sections)
+                    if i != log_index and h.strip() != SUMMARY_HEADING)
+    keep = min(hot_sessions, len(entries) - 1)
+    while keep > 1 and over_budget(other + preamble + "".join(ordered[:keep]), max_bytes, max_tokens):
+        keep -= 1
+    hot = set(ordered[:keep])
+    archived_now = ordered[keep:]
+
+    # Merge with what was archived before, newest first, without duplicates
+    archive_text = archive_path.read_text() if archive_path.exists() else ""
+    _, previous = split_sessions(archive_text)
+    seen, archive_entries = set(), []
+    for entry in newest_first(archived_now + previous):
+        heading = entry.splitlines()[0].strip()
+        if heading not in seen:
+            seen.add(heading)
+            archive_entries.append(entry if entry.endswith("\n\n") else entry.rstrip("\n") + "\n\n")
+
+    name = AGENTS[agent_id]["name"]
+    new_archive = (f"# {name} Memory Archive\n\n"
+                   f"Session entries moved out of memory/{path.name} by memory_compactor.py, newest first.\n\n"
+                   + "".join(archive_entries))
+    summary = summarize_sessions(archive_entries, archive_path)
+
+    # Rebuild: hot sessions stay in the log in their original order, summary right after it
+    log_body = preamble + "".join(entry for entry in entries if entry in hot)
+    if not log_body.endswith("\n\n"):
+        log_body = log_body.rstrip("\n") + "\n\n"
+    parts = []
+    for i, (heading, body) in enumerate(sections):
+        if heading.strip() == SUMMARY_HEADING:
+            continue
+        if i == log_index:
+            parts.append(heading + log_body + summary)
+        else:
+            parts.append(heading + body)
+    new_text = "".join(parts)
+
+    if not dry_run:
+        _write_atomic(archive_path, new_archive)
+        _write_atomic(path, new_text)
+    return CompactionResult(agent_id, True, size, len(new_text.encode()),
+                            sessions_kept=keep, sessions_archived=len(archived_now),
+                            archive_path=archive_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compact agent memory files that are over budget")
+    parser.add_argument("agents", nargs="*", help=f"Agents to compact (default: all of {', '.join(AGENTS)})")
+    parser.add_argument("--force", action="store_true", help="Compact even when within budget")
+    parser.add_argument("--dry-run", action="store_true", help="Show what would happen without writing")
+    parser.add_argument("--max-bytes", type=int, default=MEMORY_MAX_BYTES,
+                        help=f"Byte budget per memory file (default: {MEMORY_MAX_BYTES})")
+    parser.add_argument("--max-tokens", type=int, default=MEMORY_MAX_TOKENS,
+                        help=f"Estimated token budget per memory file (default: {MEMORY_MAX_TOKENS})")
+    parser.add_argument("--keep", type=int, default=HOT_SESSIONS,
+                        help=f"Newest sessions kept verbatim (default: {HOT_SESSIONS})")
+    args = parser.parse_args()
+
+    agent_ids = [a.lower() for a in args.agents] or list(AGENTS)
+    unknown = [a for a in agent_ids if a not in AGENTS]
+    if unknown:
+        parser.error(f"unknown agent(s): {', '.join(unknown)}")
+
+    for agent_id in agent_ids:
+        result = compact_memory(agent_id, force=args.force, dry_run=args.dry_run,
+                                max_bytes=args.max_bytes, max_tokens=args.max_tokens, hot_sessions=args.keep)
+        icon = "🗜️ " if result.compacted else "✅"
+        print(f"{icon} {result.describe()}{' (dry run)' if args.dry_run and result.compacted else ''}")
+
+
+if __name__ == "__main__":
+    main()
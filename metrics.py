@@ -0,0 +1,258 @@
+"""
+Monitor Metrics
+
+Minimal in-process metrics for the Slack monitor: counters, histograms and
+gauges with optional labels, rendered in the Prometheus text format or as a
+JSON snapshot. No third-party client library is required.
+
+Usage:
+    from metrics import MetricsRegistry, start_metrics_server
+
+    metrics = MetricsRegistry(prefix="monitor")
+    calls = metrics.counter("slack_calls_total", "Slack API calls", ["method"])
+    calls.inc(method="conversations.history")
+
+    start_metrics_server(metrics, port=9108)   # GET http://127.0.0.1:9108/metrics
+    metrics.write_snapshot(Path(".monitor_metrics.json"))
+"""
+
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Default histogram buckets (seconds), roughly log-spaced from 50ms to 15min
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 900)
+
+
+def _label_key(label_names: Sequence[str], labels: Dict[str, str]) -> Tuple[str, ...]:
+    """Order label values by the metric's label names."""
+    return tuple(str(labels.get(name, "")) for name in label_names)
+
+
+def _format_labels(label_names: Sequence[str], key: Tuple[str, ...], extra: str = "") -> str:
+    """Render a Prometheus label set, e.g. {method="chat.postMessage"}."""
+    parts = [f'{name}="{value}"' for name, value in zip(label_names, key)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return str(int(value)) if float(value).is_integer() else f"{value:.6g}"
+
+
+class Counter:
+    """Monotonically increasing count, optionally split by labels."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = _label_key(self.label_names, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(_label_key(self.label_names, labels), 0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.label_names, key)} {_format_value(v)}" for key, v in items]
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            items = sorted(self._values.items())
+        if not self.label_names:
+            return {"value": items[0][1] if items else 0}
+        return {"values": {",".join(key): v for key, v in items}}
+
+
+class Histogram:
+    """Distribution of observed values in cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._series: Dict[Tuple[str, ...], Dict] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = _label_key(self.label_names, labels)
+        with self._lock:
+            series = self._series.setdefault(key, {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0})
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["counts"][i] += 1
+                    break
+            series["sum"] += value
+            series["count"] += 1
+
+    def render(self) -> List[str]:
+        lines = []
+        with self._lock:
+            items = sorted((key, dict(s, counts=list(s["counts"]))) for key, s in self._series.items())
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series["counts"]):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, le)} {cumulative}")
+            labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series['sum'])}")
+            lines.append(f"{self.name}_count{labels} {series['count']}")
+        return lines
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            items = sorted(self._series.items())
+        result = {}
+        for key, series in items:
+            count = series["count"]
+            result[",".join(key) or "all"] = {
+                "count": count,
+                "sum": round(series["sum"], 3),
+                "avg": round(series["sum"] / count, 3) if count else None,
+                "buckets": {_format_value(b): c for b, c in zip(self.buckets, series["counts"]) if c},
+            }
+        return result
+
+
+class Gauge:
+    """Point-in-time value read from a callback when metrics are rendered."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, read: Callable[[], float]):
+        self.name = name
+        self.help = help_text
+        self.read = read
+
+    def _current(self) -> Optional[float]:
+        try:
+            return float(self.read())
+        except Exception:
+            return None
+
+    def render(self) -> List[str]:
+        value = self._current()
+        return [] if value is None else [f"{self.name} {_format_value(value)}"]
+
+    def snapshot(self) -> Dict:
+        return {"value": self._current()}
+
+
+class MetricsRegistry:
+    """Collection of metrics sharing a name prefix."""
+
+    def __init__(self, prefix: str = ""):
+        self.prefix = f"{prefix}_" if prefix else ""
+        self.started = time.time()
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(self.prefix + name, help_text, label_names))
+
+    def histogram(self, name: str, help_text: str, label_names: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(self.prefix + name, help_text, label_names, buckets))
+
+    def gauge(self, name: str, help_text: str, read: Callable[[], float]) -> Gauge:
+        return self._register(Gauge(self.prefix + name, help_text, read))
+
+    def render_prometheus(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict:
+        """All metrics as a JSON-serializable dict."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {
+            "time": time.time(),
+            "uptime": round(time.time() - self.started, 1),
+            "metrics": {metric.name: metric.snapshot() for metric in metrics},
+        }
+
+    def write_snapshot(self, path: Path) -> None:
+        """Atomically write snapshot() to a JSON file."""
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(self.snapshot(), indent=2))
+        tmp.replace(path)
+
+
+def start_metrics_server(registry: MetricsRegistry, port: int,
+                         host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """
+    Serve registry metrics over HTTP from a background thread.
+
+    GET /metrics returns the Prometheus text format, GET /metrics.json the
+    JSON snapshot.
+
+    Args:
+        registry: Metrics to expose
+        port: TCP port to listen on
+        host: Interface to bind (local only by default)
+
+    Returns:
+        The running server (call shutdown() to stop it)
+
+    Raises:
+        OSError: If the port cannot be bound
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = self.path.split("?", 1)[0]
+            if path in ("/", "/metrics"):
+                body = registry.render_prometheus().encode()
+                content_type = "text/plain; version=0.0.4; charset=utf-8"
+            elif path == "/metrics.json":
+                body = json.dumps(registry.snapshot(), indent=2).encode()
+                content_type = "application/json"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # Keep scrapes out of the monitor log
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
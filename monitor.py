@@ -10,30 +10,95 @@ Features:
 - Monitors thread replies to agent's messages
 - Batches all messages and sends to Claude in one prompt per cycle
 - Exponential backoff on rate limiting
+- Multi-agent mode: one channel fetch per cycle fanned out to every agent
+- Bounded worker pool: polling continues while Claude generates responses
+- Asyncio core: polling, thread scanning, dispatch, checkpointing and the
+  runtime limit run as separate tasks sharing one rate limiter
 
 Usage:
     python monitor.py              # Run with configured agent
     python monitor.py --agent nova # Run as specific agent
+    python monitor.py --agents all # Watch for all agents in one process
+    python monitor.py --agents nova,bolt
+    python monitor.py --supervise  # Run indefinitely, restarting on limits
 """
 
+import asyncio
+import fcntl
+import os
+import random
+import shlex
+import signal
 import subprocess
 import time
 import json
 import sys
 import re
+import threading
+from collections import OrderedDict
+from datetime import datetime
 from pathlib import Path
 
 # Import centralized agent configuration
 from agents_config import AGENTS
+from claude_runner import run_claude, record_run, stop_active_runs, ClaudeRunResult, STREAM_JSON_ARGS
+from metrics import MetricsRegistry, start_metrics_server
+from prompt_budget import PromptBudgetError, estimate_tokens, fit_sections
 
 # Configuration
 REPO_ROOT = Path(__file__).parent
-CONFIG_PATH = Path.home() / ".agent_settings.json"
+CONFIG_PATH = Path(os.environ.get("AGENT_SETTINGS_PATH", Path.home() / ".agent_settings.json"))  # Per-agent overlay under orchestrator --agents
 POLL_INTERVAL = 60  # base seconds
 POLL_JITTER = 5  # random jitter seconds
 MAX_RUNTIME = 60 * 60  # 60 minutes in seconds
-SEEN_MESSAGES_FILE = REPO_ROOT / ".seen_messages.json"
-AGENT_MESSAGES_FILE = REPO_ROOT / ".agent_messages.json"  # Track agent's own messages for thread monitoring
+MAX_MEMORY_MB = 512  # Resident memory that triggers a restart under --supervise
+LIMIT_CHECK_INTERVAL = 30  # Seconds between runtime/memory checks
+RESTART_EXIT_CODE = 75  # Exit status asking the supervisor for a restart
+RESTART_DELAY_MAX = 300  # Cap on the delay before restarting a crashed monitor
+FAST_FAILURE_SECONDS = 30  # A crash this soon after start counts as a fast failure
+MAX_FAST_FAILURES = 3  # Supervisor gives up after this many fast failures in a row
+STATE_DIR = Path(os.environ.get("MONITOR_STATE_DIR", REPO_ROOT))  # Where the state files below live
+SEEN_MESSAGES_FILE = STATE_DIR / ".seen_messages.json"
+AGENT_MESSAGES_FILE = STATE_DIR / ".agent_messages.json"  # Track agent's own messages for thread monitoring
+HANDOVER_FILE = STATE_DIR / ".monitor_handover.json"  # Poll cursor and backoff passed across restarts
+SESSIONS_FILE = STATE_DIR / ".monitor_sessions.json"  # Claude session IDs per agent
+CHANNEL_CACHE_FILE = Path(os.environ.get("CHANNEL_CACHE_FILE", STATE_DIR / ".channel_messages.json"))  # Latest channel window, shared with work schedulers
+CHANNEL_CACHE_MAX_AGE = 60  # Seconds a cached window is reused before Slack is asked again
+OUTBOX_FILE = Path(os.environ.get("SLACK_OUTBOX_FILE", REPO_ROOT / ".slack_outbox.jsonl"))  # Written by slack_interface.py say
+MAX_RESPONSE_ATTEMPTS = 3  # Times an unanswered message is sent to Claude
+MAX_CONCURRENCY = 2  # Claude batches running at once (protects the quota)
+MAX_BATCH_SIZE = 10  # Max messages sent to Claude in one batch
+BATCH_TOKEN_BUDGET = 6000  # Estimated prompt tokens of messages per batch
+BATCH_TARGET_LATENCY = 240  # Seconds a batch is expected to finish within
+BATCH_BASE_SECONDS = 20  # Initial estimate of Claude startup per batch
+BATCH_SECONDS_PER_MESSAGE = 15  # Initial estimate per message (learned at runtime)
+MESSAGE_OVERHEAD_TOKENS = 60  # Per-message prompt framing (headers, reply command)
+MONITOR_PROMPT_TOKEN_BUDGET = int(os.environ.get("MONITOR_PROMPT_TOKEN_BUDGET", "12000"))  # Whole batch prompt; context is dropped first
+PRIORITY_ORDER = "human,mention,age"  # Default pending-message ordering
+PRIORITY_AGING_SECONDS = 300  # Waiting this long promotes a message one priority step
+PRIORITY_AGING_MAX_STEPS = 3  # Cap on steps earned by waiting (enough to lift agent thread chatter to the top)
+
+# Prompt context configuration
+CONTEXT_MAX_MESSAGES = 8  # Prior messages embedded per pending message
+CONTEXT_MAX_CHARS = 300  # Per-message text trim in the context block
+THREAD_CACHE_SIZE = 50  # Threads kept in the replies cache
+CHECKPOINT_INTERVAL = 30  # Seconds between state checkpoints
+
+# Claude invocation watchdog (replaces the fixed 180s timeout)
+CLAUDE_IDLE_TIMEOUT = 90  # Kill a batch after this long without any output
+CLAUDE_MAX_RUNTIME = 600  # Hard cap for a single batch
+SHUTDOWN_TIMEOUT = 60  # Seconds running batches get to finish on stop/restart; then they are killed and retried next run
+SHUTDOWN_KILL_GRACE = 15  # Seconds to wait for killed batches to reconcile
+
+# Claude session reuse (rolling window: sessions are replaced when any limit is hit)
+SESSION_MAX_TURNS = 20  # Batches answered in one session
+SESSION_MAX_AGE = 6 * 60 * 60  # Seconds since the session was started
+SESSION_MAX_CONTEXT_TOKENS = 100_000  # Prompt tokens reported by the last turn
+
+# Metrics (Prometheus text on --metrics-port, JSON snapshot in METRICS_FILE)
+METRICS_PORT = 9108  # Local HTTP port for /metrics (0 disables)
+METRICS_FILE = STATE_DIR / ".monitor_metrics.json"
+METRICS_SNAPSHOT_INTERVAL = 60  # Seconds between JSON snapshots
 
 # Rate limiting configuration
 BACKOFF_INITIAL = 60  # Initial backoff: 1 minute
@@ -41,6 +106,21 @@ BACKOFF_MAX = 600  # Max backoff: 10 minutes
 BACKOFF_MULTIPLIER = 2  # Double the backoff each time
 
 
+METRICS = MetricsRegistry(prefix="monitor")
+SLACK_CALLS = METRICS.counter("slack_calls_total", "Slack API calls made for the monitor", ["method"])
+SLACK_RATE_LIMITED = METRICS.counter("slack_rate_limited_total", "Slack API calls rejected with a rate limit", ["method"])
+BACKOFFS = METRICS.counter("backoffs_total", "Rate-limit backoff periods started")
+POLL_SECONDS = METRICS.histogram("poll_duration_seconds", "Channel history fetch duration")
+THREAD_FETCHES = METRICS.counter("thread_fetches_total", "Thread reply lookups by source", ["source"])
+MESSAGES_QUEUED = METRICS.counter("messages_queued_total", "New messages queued for a response", ["agent", "type"])
+BATCH_SIZE = METRICS.histogram("batch_size_messages", "Messages per Claude batch", ["agent"],
+                               buckets=(1, 2, 3, 5, 8, 10, 15, 20))
+CLAUDE_SECONDS = METRICS.histogram("claude_run_seconds", "Claude batch wall time", ["agent", "outcome"])
+MENTION_LATENCY = METRICS.histogram("mention_latency_seconds",
+                                    "Time from a message being posted to its reply being confirmed", ["agent"])
+REPLIES = METRICS.counter("replies_total", "Messages sent to Claude by delivery outcome", ["agent", "status"])
+
+
 class RateLimitHandler:
     """Handles exponential backoff for rate limiting."""
     
@@ -53,6 +133,7 @@ class RateLimitHandler:
         """Called when a rate limit is encountered."""
         self.consecutive_rate_limits += 1
         self.last_rate_limit_time = time.time()
+        BACKOFFS.inc()
         
         if self.current_backoff == 0:
             self.current_backoff = BACKOFF_INITIAL
@@ -82,6 +163,27 @@ class RateLimitHandler:
             return 0
         elapsed = time.time() - self.last_rate_limit_time
         return max(0, self.current_backoff - elapsed)
+    
+    async def wait(self):
+        """Sleep until any active backoff period is over (shared by all monitor tasks)."""
+        while self.is_backing_off():
+            remaining = self.get_remaining_backoff()
+            print(f"⏳ Rate limit backoff: {remaining:.0f}s remaining...", flush=True)
+            await asyncio.sleep(remaining)
+    
+    def snapshot(self) -> dict:
+        """Backoff state for handing over to a restarted monitor."""
+        return {
+            "current_backoff": self.current_backoff,
+            "consecutive_rate_limits": self.consecutive_rate_limits,
+            "last_rate_limit_time": self.last_rate_limit_time,
+        }
+    
+    def restore(self, state: dict) -> None:
+        """Resume backoff state saved by snapshot()."""
+        self.current_backoff = state.get("current_backoff", 0)
+        self.consecutive_rate_limits = state.get("consecutive_rate_limits", 0)
+        self.last_rate_limit_time = state.get("last_rate_limit_time", 0)
 
 
 # Global rate limit handler
@@ -109,37 +211,109 @@ def load_seen_messages() -> set:
     return set()
 
 
+def seen_message_time(msg_id: str) -> float:
+    """
+    Epoch seconds of a seen-message ID, for pruning.
+    
+    IDs are Slack ts values ("1771000000.000100"); state saved by older
+    monitors used local "YYYY-MM-DD HH:MM:SS" strings, which would sort
+    after every ts as text.
+    """
+    try:
+        return float(msg_id)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return datetime.strptime(msg_id, "%Y-%m-%d %H:%M:%S").timestamp()
+    except (TypeError, ValueError):
+        return 0.0
+
+
 def save_seen_messages(seen: set):
     """Save seen message timestamps."""
     try:
-        # Keep only last 100 messages to prevent file from growing too large
-        recent = sorted(seen)[-100:]
+        # Keep only the newest 100 messages to prevent file from growing too large
+        recent = sorted(seen, key=seen_message_time)[-100:]
         SEEN_MESSAGES_FILE.write_text(json.dumps({"seen": recent}))
     except Exception as e:
         print(f"⚠️ Warning: Could not save seen messages: {e}", file=sys.stderr)
 
 
-def load_agent_messages() -> dict:
+def get_agent_messages_file(agent_id: str = None) -> Path:
+    """Get the thread-monitoring state file for an agent (legacy file if no agent given)."""
+    if not agent_id:
+        return AGENT_MESSAGES_FILE
+    return STATE_DIR / f".agent_messages_{agent_id}.json"
+
+
+def load_agent_messages(agent_id: str = None) -> dict:
     """Load agent's own message timestamps for thread monitoring."""
-    try:
-        if AGENT_MESSAGES_FILE.exists():
-            return json.loads(AGENT_MESSAGES_FILE.read_text())
-    except Exception:
-        pass
+    # Fall back to the legacy single-agent file so existing state carries over
+    for path in (get_agent_messages_file(agent_id), AGENT_MESSAGES_FILE):
+        try:
+            if path.exists():
+                return json.loads(path.read_text())
+        except Exception:
+            pass
     return {"messages": [], "seen_replies": []}
 
 
-def save_agent_messages(data: dict):
+def save_agent_messages(data: dict, agent_id: str = None):
     """Save agent's message timestamps."""
     try:
         # Keep only last 20 messages to monitor
         data["messages"] = data.get("messages", [])[-20:]
         data["seen_replies"] = data.get("seen_replies", [])[-100:]
-        AGENT_MESSAGES_FILE.write_text(json.dumps(data))
+        get_agent_messages_file(agent_id).write_text(json.dumps(data))
     except Exception as e:
         print(f"⚠️ Warning: Could not save agent messages: {e}", file=sys.stderr)
 
 
+def load_handover() -> dict:
+    """Load the cursors a previous monitor process left for its successor."""
+    try:
+        if HANDOVER_FILE.exists():
+            return json.loads(HANDOVER_FILE.read_text())
+    except Exception:
+        pass
+    return {}
+
+
+def save_handover(data: dict):
+    """Save cursors for the next monitor process."""
+    try:
+        tmp = HANDOVER_FILE.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data))
+        tmp.replace(HANDOVER_FILE)
+    except Exception as e:
+        print(f"⚠️ Warning: Could not save handover state: {e}", file=sys.stderr)
+
+
+def get_rss_mb() -> float:
+    """Current resident memory of this process in MB."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    # Peak rather than current RSS, but close enough where /proc is missing
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def format_duration(seconds: float) -> str:
+    """Format seconds as e.g. '2h 05m' or '4m 10s'."""
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    if hours:
+        return f"{hours}h {minutes:02d}m"
+    return f"{minutes}m {secs:02d}s"
+
+
 def is_rate_limited(output: str) -> bool:
     """Check if output indicates rate limiting."""
     rate_limit_indicators = [
@@ -213,6 +387,66 @@ def get_thread_replies(thread_ts: str) -> tuple[list, bool]:
         return [], False
 
 
+# Thread replies cache: thread_ts -> (latest_reply, replies)
+_thread_cache: "OrderedDict[str, tuple]" = OrderedDict()
+
+
+def get_thread_replies_cached(thread_ts: str, latest_reply: str = "") -> tuple[list, bool]:
+    """
+    Get thread replies, reusing the cached copy while the thread is unchanged.
+    
+    A thread is considered unchanged when its latest_reply timestamp matches
+    the one the cached replies were fetched for.
+    
+    Returns:
+        Tuple of (messages list, was_rate_limited bool)
+    """
+    cached = _thread_cache.get(thread_ts)
+    if cached and latest_reply and cached[0] == latest_reply:
+        _thread_cache.move_to_end(thread_ts)
+        THREAD_FETCHES.inc(source="cache")
+        return cached[1], False
+    
+    replies, was_rate_limited = get_thread_replies(thread_ts)
+    THREAD_FETCHES.inc(source="api")
+    SLACK_CALLS.inc(method="conversations.replies")
+    if was_rate_limited:
+        SLACK_RATE_LIMITED.inc(method="conversations.replies")
+    if replies:
+        _thread_cache[thread_ts] = (latest_reply, replies)
+        _thread_cache.move_to_end(thread_ts)
+        while len(_thread_cache) > THREAD_CACHE_SIZE:
+            _thread_cache.popitem(last=False)
+    return replies, was_rate_limited
+
+
+def trim_context(messages: list, limit: int = CONTEXT_MAX_MESSAGES) -> list:
+    """
+    Reduce messages (oldest first) to a compact context window.
+    
+    Keeps the most recent `limit` messages and truncates long texts.
+    """
+    context = []
+    for msg in messages[-limit:] if limit else []:
+        text = msg.get("text", "")
+        if len(text) > CONTEXT_MAX_CHARS:
+            text = text[:CONTEXT_MAX_CHARS] + "…"
+        context.append({
+            "user": msg.get("user", "Unknown"),
+            "timestamp": msg.get("timestamp", ""),
+            "text": text,
+        })
+    return context
+
+
+def format_context_block(context: list) -> str:
+    """Format prefetched context messages for embedding in a prompt."""
+    if not context:
+        return ""
+    lines = [f"   [{m['timestamp']}] {m['user']}: {m['text']}" for m in context]
+    return "\nContext (earlier messages, oldest first):\n" + "\n".join(lines)
+
+
 def get_last_messages_raw(limit: int = 10) -> tuple[list, bool]:
     """
     Get recent messages from Slack using Python API directly (includes reply_count).
@@ -265,6 +499,97 @@ except Exception as e:
         return [], False
 
 
+def save_channel_cache(raw_messages: list) -> None:
+    """Publish a freshly fetched channel window for other processes (see get_recent_messages_shared)."""
+    try:
+        tmp = CHANNEL_CACHE_FILE.with_name(f"{CHANNEL_CACHE_FILE.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({
+            "channel": load_config().get("default_channel", ""),
+            "fetched": time.time(),
+            "messages": raw_messages,
+        }))
+        tmp.replace(CHANNEL_CACHE_FILE)
+    except Exception as e:
+        print(f"⚠️ Warning: Could not save channel cache: {e}", file=sys.stderr)
+
+
+def load_channel_cache(max_age: float = CHANNEL_CACHE_MAX_AGE) -> list:
+    """The cached channel window, or None if missing, stale or for another channel."""
+    try:
+        data = json.loads(CHANNEL_CACHE_FILE.read_text())
+    except (OSError, json.JSONDecodeError):
+        return None
+    if data.get("channel", "") != load_config().get("default_channel", ""):
+        return None
+    if time.time() - data.get("fetched", 0) > max_age:
+        return None
+    return data.get("messages", [])
+
+
+def get_recent_messages_shared(limit: int = 20, max_age: float = CHANNEL_CACHE_MAX_AGE) -> list:
+    """
+    Recent channel messages, fetched at most once per max_age by all the
+    processes sharing CHANNEL_CACHE_FILE.
+    
+    The monitor publishes every window it polls, and work schedulers (one per
+    agent under orchestrator --agents) read it instead of each calling
+    conversations.history. When the cache is stale, the first caller fetches
+    under a file lock while the others wait and reuse its result.
+    
+    Args:
+        limit: Messages to fetch on a cache miss
+        max_age: Seconds a cached window counts as fresh
+    
+    Returns:
+        Raw Slack messages, newest first (empty if the fetch failed)
+    """
+    cached = load_channel_cache(max_age)
+    if cached is not None:
+        return cached
+    try:
+        lock = open(CHANNEL_CACHE_FILE.with_name(f"{CHANNEL_CACHE_FILE.name}.lock"), "a")
+    except OSError:
+        return get_last_messages_raw(limit)[0]
+    with lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        cached = load_channel_cache(max_age)
+        if cached is not None:
+            return cached
+        raw_messages, was_rate_limited = get_last_messages_raw(limit)
+        if not was_rate_limited:
+            save_channel_cache(raw_messages)
+        return raw_messages
+
+
+def normalize_raw_message(raw: dict) -> dict:
+    """
+    Convert a raw Slack API message into the dict shape used by the monitor.
+    
+    Mirrors how `slack_interface.py read` renders messages (display name for
+    bot posts, local time string), so a single raw fetch can serve both
+    mention detection and thread discovery.
+    """
+    user = raw.get("user", "") or raw.get("username", "") or "unknown"
+    if raw.get("bot_id") and raw.get("username"):
+        user = raw.get("username")
+    elif raw.get("user_profile"):
+        profile = raw["user_profile"]
+        user = profile.get("real_name") or profile.get("display_name") or profile.get("name") or user
+    
+    ts = raw.get("ts", "")
+    try:
+        timestamp = datetime.fromtimestamp(float(ts)).strftime('%Y-%m-%d %H:%M:%S')
+    except (TypeError, ValueError):
+        timestamp = ts
+    
+    return {
+        "user": user,
+        "text": raw.get("text", ""),
+        "timestamp": timestamp,
+        "ts": ts,
+    }
+
+
 def get_last_messages(limit: int = 10) -> tuple[list, bool]:
     """
     Get recent messages from Slack using slack_interface.py.
@@ -334,36 +659,230 @@ def get_last_messages(limit: int = 10) -> tuple[list, bool]:
         return [], False
 
 
+class MentionMatcher:
+    """
+    Precompiled matcher that finds every agent mentioned in a message in one pass.
+    
+    Built once from AGENTS: each agent's mention aliases become a named group in
+    a single case-insensitive regex alternation with word boundaries (so "nova"
+    matches but "novachrome" does not). Slack user-ID mentions (<@U123>) are
+    matched too when agent user IDs are known.
+    """
+    
+    def __init__(self, agents: dict, user_ids: dict = None):
+        """
+        Args:
+            agents: Agent definitions (agent_id -> config with "mentions")
+            user_ids: Optional dict mapping agent_id -> list of Slack user IDs
+        """
+        alternatives = []
+        for agent_id, agent in agents.items():
+            aliases = sorted({m.lower().lstrip("@") for m in agent.get("mentions", [])}, key=len, reverse=True)
+            if aliases:
+                pattern = "|".join(re.escape(a) for a in aliases)
+                alternatives.append(f"(?P<{agent_id}>(?<![\\w@])@?(?:{pattern})(?!\\w))")
+        self._pattern = re.compile("|".join(alternatives), re.IGNORECASE) if alternatives else None
+        
+        self._user_ids = {}
+        for agent_id, ids in (user_ids or {}).items():
+            for user_id in ids:
+                self._user_ids[user_id.upper()] = agent_id
+    
+    def match(self, text: str) -> set:
+        """Return the set of agent IDs mentioned in text."""
+        hits = set()
+        if not text:
+            return hits
+        if self._pattern:
+            for m in self._pattern.finditer(text):
+                hits.add(m.lastgroup)
+        if self._user_ids:
+            for user_id in re.findall(r"<@([A-Z0-9]+)(?:\|[^>]*)?>", text, re.IGNORECASE):
+                agent_id = self._user_ids.get(user_id.upper())
+                if agent_id:
+                    hits.add(agent_id)
+        return hits
+
+
+_mention_matcher = None
+
+
+def get_mention_matcher() -> MentionMatcher:
+    """
+    Get the shared mention matcher, building it on first use.
+    
+    Slack user IDs come from each agent's optional "slack_user_ids" entry and
+    the "agent_user_ids" mapping in ~/.agent_settings.json.
+    """
+    global _mention_matcher
+    if _mention_matcher is None:
+        user_ids = {agent_id: list(agent.get("slack_user_ids", [])) for agent_id, agent in AGENTS.items()}
+        for agent_id, ids in load_config().get("agent_user_ids", {}).items():
+            if agent_id in user_ids:
+                user_ids[agent_id] += [ids] if isinstance(ids, str) else list(ids)
+        _mention_matcher = MentionMatcher(AGENTS, user_ids)
+    return _mention_matcher
+
+
+def find_mentioned_agents(message: dict) -> set:
+    """
+    Return the IDs of all agents a message mentions, excluding its author.
+    
+    Scans the message text once for every agent.
+    """
+    hits = get_mention_matcher().match(message.get("text", ""))
+    user = message.get("user", "")
+    return {agent_id for agent_id in hits if not is_own_message(AGENTS[agent_id], user)}
+
+
+def is_own_message(agent: dict, user: str) -> bool:
+    """Check if a message author is the agent itself."""
+    return agent["name"].lower() in (user or "").lower()
+
+
 def check_for_mention(message: dict, agent: dict) -> bool:
     """Check if message mentions the agent."""
-    text = message.get("text", "").lower()
-    user = message.get("user", "").lower()
+    return agent["name"].lower() in find_mentioned_agents(message)
+
+
+class ClaudeSessions:
+    """
+    Persistent Claude sessions per agent, resumed by session ID.
     
-    # Don't respond to own messages
-    if agent["name"].lower() in user.lower():
-        return False
+    Each agent owns a few session slots (one per batch that can run at once).
+    A batch leases an idle slot, resumes its session with --resume and hands
+    the slot back with the session ID Claude reported. Slots roll over to a
+    fresh session after SESSION_MAX_TURNS batches, SESSION_MAX_AGE seconds or
+    SESSION_MAX_CONTEXT_TOKENS of context, keeping the context window bounded.
+    Slots are saved to SESSIONS_FILE so sessions survive monitor restarts.
+    """
+    
+    def __init__(self, path: Path = SESSIONS_FILE, max_turns: int = SESSION_MAX_TURNS,
+                 max_age: float = SESSION_MAX_AGE, max_context_tokens: int = SESSION_MAX_CONTEXT_TOKENS):
+        self.path = path
+        self.max_turns = max_turns
+        self.max_age = max_age
+        self.max_context_tokens = max_context_tokens
+        self._lock = threading.Lock()
+        self._leased = set()
+        self._slots = {}  # agent_id -> list of slot dicts
+        try:
+            if path.exists():
+                self._slots = json.loads(path.read_text())
+        except Exception:
+            pass
     
-    # Check for mentions
-    for mention in agent["mentions"]:
-        if mention.lower() in text:
-            return True
+    def _expired(self, slot: dict, now: float) -> bool:
+        return (slot.get("turns", 0) >= self.max_turns
+                or now - slot.get("started", now) >= self.max_age
+                or slot.get("context_tokens", 0) >= self.max_context_tokens)
+    
+    def lease(self, agent_id: str) -> dict:
+        """
+        Take an idle session slot for an agent.
+        
+        Returns:
+            Slot dict; its "id" is None when a fresh session must be started
+        """
+        now = time.time()
+        with self._lock:
+            slots = self._slots.setdefault(agent_id, [])
+            for slot in list(slots):
+                if id(slot) in self._leased:
+                    continue
+                if self._expired(slot, now):
+                    slots.remove(slot)
+                    continue
+                self._leased.add(id(slot))
+                return slot
+            slot = {"id": None, "turns": 0, "started": now, "context_tokens": 0}
+            slots.append(slot)
+            self._leased.add(id(slot))
+            return slot
+    
+    def release(self, agent_id: str, slot: dict, result=None) -> None:
+        """
+        Return a leased slot after a run.
+        
+        Args:
+            agent_id: Agent the slot belongs to
+            slot: Slot returned by lease()
+            result: ClaudeRunResult of the run (None if Claude could not be started)
+        """
+        with self._lock:
+            self._leased.discard(id(slot))
+            if result is not None and result.ok and result.session_id:
+                usage = (result.final or {}).get("usage", {})
+                slot["id"] = result.session_id
+                slot["turns"] = slot.get("turns", 0) + 1
+                slot["context_tokens"] = sum(usage.get(key, 0) for key in (
+                    "input_tokens", "cache_read_input_tokens", "cache_creation_input_tokens"))
+            else:
+                # A failed or killed run may have left the session unusable
+                self._slots[agent_id] = [s for s in self._slots.get(agent_id, []) if s is not slot]
+            self._save()
+    
+    def _save(self) -> None:
+        try:
+            self.path.write_text(json.dumps(self._slots))
+        except Exception as e:
+            print(f"⚠️ Warning: Could not save Claude sessions: {e}", file=sys.stderr)
+
+
+def build_stable_prompt(agent: dict) -> str:
+    """
+    Build the per-agent part of the monitor prompt that never changes.
     
-    return False
+    It is passed as an appended system prompt and must stay byte-identical
+    across calls (no counts, times or message data) so provider-side prompt
+    caching can reuse it.
+    """
+    agent_name = agent["name"]
+    agent_role = agent["role"]
+    agent_emoji = agent["emoji"]
+    agent_id = agent_name.lower()
+    return f"""You are {agent_name} {agent_emoji}, the {agent_role} on the Logo Creator project team.
+You are answering Slack messages on behalf of {agent_name}. Each request lists one or more messages.
+
+YOUR TASK:
+For EACH message:
+1. Compose a helpful, friendly response (1-3 sentences, sign off with {agent_emoji})
+2. Post it to Slack using the command shown for that message
+3. Move to the next message
+
+COMMANDS:
+- Reply in the channel: python slack_interface.py say -a {agent_id} --request-id <id> "message"
+- Reply in a thread: python slack_interface.py say -a {agent_id} --request-id <id> "message" -t <thread_ts>
+- Read more history (only if needed): python slack_interface.py read -l 20
+
+RULES:
+- Respond to ALL messages in a request - don't skip any!
+- Execute slack commands immediately, no confirmation needed
+- Keep responses concise and helpful
+- Stay in character as {agent_name} the {agent_role}
+- Do NOT ask for permission - just do it
+- For thread replies, use the -t flag with the thread_ts
+- Always keep the --request-id flag exactly as shown - it confirms which message you answered
+- Recent context is included with each message - only read more Slack history if it is not enough"""
 
 
-def run_batched_response(agent: dict, pending_messages: list) -> bool:
+def run_batched_response(agent: dict, pending_messages: list, sessions: ClaudeSessions = None) -> bool:
     """
     Send all pending messages to Claude in a single prompt.
     Claude will respond to all of them at once using slack_interface.py.
     
     Args:
         agent: Agent configuration dict
+        sessions: Session store to resume the agent's Claude session from
+            (None starts a fresh session for every batch)
         pending_messages: List of message dicts with keys:
             - user: Who sent the message
             - text: Message content
             - timestamp: When it was sent
             - thread_ts: Thread timestamp (if replying to a thread)
             - type: 'mention' or 'thread_reply'
+            - context: Optional prefetched earlier messages (see trim_context)
+            - request_id: Optional ID passed to `say --request-id` for delivery tracking
     
     Returns:
         True if Claude successfully processed the messages
@@ -372,275 +891,1155 @@ def run_batched_response(agent: dict, pending_messages: list) -> bool:
         return True
     
     agent_name = agent["name"]
-    agent_role = agent["role"]
     agent_emoji = agent["emoji"]
+    agent_id = agent_name.lower()
     
     # Build the messages list for the prompt
-    messages_text = ""
+    bodies, contexts = [], []
     for i, msg in enumerate(pending_messages, 1):
         msg_type = msg.get("type", "mention")
         thread_info = ""
+        # Thread reply IDs contain a local time with a space, so quote them for the shell
+        request_flag = f" --request-id {shlex.quote(msg['request_id'])}" if msg.get("request_id") else ""
         if msg.get("thread_ts"):
-            thread_info = f'\n   Thread: {msg["thread_ts"]} (reply with: python slack_interface.py say "message" -t {msg["thread_ts"]})'
+            thread_info = f'\n   Thread: {msg["thread_ts"]} (reply with: python slack_interface.py say -a {agent_id}{request_flag} "message" -t {msg["thread_ts"]})'
         else:
-            thread_info = '\n   Channel: main (reply with: python slack_interface.py say "message")'
+            thread_info = f'\n   Channel: main (reply with: python slack_interface.py say -a {agent_id}{request_flag} "message")'
         
-        messages_text += f"""
+        bodies.append(f"""
 --- Message {i} ({msg_type}) ---
 From: {msg.get('user', 'Unknown')}
 Time: {msg.get('timestamp', 'Unknown')}
-Text: {msg.get('text', '')}{thread_info}
-"""
+Text: {msg.get('text', '')}{thread_info}""")
+        contexts.append(format_context_block(msg.get('context', [])))
+    
+    def render(contexts: list) -> str:
+        # Only the messages vary between calls; identity and rules are in the stable prefix
+        messages_text = "".join(body + context + "\n" for body, context in zip(bodies, contexts))
+        return f"""You have {len(pending_messages)} new message(s) that need your response. Read ALL of them and respond to EACH ONE.
+{messages_text}
+Now respond to all {len(pending_messages)} message(s) by posting to Slack."""
+    
+    # Measure the prompt by section; drop context blocks (first message first) while over budget
+    stable_prompt = build_stable_prompt(agent)
+    identity = estimate_tokens(stable_prompt)
+    messages_tokens = estimate_tokens(render([""] * len(contexts)))
+    over = identity + messages_tokens + sum(estimate_tokens(c) for c in contexts if c) - MONITOR_PROMPT_TOKEN_BUDGET
+    dropped = 0
+    for i, context in enumerate(contexts):
+        if over <= 0 or MONITOR_PROMPT_TOKEN_BUDGET <= 0:
+            break
+        if context:
+            over -= estimate_tokens(context)
+            dropped += estimate_tokens(context)
+            contexts[i] = ""
+    prompt = render(contexts)
+    try:
+        _, ledger = fit_sections({"identity": identity, "messages": messages_tokens,
+                                  "context": estimate_tokens(prompt) - messages_tokens}, {}, MONITOR_PROMPT_TOKEN_BUDGET)
+    except PromptBudgetError as e:
+        if dropped:
+            e.ledger.trimmed["context"] = dropped
+        print(f"❌ {agent_name} batch prompt over budget, not sent to Claude: {e}", flush=True)
+        record_run("monitor", agent_id, ClaudeRunResult(is_error=True), messages=len(pending_messages),
+                   refused=True, **e.ledger.to_record())
+        return False
+    if dropped:
+        ledger.trimmed["context"] = dropped
+    
+    slot = sessions.lease(agent_id) if sessions else None
+    resume = slot.get("id") if slot else None
+    session_note = f"resuming session {resume[:8]}, turn {slot['turns'] + 1}" if resume else "new session"
+    print(f"\n{agent_emoji} Sending {len(pending_messages)} message(s) to Claude for batch response ({session_note})...", flush=True)
+    print(f"   Prompt: {ledger.describe()}", flush=True)
+    
+    def on_post(ts, succeeded):
+        # Report each Slack post as soon as Claude makes it
+        SLACK_CALLS.inc(method="chat.postMessage")
+        if succeeded:
+            print(f"  ✅ {agent_name} posted a reply {ts}", flush=True)
+        else:
+            print(f"  ⚠️ {agent_name} failed to post a reply", flush=True)
+    
+    args = ["--resume", resume] if resume else []
+    args += ["--append-system-prompt", stable_prompt, "-p", *STREAM_JSON_ARGS]
+    
+    result = None
+    try:
+        # Let Claude handle all responses, watching progress as it streams
+        result = run_claude(
+            args,
+            prompt=prompt,
+            idle_timeout=CLAUDE_IDLE_TIMEOUT,
+            max_runtime=CLAUDE_MAX_RUNTIME,
+            on_post=on_post,
+        )
+    except Exception as e:
+        print(f"⚠️ Error: {e}", flush=True)
+        return False
+    finally:
+        if slot is not None:
+            sessions.release(agent_id, slot, result)
+    
+    record_run("monitor", agent_id, result, messages=len(pending_messages), resumed=bool(resume),
+               **ledger.to_record())
+    outcome = "stalled" if result.stalled else "timeout" if result.timed_out else "ok" if result.ok else "error"
+    CLAUDE_SECONDS.observe(result.duration, agent=agent_id, outcome=outcome)
+    
+    if result.stalled:
+        print(f"⚠️ Claude batch response stalled (no progress for {CLAUDE_IDLE_TIMEOUT}s) - killed", flush=True)
+        return False
+    if result.timed_out:
+        print(f"⚠️ Claude batch response timed out after {CLAUDE_MAX_RUNTIME}s", flush=True)
+        return False
     
-    # Build the batched prompt
-    prompt = f"""You are {agent_name} {agent_emoji}, the {agent_role} on the Logo Creator project team.
+    if result.posts:
+        print(f"✅ Claude processed batch - {len(result.posts)}/{len(pending_messages)} replies posted in {result.duration:.1f}s", flush=True)
+        return True
+    elif result.ok:
+        # Delivery is confirmed per message against the outbox log afterwards
+        print(f"⚠️ Claude batch response (no posts detected): {result.output[:300]}...", flush=True)
+        return True
+    else:
+        print(f"⚠️ Claude batch response failed: {result.output[:300]}...", flush=True)
+        return False
 
-You have {len(pending_messages)} message(s) that need your response. Read ALL of them and respond to EACH ONE.
 
-{messages_text}
+def parse_agents_arg(value: str) -> list:
+    """Parse --agents value ("all" or comma-separated IDs) into a list of agent IDs."""
+    if value.strip().lower() == "all":
+        return list(AGENTS.keys())
+    agent_ids = [a.strip().lower() for a in value.split(",") if a.strip()]
+    invalid = [a for a in agent_ids if a not in AGENTS]
+    if invalid:
+        print(f"❌ Unknown agent(s): {', '.join(invalid)}", file=sys.stderr)
+        print(f"Available agents: {', '.join(AGENTS.keys())}", file=sys.stderr)
+        sys.exit(1)
+    return agent_ids
 
-YOUR TASK:
-For EACH message above:
-1. Compose a helpful, friendly response (1-3 sentences, sign off with {agent_emoji})
-2. Post it to Slack using the appropriate command shown for each message
-3. Move to the next message
 
-RULES:
-- Respond to ALL {len(pending_messages)} messages - don't skip any!
-- Execute slack commands immediately, no confirmation needed
-- Keep responses concise and helpful
-- Stay in character as {agent_name} the {agent_role}
-- Do NOT ask for permission - just do it
-- For thread replies, use the -t flag with the thread_ts
+def collect_channel_mentions(messages: list, agent_ids: list, seen_messages: set,
+                             scan_limit: int = 10) -> dict:
+    """
+    Fan new channel messages out to every agent they mention.
+    
+    Args:
+        messages: Normalized channel messages, newest first (see normalize_raw_message)
+        agent_ids: Agents being monitored
+        seen_messages: Set of already-processed message IDs (updated in place)
+        scan_limit: Only the newest scan_limit messages are checked for mentions;
+            the rest of the window is used as prompt context
+    
+    Returns:
+        Dict mapping agent_id -> list of pending message dicts
+    """
+    pending = {agent_id: [] for agent_id in agent_ids}
+    
+    for index, msg in enumerate(messages[:scan_limit]):
+        msg_id = msg.get("ts") or msg.get("timestamp", "")
+        
+        # Accept the legacy second-resolution key so upgraded state is honoured
+        if msg_id in seen_messages or msg.get("timestamp", "") in seen_messages:
+            continue
+        
+        seen_messages.add(msg_id)
+        
+        mentioned = find_mentioned_agents(msg)
+        for agent_id in agent_ids:
+            agent = AGENTS[agent_id]
+            if agent_id in mentioned:
+                print(f"  📬 New mention for {agent['name']} from {msg.get('user', 'Unknown')}: {msg.get('text', '')[:50]}...")
+                pending[agent_id].append({
+                    "request_id": f"{agent_id}:{msg_id}",
+                    "user": msg.get("user", "Unknown"),
+                    "text": msg.get("text", ""),
+                    "timestamp": msg.get("timestamp", ""),
+                    "ts": msg.get("ts", ""),
+                    "thread_ts": None,
+                    "type": "mention",
+                    "direct": True,
+                    "queued_at": time.time(),
+                    # Messages are newest first; older ones follow this one
+                    "context": trim_context(list(reversed(messages[index + 1:]))),
+                })
+    
+    return pending
 
-Now respond to all {len(pending_messages)} message(s) by posting to Slack."""
 
-    print(f"\n{agent_emoji} Sending {len(pending_messages)} message(s) to Claude for batch response...", flush=True)
+def select_active_threads(raw_messages: list, agent_ids: list, agent_states: dict,
+                          max_threads: int = 3) -> list:
+    """
+    Pick the threads worth fetching from a raw channel window.
     
-    try:
-        # Let Claude handle all responses
-        result = subprocess.run(
-            [str(REPO_ROOT / "claude-wrapper.sh"), "-c", "-p", prompt],
-            cwd=str(REPO_ROOT),
-            capture_output=True,
-            text=True,
-            timeout=180  # Give Claude more time for multiple messages
-        )
+    Args:
+        raw_messages: Raw channel messages (with reply_count/latest_reply)
+        agent_ids: Agents being monitored
+        agent_states: Dict mapping agent_id -> thread-monitoring state
+        max_threads: Max threads returned (fetched) per cycle
+    
+    Returns:
+        Raw parent messages of threads with replies some agent has not seen
+    """
+    threads = []
+    for raw_msg in raw_messages:
+        if len(threads) >= max_threads:  # Limit threads per cycle
+            break
+        if raw_msg.get("reply_count", 0) == 0:
+            continue
+        # Skip threads whose latest reply every agent has already seen
+        reply_key = f"{raw_msg.get('ts')}:{raw_msg.get('latest_reply', '')}"
+        if all(reply_key in agent_states[a].get("seen_replies", []) for a in agent_ids):
+            continue
+        threads.append(raw_msg)
+    return threads
+
+
+def collect_thread_replies(raw_msg: dict, replies: list, agent_ids: list,
+                           agent_states: dict) -> dict:
+    """
+    Fan new replies from one fetched thread out to interested agents.
+    
+    An agent is interested in a reply if the thread belongs to it or the reply
+    mentions it. Each thread is fetched at most once per cycle regardless of
+    how many agents are monitored.
+    
+    Args:
+        raw_msg: Raw parent message of the thread (see select_active_threads)
+        replies: Thread messages from get_thread_replies, parent first
+        agent_ids: Agents being monitored
+        agent_states: Dict mapping agent_id -> thread-monitoring state (updated in place)
+    
+    Returns:
+        Dict mapping agent_id -> list of pending message dicts
+    """
+    pending = {agent_id: [] for agent_id in agent_ids}
+    thread_ts = raw_msg.get("ts")
+    msg_user = raw_msg.get("user", "") or raw_msg.get("username", "")
+    reply_key = f"{thread_ts}:{raw_msg.get('latest_reply', '')}"
+    
+    # Scan each reply once for all agents
+    reply_mentions = [find_mentioned_agents(reply) for reply in replies]
+    
+    for agent_id in agent_ids:
+        agent = AGENTS[agent_id]
+        agent_data = agent_states[agent_id]
+        seen_replies = agent_data.setdefault("seen_replies", [])
         
-        # Check if Claude successfully posted
-        output = result.stdout + result.stderr
-        success_count = output.count("Message sent") + output.count("✅") + output.count("Timestamp:")
+        if reply_key in seen_replies:
+            continue
         
-        if success_count > 0:
-            print(f"✅ Claude processed batch - {success_count} response indicator(s) found", flush=True)
-            return True
-        else:
-            print(f"⚠️ Claude batch response (may have posted): {output[:300]}...", flush=True)
-            return True  # Assume success even if we can't confirm
+        # Check if this is agent's own thread
+        agent_thread_timestamps = set(m.get("ts") for m in agent_data.get("messages", []) if m.get("ts"))
+        is_agent_thread = is_own_message(agent, msg_user) or thread_ts in agent_thread_timestamps
+        
+        for index, (reply, mentioned) in enumerate(zip(replies, reply_mentions)):
+            if index == 0:  # Skip parent message
+                continue
+            reply_id = f"{thread_ts}:{reply.get('timestamp', '')}"
             
-    except subprocess.TimeoutExpired:
-        print("⚠️ Claude batch response timed out", flush=True)
-        return False
-    except Exception as e:
-        print(f"⚠️ Error: {e}", flush=True)
-        return False
+            if reply_id in seen_replies:
+                continue
+            
+            # Mark as seen
+            seen_replies.append(reply_id)
+            
+            # Skip agent's own messages
+            if is_own_message(agent, reply.get("user", "")):
+                continue
+            
+            if is_agent_thread or agent_id in mentioned:
+                print(f"  🧵 New thread reply for {agent['name']} from {reply.get('user', 'Unknown')}: {reply.get('text', '')[:50]}...")
+                pending[agent_id].append({
+                    "request_id": f"{agent_id}:{reply_id}",
+                    "user": reply.get("user", "Unknown"),
+                    "text": reply.get("text", ""),
+                    "timestamp": reply.get("timestamp", ""),
+                    "thread_ts": thread_ts,
+                    "type": "thread_reply",
+                    "direct": agent_id in mentioned,
+                    "queued_at": time.time(),
+                    "context": trim_context(replies[:index]),
+                })
+        
+        # Mark latest reply as seen
+        seen_replies.append(reply_key)
+    
+    return pending
 
 
-def main():
-    import argparse
-    import random
+class OutboxTracker:
+    """
+    Request IDs confirmed as answered in the outbox log, read incrementally.
     
-    parser = argparse.ArgumentParser(description='Agent Monitor - Watch Slack for mentions')
-    parser.add_argument('--agent', '-a', help='Agent to run as (default: from config)')
-    parser.add_argument('--interval', '-i', type=int, default=POLL_INTERVAL, help='Poll interval in seconds')
-    args = parser.parse_args()
+    Each refresh reads only the records appended since the last one. When
+    `slack_interface.py say` rotates the log to <log>.1, the rest of the old
+    file is read before starting on the new one, so no record is missed.
+    """
     
-    # Get agent from args or config
-    config = load_config()
-    agent_id = args.agent or config.get("default_agent", "").lower()
+    def __init__(self, path: Path = None):
+        self.path = path or OUTBOX_FILE
+        self.answered = set()
+        self.inode = None
+        self.offset = 0
+        self.lock = threading.Lock()  # Batches reconcile from worker threads
     
-    if not agent_id or agent_id not in AGENTS:
-        print("❌ No valid agent configured!", file=sys.stderr)
-        print(f"Available agents: {', '.join(AGENTS.keys())}", file=sys.stderr)
-        print("Set with: python slack_interface.py config --set-agent <name>", file=sys.stderr)
-        sys.exit(1)
+    def _read(self, path: Path, offset: int) -> int:
+        """Collect request IDs from complete lines after offset; returns the new offset."""
+        try:
+            with open(path, 'rb') as f:
+                f.seek(offset)
+                data = f.read()
+        except OSError:
+            return offset
+        end = data.rfind(b"\n") + 1  # A partially written last line waits for the next refresh
+        for line in data[:end].splitlines():
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get("request_id"):
+                self.answered.add(record["request_id"])
+        return offset + end
     
-    agent = AGENTS[agent_id]
+    def refresh(self) -> set:
+        """Read new outbox records and return every request ID answered so far."""
+        with self.lock:
+            try:
+                stat = self.path.stat()
+                inode, size = stat.st_ino, stat.st_size
+            except OSError:
+                inode, size = None, 0
+            if inode != self.inode:
+                rotated = self.path.with_name(f"{self.path.name}.1")
+                try:
+                    if self.inode is not None and rotated.stat().st_ino == self.inode:
+                        self._read(rotated, self.offset)
+                except OSError:
+                    pass
+                self.inode, self.offset = inode, 0
+            elif size < self.offset:
+                self.offset = 0  # Truncated in place
+            if inode is not None:
+                self.offset = self._read(self.path, self.offset)
+            return set(self.answered)
+
+
+OUTBOX = OutboxTracker()
+
+
+def run_tracked_batch(agent_id: str, messages: list, sessions: ClaudeSessions = None) -> list:
+    """
+    Run a batched response and reconcile it against the outbox log.
     
-    print(f"""
-╔══════════════════════════════════════════════════════════════╗
-║  {agent['emoji']} {agent['name']} Monitor - Watching for Slack mentions
-╠══════════════════════════════════════════════════════════════╣
-║  Agent: {agent['name']} ({agent['role']})
-║  Polling: Every {args.interval}s (+{POLL_JITTER}s jitter)
-║  Max runtime: {MAX_RUNTIME // 60} minutes
-║  Mentions: {', '.join(agent['mentions'])}
-║  Thread replies: ✅ Enabled
-║  Batch mode: ✅ Enabled (one Claude call per cycle)
-║  Rate limit backoff: ✅ Enabled ({BACKOFF_INITIAL}s-{BACKOFF_MAX}s)
-╚══════════════════════════════════════════════════════════════╝
-""", flush=True)
+    Messages already answered (e.g. by a batch that was killed after posting)
+    are dropped before calling Claude, so no LLM work is repeated.
     
-    seen_messages = load_seen_messages()
-    agent_data = load_agent_messages()
-    start_time = time.time()
-    print(f"📡 Starting monitor loop (max {MAX_RUNTIME // 60} minutes)...", flush=True)
+    Returns:
+        List of messages that were not confirmed as answered
+    """
+    answered = OUTBOX.refresh()
+    todo = [m for m in messages if m.get("request_id") not in answered]
+    if len(todo) < len(messages):
+        print(f"  ♻️ {len(messages) - len(todo)} message(s) for {AGENTS[agent_id]['name']} already answered", flush=True)
+    if not todo:
+        return []
     
-    try:
+    run_batched_response(AGENTS[agent_id], todo, sessions)
+    answered = OUTBOX.refresh()
+    
+    unanswered = [m for m in todo if m.get("request_id") not in answered]
+    now = time.time()
+    for msg in todo:
+        if msg.get("request_id") in answered:
+            REPLIES.inc(agent=agent_id, status="answered")
+            sent = MessagePrioritizer.message_time(msg)
+            if sent:
+                MENTION_LATENCY.observe(max(0.0, now - sent), agent=agent_id)
+        else:
+            REPLIES.inc(agent=agent_id, status="unanswered")
+    print(f"📬 {AGENTS[agent_id]['name']}: {len(todo) - len(unanswered)}/{len(todo)} message(s) confirmed answered", flush=True)
+    return unanswered
+
+
+def schedule_retries(agent_data: dict, unanswered: list, count_attempt: bool = True) -> None:
+    """
+    Queue unanswered messages for the next cycle, dropping exhausted ones.
+    
+    Args:
+        agent_data: Agent's thread-monitoring state (retries stored under "retry")
+        unanswered: Messages not confirmed as answered
+        count_attempt: False for messages that were never sent to Claude
+    """
+    retry = agent_data.setdefault("retry", [])
+    for msg in unanswered:
+        if not count_attempt:
+            retry.append(msg)
+            continue
+        attempts = msg.get("attempts", 0) + 1
+        if attempts >= MAX_RESPONSE_ATTEMPTS:
+            print(f"  ❌ Giving up on message from {msg.get('user', 'Unknown')} after {attempts} attempts", flush=True)
+            continue
+        retry.append({**msg, "attempts": attempts})
+
+
+class MessagePrioritizer:
+    """
+    Ranks pending messages so the most important ones get LLM time first.
+    
+    Ordering is configurable as a list of criteria, most significant first:
+        human   - messages from humans before messages from other agents
+        mention - direct mentions before thread chatter
+        age     - older messages before newer ones
+    
+    Aging keeps low-priority messages from starving: every `aging_seconds` a
+    message spends waiting promotes it by one priority step, up to
+    `max_aging_steps`. Steps apply to the criteria listed before "age" (all
+    of them if "age" is absent or last); with "age" first, the order is
+    plain oldest-first.
+    """
+    
+    CRITERIA = ("human", "mention", "age")
+    
+    def __init__(self, order: list = None, aging_seconds: float = PRIORITY_AGING_SECONDS,
+                 max_aging_steps: int = PRIORITY_AGING_MAX_STEPS):
+        """
+        Args:
+            order: Criteria names, most significant first (default: all, in CRITERIA order)
+            aging_seconds: Waiting time that earns one priority step (0 disables aging)
+            max_aging_steps: Most priority steps a message can earn by waiting
+        """
+        order = list(order) if order else list(self.CRITERIA)
+        invalid = [c for c in order if c not in self.CRITERIA]
+        if invalid:
+            raise ValueError(f"Unknown priority criteria: {', '.join(invalid)} (valid: {', '.join(self.CRITERIA)})")
+        self.order = order
+        self.aging_seconds = aging_seconds
+        self.max_aging_steps = max_aging_steps
+        self._agent_names = {agent["name"].lower() for agent in AGENTS.values()}
+    
+    @classmethod
+    def from_arg(cls, value: str, aging_seconds: float = PRIORITY_AGING_SECONDS) -> "MessagePrioritizer":
+        """Build from a comma-separated --priority value (e.g. "human,mention,age")."""
+        return cls([c.strip().lower() for c in value.split(",") if c.strip()], aging_seconds)
+    
+    def is_human(self, msg: dict) -> bool:
+        """Check whether a message was written by a human rather than an agent."""
+        return (msg.get("user") or "").lower() not in self._agent_names
+    
+    @staticmethod
+    def message_time(msg: dict) -> float:
+        """Best-known send time of a message (epoch seconds)."""
+        try:
+            return float(msg.get("ts") or "")
+        except ValueError:
+            pass
+        try:
+            return datetime.strptime(msg.get("timestamp", ""), '%Y-%m-%d %H:%M:%S').timestamp()
+        except ValueError:
+            return msg.get("queued_at", 0.0)
+    
+    def aging_steps(self, msg: dict, now: float) -> int:
+        """Priority steps a message has earned by waiting (capped at max_aging_steps)."""
+        if not self.aging_seconds:
+            return 0
+        waited = max(0.0, now - msg.get("queued_at", now))
+        return min(int(waited // self.aging_seconds), self.max_aging_steps)
+    
+    def flag(self, criterion: str, msg: dict) -> int:
+        """0 if the message comes first under a human/mention criterion, else 1."""
+        if criterion == "human":
+            return 0 if self.is_human(msg) else 1
+        return 0 if msg.get("direct", msg.get("type") == "mention") else 1
+    
+    def key(self, msg: dict, now: float = None) -> tuple:
+        """Sort key for a message (lower sorts first), built in criteria order."""
+        now = now or time.time()
+        # Criteria before "age" form one class score that waiting lowers
+        aged = self.order[:self.order.index("age")] if "age" in self.order else self.order
+        score = 0
+        for criterion in aged:
+            score = score * 2 + self.flag(criterion, msg)
+        key = [score - self.aging_steps(msg, now)] if aged else []
+        for criterion in self.order[len(aged):]:
+            key.append(self.message_time(msg) if criterion == "age" else self.flag(criterion, msg))
+        return tuple(key)
+    
+    def rank(self, messages: list, now: float = None) -> list:
+        """Return messages sorted most important first."""
+        now = now or time.time()
+        return sorted(messages, key=lambda m: self.key(m, now))
+
+
+def estimate_message_tokens(msg: dict) -> int:
+    """Estimated prompt tokens a pending message adds to a batch, context included."""
+    tokens = estimate_tokens(msg.get("text", "")) + MESSAGE_OVERHEAD_TOKENS
+    for ctx in msg.get("context", []):
+        tokens += estimate_tokens(ctx.get("text", "")) + 10
+    return tokens
+
+
+class BatchSizer:
+    """
+    Decides how many messages fit in one Claude batch.
+    
+    A batch is bounded by an estimated prompt-token budget and by expected
+    latency: seconds-per-message is learned from finished batches (EWMA) and
+    the batch is capped so it should finish within `target_latency`, well
+    inside the watchdog limits. Oversize bursts are therefore split into
+    several batches that the worker pool runs concurrently or in sequence.
+    """
+    
+    def __init__(self, token_budget: int = BATCH_TOKEN_BUDGET,
+                 target_latency: float = BATCH_TARGET_LATENCY,
+                 max_messages: int = MAX_BATCH_SIZE):
+        self.token_budget = token_budget
+        self.target_latency = target_latency
+        self.max_messages = max_messages
+        self.base_seconds = BATCH_BASE_SECONDS  # Startup cost of a Claude run
+        self.seconds_per_message = BATCH_SECONDS_PER_MESSAGE
+        self._lock = threading.Lock()
+    
+    def latency_cap(self) -> int:
+        """Max messages expected to finish within the target latency."""
+        with self._lock:
+            per_message = max(self.seconds_per_message, 1.0)
+            budget = self.target_latency - self.base_seconds
+        return max(1, int(budget // per_message))
+    
+    def record(self, messages: int, duration: float) -> None:
+        """Learn from a finished batch (EWMA of seconds per message)."""
+        if messages <= 0 or duration <= 0:
+            return
+        observed = max(0.0, duration - self.base_seconds) / messages
+        with self._lock:
+            self.seconds_per_message = 0.7 * self.seconds_per_message + 0.3 * observed
+    
+    def fill(self, groups: list) -> list:
+        """
+        Build a batch from thread groups, best first.
+        
+        Whole threads are added while they fit; a thread too large on its own
+        is split, taking its oldest messages first. The first message is always
+        taken so progress is guaranteed.
+        
+        Args:
+            groups: Lists of messages, one per thread, in priority order
+        
+        Returns:
+            Messages for the batch
+        """
+        limit = min(self.max_messages or self.latency_cap(), self.latency_cap())
+        batch, tokens = [], 0
+        for group in groups:
+            group_tokens = sum(estimate_message_tokens(m) for m in group)
+            if batch and (len(batch) + len(group) > limit or tokens + group_tokens > self.token_budget):
+                if len(group) <= limit and group_tokens <= self.token_budget:
+                    continue  # Whole thread fits in a later batch
+            for msg in group:
+                msg_tokens = estimate_message_tokens(msg)
+                if batch and (len(batch) >= limit or tokens + msg_tokens > self.token_budget):
+                    return batch
+                batch.append(msg)
+                tokens += msg_tokens
+        return batch
+
+
+def _thread_key(agent_id: str, msg: dict) -> tuple:
+    """Ordering key: replies within one (agent, thread) must stay in order."""
+    return (agent_id, msg.get("thread_ts") or "main")
+
+
+class ResponseDispatcher:
+    """
+    Bounded pool of asyncio workers that run batched Claude responses.
+    
+    Pending messages wait in a priority queue (see MessagePrioritizer). When a
+    worker frees up it takes the most important message whose thread is idle
+    and batches it with that agent's other runnable messages, whole threads
+    at a time, as far as the BatchSizer allows. At most `max_concurrency`
+    batches run at once, each in a thread (asyncio.to_thread), so the event
+    loop keeps polling while responses are generated and the Claude quota is
+    protected. Messages in the same (agent, thread) are never answered by two
+    batches at once, preserving per-thread reply order.
+    """
+    
+    def __init__(self, max_concurrency: int = MAX_CONCURRENCY, sessions: ClaudeSessions = None,
+                 prioritizer: MessagePrioritizer = None, sizer: BatchSizer = None):
+        self.sessions = sessions
+        self.max_concurrency = max(1, max_concurrency)
+        self.prioritizer = prioritizer or MessagePrioritizer()
+        self.sizer = sizer or BatchSizer()
+        self._pending = []  # List of (agent_id, message)
+        self._active_keys = set()
+        self._running = 0
+        self._unanswered = {}
+        self._closed = False
+        self._wakeup = None
+        self._workers = []
+    
+    def start(self) -> None:
+        """Start the worker tasks (must be called from the running event loop)."""
+        self._wakeup = asyncio.Event()
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"responder-{i}")
+            for i in range(self.max_concurrency)
+        ]
+    
+    def submit(self, agent_id: str, messages: list) -> None:
+        """Queue messages for an agent."""
+        if not messages:
+            return
+        now = time.time()
+        for msg in messages:
+            msg.setdefault("queued_at", now)
+            self._pending.append((agent_id, msg))
+        if self._wakeup:
+            self._wakeup.set()
+        print(f"\n📋 Queued {len(messages)} pending message(s) for {AGENTS[agent_id]['name']} ({self.queue_depth} waiting)", flush=True)
+    
+    @property
+    def queue_depth(self) -> int:
+        """Number of messages waiting for a worker."""
+        return len(self._pending)
+    
+    @property
+    def busy(self) -> int:
+        """Number of batches currently running."""
+        return self._running
+    
+    def _next_batch(self):
+        """Pop the next batch to run: (agent_id, messages, thread keys) or None."""
+        now = time.time()
+        runnable = [(a, m) for a, m in self._pending if _thread_key(a, m) not in self._active_keys]
+        if not runnable:
+            return None
+        runnable.sort(key=lambda item: self.prioritizer.key(item[1], now))
+        
+        # Group the chosen agent's runnable messages by thread, best thread first
+        agent_id = runnable[0][0]
+        groups = {}
+        for a, m in runnable:
+            if a == agent_id:
+                groups.setdefault(m.get("thread_ts") or "main", []).append(m)
+        ordered = [sorted(g, key=self.prioritizer.message_time) for g in groups.values()]
+        batch = self.sizer.fill(ordered)
+        chosen = {id(m) for m in batch}
+        self._pending = [(a, m) for a, m in self._pending if id(m) not in chosen]
+        return agent_id, batch, {_thread_key(agent_id, m) for m in batch}
+    
+    async def _worker(self):
         while True:
-            # Check if max runtime exceeded
-            elapsed = time.time() - start_time
-            if elapsed >= MAX_RUNTIME:
-                print(f"\n⏰ Max runtime ({MAX_RUNTIME // 60} minutes) reached. Stopping monitor.", flush=True)
-                break
-            
-            # Check if we're in a backoff period
-            if rate_limiter.is_backing_off():
-                remaining = rate_limiter.get_remaining_backoff()
-                print(f"⏳ Rate limit backoff: {remaining:.0f}s remaining...", flush=True)
-                time.sleep(min(remaining, 30))  # Sleep in chunks of max 30s
-                continue
+            item = None
+            while not self._closed:
+                item = self._next_batch()
+                if item:
+                    break
+                self._wakeup.clear()
+                await self._wakeup.wait()
+            if item is None:
+                return
+            agent_id, messages, keys = item
+            self._active_keys |= keys
+            self._running += 1
             
-            # Collect all pending messages for this cycle
-            pending_messages = []
+            BATCH_SIZE.observe(len(messages), agent=agent_id)
+            started = time.time()
+            try:
+                unanswered = await asyncio.to_thread(run_tracked_batch, agent_id, messages, self.sessions)
+            except Exception as e:
+                print(f"⚠️ Error responding for {AGENTS[agent_id]['name']}: {e}", flush=True)
+                unanswered = messages
+            if len(unanswered) < len(messages):
+                self.sizer.record(len(messages), time.time() - started)
             
-            # Get recent messages
-            messages, was_rate_limited = get_last_messages(10)
+            self._active_keys -= keys
+            self._running -= 1
+            if unanswered:
+                self._unanswered.setdefault(agent_id, []).extend(unanswered)
+            self._wakeup.set()
+    
+    def drain_unanswered(self) -> dict:
+        """Collect messages from finished batches that were not confirmed answered."""
+        unanswered, self._unanswered = self._unanswered, {}
+        return unanswered
+    
+    async def shutdown(self, timeout: float = None) -> dict:
+        """
+        Stop accepting work and wait for running batches to finish.
+        
+        Args:
+            timeout: Max seconds to wait for running batches (None = forever)
+        
+        Returns:
+            Dict mapping agent_id -> messages that were never sent to Claude
+        """
+        self._closed = True
+        unstarted = {}
+        for agent_id, msg in self._pending:
+            unstarted.setdefault(agent_id, []).append(msg)
+        self._pending = []
+        if self._wakeup:
+            self._wakeup.set()
+        if self._workers:
+            await asyncio.wait(self._workers, timeout=timeout)
+        return unstarted
+
+
+class Monitor:
+    """
+    Asyncio monitor core.
+    
+    Each stage runs as its own task on one event loop, so no stage's latency
+    stalls the others:
+    
+    - poll_channel: fetches the channel window every interval, queues new
+      mentions and hands the window to the thread scanner
+    - scan_threads: fetches active threads and queues new replies
+    - dispatch: feeds queued messages to the ResponseDispatcher worker pool
+    - checkpoint: persists seen messages and per-agent state periodically
+    - export_metrics: writes the metrics snapshot file periodically
+    - enforce_limits: stops the monitor after max_runtime seconds or when
+      resident memory exceeds max_memory_mb
+    
+    Stages communicate through asyncio queues and share the global
+    rate_limiter. Blocking work (Slack CLI subprocesses, Claude runs) is run
+    in threads with asyncio.to_thread.
+    
+    Cursors that are not part of the seen/agent state (last poll time, rate
+    limit backoff) are handed over through HANDOVER_FILE, so a restarted
+    monitor keeps the poll schedule instead of re-fetching immediately.
+    """
+    
+    def __init__(self, agent_ids: list, dispatcher: ResponseDispatcher,
+                 interval: float = POLL_INTERVAL, max_runtime: float = MAX_RUNTIME,
+                 max_memory_mb: float = None):
+        self.agent_ids = agent_ids
+        self.dispatcher = dispatcher
+        self.interval = interval
+        self.max_runtime = max_runtime
+        self.max_memory_mb = max_memory_mb
+        self.seen_messages = load_seen_messages()
+        self.agent_states = {agent_id: load_agent_messages(agent_id) for agent_id in agent_ids}
+        self.start_time = time.time()
+        self.handover = load_handover()
+        self.last_poll = self.handover.get("last_poll", 0)
+        self.limit_reached = None  # Why enforce_limits stopped the monitor
+        rate_limiter.restore(self.handover.get("rate_limit", {}))
+        
+        METRICS.gauge("queue_depth", "Messages waiting for a Claude worker", lambda: self.dispatcher.queue_depth)
+        METRICS.gauge("batches_running", "Claude batches currently running", lambda: self.dispatcher.busy)
+        METRICS.gauge("retries_pending", "Unanswered messages waiting for a retry",
+                      lambda: sum(len(s.get("retry", [])) for s in self.agent_states.values()))
+        METRICS.gauge("backoff_remaining_seconds", "Remaining rate-limit backoff", rate_limiter.get_remaining_backoff)
+        METRICS.gauge("uptime_seconds", "Seconds since this monitor process started", lambda: time.time() - self.start_time)
+        # Created in run() so they bind to the running loop
+        self.messages = None  # (agent_id, [pending message]) for dispatch
+        self.windows = None  # Raw channel windows for the thread scanner
+        self.stopping = None
+    
+    def stop(self, reason: str = "") -> None:
+        """Ask every task to wind down (safe to call more than once)."""
+        if self.stopping and not self.stopping.is_set():
+            if reason:
+                print(reason, flush=True)
+            self.stopping.set()
+    
+    def save_state(self) -> None:
+        """Persist seen messages, per-agent thread/retry state and handover cursors."""
+        save_seen_messages(self.seen_messages)
+        for agent_id, agent_data in self.agent_states.items():
+            save_agent_messages(agent_data, agent_id)
+        save_handover({
+            "saved_at": time.time(),
+            "last_poll": self.last_poll,
+            "rate_limit": rate_limiter.snapshot(),
+            "stop_reason": self.limit_reached,
+        })
+    
+    def collect_unanswered(self) -> None:
+        """Move messages finished batches did not answer into the retry lists."""
+        for agent_id, msgs in self.dispatcher.drain_unanswered().items():
+            schedule_retries(self.agent_states[agent_id], msgs)
+    
+    def enqueue(self, pending: dict) -> None:
+        """Queue pending messages for dispatch, one item per agent."""
+        for agent_id, msgs in pending.items():
+            if msgs:
+                for msg in msgs:
+                    MESSAGES_QUEUED.inc(agent=agent_id, type=msg.get("type", "mention"))
+                self.messages.put_nowait((agent_id, msgs))
+    
+    def requeue_retries(self) -> None:
+        """Queue messages that earlier batches did not answer for another attempt."""
+        self.collect_unanswered()
+        for agent_id in self.agent_ids:
+            retry = self.agent_states[agent_id].pop("retry", [])
+            if retry:
+                print(f"  🔁 Retrying {len(retry)} unanswered message(s) for {AGENTS[agent_id]['name']}", flush=True)
+                self.messages.put_nowait((agent_id, retry))
+    
+    def offer_window(self, raw_messages: list) -> None:
+        """Hand a channel window to the thread scanner, replacing a stale one."""
+        if self.windows.full():
+            self.windows.get_nowait()
+        self.windows.put_nowait(raw_messages)
+    
+    async def poll_channel(self) -> None:
+        # Keep the previous process's schedule rather than polling on start
+        resume_in = self.last_poll + self.interval - time.time()
+        if 0 < resume_in <= self.interval:
+            print(f"⏩ Resuming poll schedule: next fetch in {resume_in:.0f}s", flush=True)
+            await asyncio.sleep(resume_in)
+        
+        while True:
+            await rate_limiter.wait()
             
+            # One raw fetch per cycle serves both mention detection and thread discovery
+            started = time.time()
+            raw_messages, was_rate_limited = await asyncio.to_thread(get_last_messages_raw, 20)
+            POLL_SECONDS.observe(time.time() - started)
+            SLACK_CALLS.inc(method="conversations.history")
             if was_rate_limited:
-                backoff_time = rate_limiter.on_rate_limit()
-                time.sleep(min(backoff_time, 30))
+                SLACK_RATE_LIMITED.inc(method="conversations.history")
+                rate_limiter.on_rate_limit()
                 continue
-            else:
-                rate_limiter.on_success()
+            rate_limiter.on_success()
+            self.last_poll = time.time()
+            save_channel_cache(raw_messages)
             
-            print(f"📨 Got {len(messages)} messages", flush=True)
+            print(f"📨 Got {len(raw_messages)} messages", flush=True)
             
-            # Check for new mentions in main channel
-            for msg in messages:
-                msg_id = msg.get("timestamp", "")
-                
-                if msg_id in seen_messages:
-                    continue
-                
-                seen_messages.add(msg_id)
-                
-                if check_for_mention(msg, agent):
-                    print(f"  📬 New mention from {msg.get('user', 'Unknown')}: {msg.get('text', '')[:50]}...")
-                    pending_messages.append({
-                        "user": msg.get("user", "Unknown"),
-                        "text": msg.get("text", ""),
-                        "timestamp": msg.get("timestamp", ""),
-                        "thread_ts": None,
-                        "type": "mention"
-                    })
+            # Check for new mentions in main channel (newest 10, as before);
+            # the whole window doubles as prefetched prompt context
+            messages = [normalize_raw_message(m) for m in raw_messages]
+            self.enqueue(collect_channel_mentions(messages, self.agent_ids, self.seen_messages))
+            self.requeue_retries()
             
             # Check for thread replies (only if not rate limited recently)
             if rate_limiter.consecutive_rate_limits == 0:
-                raw_messages, was_rate_limited = get_last_messages_raw(20)
-                
-                if was_rate_limited:
-                    backoff_time = rate_limiter.on_rate_limit()
-                    save_seen_messages(seen_messages)
-                    save_agent_messages(agent_data)
-                    time.sleep(min(backoff_time, 30))
-                    continue
-                
-                # Get list of agent's own thread timestamps
-                agent_thread_timestamps = set(m.get("ts") for m in agent_data.get("messages", []) if m.get("ts"))
-                
-                threads_checked = 0
-                for raw_msg in raw_messages:
-                    if threads_checked >= 3:  # Limit threads per cycle
-                        break
-                    
-                    reply_count = raw_msg.get("reply_count", 0)
-                    if reply_count == 0:
-                        continue
-                    
-                    thread_ts = raw_msg.get("ts")
-                    latest_reply = raw_msg.get("latest_reply", "")
-                    
-                    # Check if this is agent's own thread
-                    msg_user = raw_msg.get("user", "") or raw_msg.get("username", "")
-                    is_agent_thread = (
-                        agent["name"].lower() in msg_user.lower() or
-                        thread_ts in agent_thread_timestamps
-                    )
-                    
-                    # Check if we've seen this latest reply
-                    reply_key = f"{thread_ts}:{latest_reply}"
-                    if reply_key in agent_data.get("seen_replies", []):
-                        continue
-                    
-                    # Get thread replies
-                    if rate_limiter.is_backing_off():
-                        break
-                    
-                    replies, was_rate_limited = get_thread_replies(thread_ts)
-                    threads_checked += 1
-                    
-                    if was_rate_limited:
-                        rate_limiter.on_rate_limit()
-                        break
-                    
-                    # Check each reply
-                    for reply in replies[1:]:  # Skip parent message
-                        reply_id = f"{thread_ts}:{reply.get('timestamp', '')}"
-                        
-                        if reply_id in agent_data.get("seen_replies", []):
-                            continue
-                        
-                        # Skip agent's own messages
-                        if agent["name"].lower() in reply.get("user", "").lower():
-                            agent_data.setdefault("seen_replies", []).append(reply_id)
-                            continue
-                        
-                        # Check if should respond
-                        reply_text = reply.get("text", "").lower()
-                        is_mention = any(m.lower() in reply_text for m in agent["mentions"])
-                        should_respond = is_agent_thread or is_mention
-                        
-                        if should_respond:
-                            print(f"  🧵 New thread reply from {reply.get('user', 'Unknown')}: {reply.get('text', '')[:50]}...")
-                            pending_messages.append({
-                                "user": reply.get("user", "Unknown"),
-                                "text": reply.get("text", ""),
-                                "timestamp": reply.get("timestamp", ""),
-                                "thread_ts": thread_ts,
-                                "type": "thread_reply"
-                            })
-                        
-                        # Mark as seen
-                        agent_data.setdefault("seen_replies", []).append(reply_id)
-                    
-                    # Mark latest reply as seen
-                    agent_data.setdefault("seen_replies", []).append(reply_key)
-            
-            # Process all pending messages in one batch
-            if pending_messages:
-                print(f"\n📋 Processing {len(pending_messages)} pending message(s) in batch...", flush=True)
-                run_batched_response(agent, pending_messages)
-            
-            # Save state
-            save_seen_messages(seen_messages)
-            save_agent_messages(agent_data)
+                self.offer_window(raw_messages)
             
             # Wait for next poll
-            jitter = random.uniform(0, POLL_JITTER)
-            sleep_time = args.interval + jitter
-            
+            sleep_time = self.interval + random.uniform(0, POLL_JITTER)
             if rate_limiter.consecutive_rate_limits > 0:
                 sleep_time += BACKOFF_INITIAL / 2
                 print(f"💤 Extended sleep due to recent rate limits: {sleep_time:.0f}s", flush=True)
-            
-            time.sleep(sleep_time)
-            
+            await asyncio.sleep(sleep_time)
+    
+    async def scan_threads(self) -> None:
+        while True:
+            raw_messages = await self.windows.get()
+            for raw_msg in select_active_threads(raw_messages, self.agent_ids, self.agent_states):
+                if rate_limiter.is_backing_off():
+                    break
+                replies, was_rate_limited = await asyncio.to_thread(
+                    get_thread_replies_cached, raw_msg.get("ts"), raw_msg.get("latest_reply", ""))
+                if was_rate_limited:
+                    rate_limiter.on_rate_limit()
+                    break
+                self.enqueue(collect_thread_replies(raw_msg, replies, self.agent_ids, self.agent_states))
+    
+    async def dispatch(self) -> None:
+        while True:
+            agent_id, msgs = await self.messages.get()
+            self.dispatcher.submit(agent_id, msgs)
+    
+    async def checkpoint(self) -> None:
+        while True:
+            await asyncio.sleep(CHECKPOINT_INTERVAL)
+            self.collect_unanswered()
+            self.save_state()
+    
+    def write_metrics(self) -> None:
+        """Write the metrics snapshot file."""
+        try:
+            METRICS.write_snapshot(METRICS_FILE)
+        except OSError as e:
+            print(f"⚠️ Warning: Could not write metrics snapshot: {e}", file=sys.stderr)
+    
+    async def export_metrics(self) -> None:
+        while True:
+            await asyncio.sleep(METRICS_SNAPSHOT_INTERVAL)
+            self.write_metrics()
+    
+    async def enforce_limits(self) -> None:
+        while True:
+            if time.time() - self.start_time >= self.max_runtime:
+                self.limit_reached = "runtime"
+                self.stop(f"\n⏰ Max runtime ({self.max_runtime // 60:.0f} minutes) reached. Stopping monitor.")
+                return
+            if self.max_memory_mb:
+                rss = get_rss_mb()
+                if rss >= self.max_memory_mb:
+                    self.limit_reached = "memory"
+                    self.stop(f"\n🧠 Memory use {rss:.0f}MB reached the {self.max_memory_mb:.0f}MB limit. Stopping monitor.")
+                    return
+            remaining = self.max_runtime - (time.time() - self.start_time)
+            await asyncio.sleep(max(0, min(LIMIT_CHECK_INTERVAL, remaining)))
+    
+    async def _guard(self, name: str, coro) -> None:
+        """Run a stage; a crash stops the whole monitor instead of dying silently."""
+        try:
+            await coro
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.stop(f"❌ Monitor task '{name}' failed: {e}")
+    
+    async def run(self) -> str:
+        """
+        Run all stages until a limit or a stop signal, then shut down cleanly.
+        
+        Returns:
+            "runtime" or "memory" if a limit was reached, None if stopped by a signal
+        """
+        self.messages = asyncio.Queue()
+        self.windows = asyncio.Queue(maxsize=1)
+        self.stopping = asyncio.Event()
+        
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.stop, "\n\n👋 Monitor stopped")
+            except (NotImplementedError, RuntimeError):
+                pass  # Not supported here; KeyboardInterrupt is handled in main()
+        
+        self.dispatcher.start()
+        stages = {
+            "poll_channel": self.poll_channel(),
+            "scan_threads": self.scan_threads(),
+            "dispatch": self.dispatch(),
+            "checkpoint": self.checkpoint(),
+            "export_metrics": self.export_metrics(),
+            "enforce_limits": self.enforce_limits(),
+        }
+        tasks = [asyncio.create_task(self._guard(name, coro), name=name) for name, coro in stages.items()]
+        
+        try:
+            await self.stopping.wait()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await self.shutdown()
+        return self.limit_reached
+    
+    async def shutdown(self) -> None:
+        """
+        Finish running batches and keep everything unanswered for the next run.
+        
+        Batches get SHUTDOWN_TIMEOUT seconds; any still running are killed so
+        their worker threads return (asyncio.run waits for them on exit), and
+        whatever they had not answered is retried by the next run.
+        """
+        while not self.messages.empty():
+            agent_id, msgs = self.messages.get_nowait()
+            schedule_retries(self.agent_states[agent_id], msgs, count_attempt=False)
+        if self.dispatcher.busy:
+            print(f"⏳ Waiting up to {SHUTDOWN_TIMEOUT}s for {self.dispatcher.busy} running batch(es) to finish...", flush=True)
+        unstarted = await self.dispatcher.shutdown(timeout=SHUTDOWN_TIMEOUT)
+        if self.dispatcher.busy:
+            killed = await asyncio.to_thread(stop_active_runs)
+            print(f"⏹️ Stopped {killed} Claude run(s) still going; their messages will be retried", flush=True)
+            await self.dispatcher.shutdown(timeout=SHUTDOWN_KILL_GRACE)
+        for agent_id, msgs in unstarted.items():
+            schedule_retries(self.agent_states[agent_id], msgs, count_attempt=False)
+        self.collect_unanswered()
+        self.save_state()
+        self.write_metrics()
+
+
+def supervise(child_args: list) -> None:
+    """
+    Keep the monitor running indefinitely.
+    
+    The monitor runs as a child process. When it reaches its runtime or
+    memory limit it checkpoints its state and exits with RESTART_EXIT_CODE,
+    and a fresh child picks up from the handover. Crashes are restarted with
+    an increasing delay; a child stopped by a signal ends the supervisor.
+    
+    Args:
+        child_args: Command-line arguments for each monitor process
+    """
+    started = time.time()
+    restarts = 0
+    crash_delay = 0
+    fast_failures = 0
+    child = None
+    stopping = False
+    
+    def forward_signal(signum, frame):
+        nonlocal stopping
+        stopping = True
+        if child and child.poll() is None:
+            child.send_signal(signum)
+    
+    signal.signal(signal.SIGTERM, forward_signal)
+    print(f"🛡️ Supervisor started (pid {os.getpid()}); monitor restarts on limits instead of exiting", flush=True)
+    
+    while True:
+        env = {
+            **os.environ,
+            "MONITOR_SUPERVISED": "1",
+            "MONITOR_RESTARTS": str(restarts),
+            "MONITOR_SUPERVISOR_STARTED": str(started),
+        }
+        child_started = time.time()
+        child = subprocess.Popen([sys.executable, str(Path(__file__).resolve()), *child_args], env=env)
+        try:
+            code = child.wait()
+        except KeyboardInterrupt:
+            # The child got the same SIGINT and is shutting down gracefully
+            stopping = True
+            try:
+                code = child.wait()
+            except KeyboardInterrupt:
+                print("\n⏹️ Interrupted again; killing the monitor", flush=True)
+                child.kill()
+                code = child.wait()
+        
+        if stopping or code == 0:
+            break
+        
+        restarts += 1
+        uptime = format_duration(time.time() - started)
+        if code == RESTART_EXIT_CODE:
+            crash_delay = 0
+            fast_failures = 0
+            print(f"\n🔄 Restarting monitor (restart #{restarts}, supervisor uptime {uptime})", flush=True)
+            continue
+        
+        if time.time() - child_started < FAST_FAILURE_SECONDS:
+            fast_failures += 1
+            if fast_failures >= MAX_FAST_FAILURES:
+                print(f"❌ Monitor failed {fast_failures} times right after starting (exit {code}); giving up", flush=True)
+                break
+        else:
+            fast_failures = 0
+        crash_delay = min(max(crash_delay * 2, 5), RESTART_DELAY_MAX)
+        print(f"\n💥 Monitor exited with code {code}; restart #{restarts} in {crash_delay}s (supervisor uptime {uptime})", flush=True)
+        try:
+            # Short sleeps so a SIGTERM (which only sets `stopping`) ends the wait too
+            restart_at = time.time() + crash_delay
+            while not stopping and time.time() < restart_at:
+                time.sleep(min(1.0, restart_at - time.time()))
+        except KeyboardInterrupt:
+            stopping = True
+        if stopping:
+            break
+    
+    print(f"\n📊 Supervisor stopped after {format_duration(time.time() - started)} with {restarts} restart(s)", flush=True)
+
+
+def main():
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Agent Monitor - Watch Slack for mentions')
+    parser.add_argument('--agent', '-a', help='Agent to run as (default: from config)')
+    parser.add_argument('--agents', help='Monitor several agents in one process ("all" or comma-separated IDs)')
+    parser.add_argument('--interval', '-i', type=int, default=POLL_INTERVAL, help='Poll interval in seconds')
+    parser.add_argument('--max-concurrency', '-j', type=int, default=MAX_CONCURRENCY,
+                        help=f'Max Claude batches running at once (default: {MAX_CONCURRENCY})')
+    parser.add_argument('--batch-size', type=int, default=MAX_BATCH_SIZE,
+                        help=f'Max messages per Claude batch (default: {MAX_BATCH_SIZE})')
+    parser.add_argument('--batch-tokens', type=int, default=BATCH_TOKEN_BUDGET,
+                        help=f'Estimated prompt-token budget per batch (default: {BATCH_TOKEN_BUDGET})')
+    parser.add_argument('--priority', default=PRIORITY_ORDER,
+                        help=f'Pending message ordering, most significant first (default: {PRIORITY_ORDER})')
+    parser.add_argument('--aging', type=float, default=PRIORITY_AGING_SECONDS,
+                        help=f'Seconds of waiting that promote a message one priority step (default: {PRIORITY_AGING_SECONDS}, 0 disables)')
+    parser.add_argument('--fresh-sessions', action='store_true',
+                        help='Start a new Claude session for every batch instead of resuming per-agent sessions')
+    parser.add_argument('--metrics-port', type=int, default=int(os.environ.get("MONITOR_METRICS_PORT", METRICS_PORT)),
+                        help=f'Local port serving Prometheus metrics at /metrics (default: {METRICS_PORT}, 0 disables)')
+    parser.add_argument('--supervise', action='store_true',
+                        help='Keep the monitor alive indefinitely, restarting it gracefully on limits')
+    parser.add_argument('--max-runtime', type=float, default=MAX_RUNTIME / 60,
+                        help=f'Minutes before the monitor stops (or restarts under --supervise) (default: {MAX_RUNTIME // 60})')
+    parser.add_argument('--max-memory', type=float, default=MAX_MEMORY_MB,
+                        help=f'Resident MB that triggers a restart under --supervise (default: {MAX_MEMORY_MB})')
+    args = parser.parse_args()
+    
+    if args.supervise:
+        supervise([a for a in sys.argv[1:] if a != '--supervise'])
+        return
+    
+    supervised = os.environ.get("MONITOR_SUPERVISED") == "1"
+    max_runtime = args.max_runtime * 60
+    
+    try:
+        prioritizer = MessagePrioritizer.from_arg(args.priority, args.aging)
+    except ValueError as e:
+        parser.error(str(e))
+    
+    if args.agents:
+        agent_ids = parse_agents_arg(args.agents)
+    else:
+        # Get agent from args or config
+        config = load_config()
+        agent_id = (args.agent or config.get("default_agent", "")).lower()
+        
+        if not agent_id or agent_id not in AGENTS:
+            print("❌ No valid agent configured!", file=sys.stderr)
+            print(f"Available agents: {', '.join(AGENTS.keys())}", file=sys.stderr)
+            print("Set with: python slack_interface.py config --set-agent <name>", file=sys.stderr)
+            sys.exit(1)
+        agent_ids = [agent_id]
+    
+    multi_agent = len(agent_ids) > 1
+    agents = [AGENTS[a] for a in agent_ids]
+    title_emoji = "🤖" if multi_agent else agents[0]["emoji"]
+    title_name = "Team" if multi_agent else agents[0]["name"]
+    
+    print(f"""
+╔══════════════════════════════════════════════════════════════╗
+║  {title_emoji} {title_name} Monitor - Watching for Slack mentions
+╠══════════════════════════════════════════════════════════════╣
+║  Agents: {', '.join(f"{a['name']} ({a['role']})" for a in agents)}
+║  Polling: Every {args.interval}s (+{POLL_JITTER}s jitter)
+║  Max runtime: {max_runtime / 60:.0f} minutes{" (then restart)" if supervised else ""}
+║  Mentions: {', '.join(m for a in agents for m in a['mentions'])}
+║  Thread replies: ✅ Enabled
+║  Batch mode: ✅ Enabled (one Claude call per agent per cycle)
+║  Sessions: {"🆕 Fresh per batch" if args.fresh_sessions else f"✅ Resumed per agent (≤{SESSION_MAX_TURNS} turns each)"}
+║  Worker pool: ✅ Up to {args.max_concurrency} concurrent Claude batch(es)
+║  Batch size: ≤{args.batch_size} messages, ≤{args.batch_tokens} tokens, ~{BATCH_TARGET_LATENCY}s
+║  Priority: {' > '.join(prioritizer.order)} (aging every {args.aging:.0f}s)
+║  Rate limit backoff: ✅ Enabled ({BACKOFF_INITIAL}s-{BACKOFF_MAX}s)
+╚══════════════════════════════════════════════════════════════╝
+""", flush=True)
+    
+    if supervised:
+        restarts = int(os.environ.get("MONITOR_RESTARTS", "0"))
+        started = float(os.environ.get("MONITOR_SUPERVISOR_STARTED", time.time()))
+        print(f"🛡️ Supervised: restart #{restarts}, uptime {format_duration(time.time() - started)}, "
+              f"memory limit {args.max_memory:.0f}MB", flush=True)
+    
+    if args.metrics_port:
+        try:
+            start_metrics_server(METRICS, args.metrics_port)
+            print(f"📈 Metrics: http://127.0.0.1:{args.metrics_port}/metrics (snapshot: {METRICS_FILE.name})", flush=True)
+        except OSError as e:
+            print(f"⚠️ Metrics endpoint disabled (port {args.metrics_port}: {e}); snapshot still written to {METRICS_FILE.name}", flush=True)
+    
+    sizer = BatchSizer(args.batch_tokens, max_messages=args.batch_size)
+    sessions = None if args.fresh_sessions else ClaudeSessions()
+    dispatcher = ResponseDispatcher(args.max_concurrency, sessions, prioritizer, sizer)
+    monitor = Monitor(agent_ids, dispatcher, interval=args.interval, max_runtime=max_runtime,
+                      max_memory_mb=args.max_memory if supervised else None)
+    
+    print(f"📡 Starting monitor loop (max {max_runtime / 60:.0f} minutes)...", flush=True)
+    
+    try:
+        limit_reached = asyncio.run(monitor.run())
     except KeyboardInterrupt:
         print("\n\n👋 Monitor stopped")
-        save_seen_messages(seen_messages)
-        save_agent_messages(agent_data)
+        monitor.save_state()
+        return
+    
+    if supervised and limit_reached:
+        sys.exit(RESTART_EXIT_CODE)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -10,113 +10,218 @@ Usage:
     python orchestrator.py --task "Do X"      # Run single task
     python orchestrator.py --list             # List all agents
     python orchestrator.py --test             # Run capability tests
+    python orchestrator.py --agents all       # Run the whole team on this host
 
 When run without --task, starts two parallel processes:
-  1. Work mode: Claude agent does work (check Slack, sync, update memory)
+  1. Work mode: Claude agent does work (check Slack, sync, update memory),
+     re-run in a loop: every 15 minutes while cycles change something, backing
+     off when they don't, and early when an issue is assigned or the agent is
+     mentioned in Slack (--once runs a single cycle)
   2. Monitor mode: Watches for Slack mentions and responds (45s + 5s jitter)
+
+With --agents, a supervisor runs one orchestrator child process per agent,
+each with its own lock, working directory (.agents/<agent>/), git clone of
+the repo (.agents/<agent>/repo/) and settings overlay, and caps how many
+Claude runs the whole team has going at once.
 """
 
 import subprocess
 import argparse
+import fcntl
+import hashlib
 import json
+import os
+import signal
 import sys
 import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass
 from pathlib import Path
 from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
 
 # Import centralized agent configuration
 from agents_config import AGENTS
+from claude_runner import run_claude, record_run, format_event, find_claude, ClaudeRunResult, STREAM_JSON_ARGS
+from task_graph import TaskGraph, PRD_OWNER, format_tasks
+from memory_compactor import compact_memory
+from doc_excerpts import build_query, excerpt_doc
+from prompt_budget import PromptLedger, PromptBudgetError, estimate_tokens, fit_sections
 
 REPO_ROOT = Path(__file__).parent
-CONFIG_PATH = Path.home() / ".agent_settings.json"
-LOCK_FILE = REPO_ROOT / ".orchestrator.lock"
-
-
-def check_single_instance():
+CONFIG_PATH = Path(os.environ.get("AGENT_SETTINGS_PATH", Path.home() / ".agent_settings.json"))  # Overlay under --agents
+TEAM_DIR = REPO_ROOT / ".agents"  # Per-agent working directories for --agents
+LOCK_DIR = Path(os.environ.get("ORCHESTRATOR_LOCK_DIR", REPO_ROOT))  # --agents points its clones at the main checkout
+
+# Work run watchdog (replaces the fixed 15-minute timeout)
+WORK_IDLE_TIMEOUT = 300  # Stop if Claude produces no output for 5 minutes
+WORK_TOOL_IDLE_TIMEOUT = 900  # ...or a single tool call runs for 15 minutes
+WORK_MAX_RUNTIME = 60 * 60  # Hard cap: 60 minutes
+
+# Work loop: cadence between work cycles
+WORK_CYCLE_INTERVAL = 15 * 60  # After a cycle that changed something
+WORK_CYCLE_MAX_INTERVAL = 2 * 60 * 60  # Cycles that change nothing back off up to this
+WORK_TRIGGER_POLL = 60  # Seconds between checks for new assignments and mentions
+WORK_TRIGGER_MESSAGES = 20  # Recent channel messages checked for mentions
+
+# Estimated tokens allowed in a work prompt; larger prompts are trimmed or refused
+WORK_PROMPT_TOKEN_BUDGET = int(os.environ.get("WORK_PROMPT_TOKEN_BUDGET", "40000"))
+
+# Capability tests (--test) and the preflight run before each work cycle
+CAPABILITY_CHECK_TIMEOUT = 10  # Seconds for a single check (gh auth status, Slack calls)
+CAPABILITY_CACHE_TTL = 300  # Passing results are reused this long...
+CAPABILITY_FAILURE_TTL = 60  # ...and failing ones this long, unless the config changes
+CAPABILITY_REQUIRED_FILES = [
+    "slack_interface.py",
+    "agent-docs/ONBOARDING.md",
+    "agent-docs/AGENT_PROTOCOL.md",
+    "agent-docs/SLACK_INTERFACE.md",
+    "memory",
+]
+REQUIRED_SLACK_SCOPES = ("chat:write", "channels:read", "channels:history")
+SLACK_TOKEN_FILE = Path("/dev/shm/mcp-token")
+
+# Team supervisor (--agents)
+TEAM_MAX_CLAUDE_RUNS = 2  # Claude runs allowed at once across all agents
+AGENT_RESTART_DELAY_MAX = 300  # Max seconds between restarts of a crashing agent
+AGENT_FAST_FAILURE_SECONDS = 30  # An agent exiting sooner than this failed on startup
+AGENT_MAX_FAST_FAILURES = 3  # Give up on an agent after this many startup failures in a row
+
+
+def get_lock_file(name: str) -> Path:
+    """Lock file for one lock namespace, e.g. an agent ID (one instance per agent per repo)."""
+    return LOCK_DIR / f".orchestrator.{name}.lock"
+
+
+def get_lock_info_file(name: str) -> Path:
+    """Metadata (PID, agent, start time) of the process holding a lock."""
+    return LOCK_DIR / f".orchestrator.{name}.json"
+
+
+class InstanceLock:
     """
-    Ensure only one instance of the orchestrator is running.
-    Uses a lock file with PID to detect and prevent duplicate instances.
+    Single-instance lock held by the kernel with flock.
     
-    Raises:
-        SystemExit if another instance is already running
+    The lock file itself is never rewritten or removed, so every process
+    locks the same inode; the holder's details go in a separate metadata
+    file, written atomically (temp file + rename) so readers never see a
+    partial write. The kernel drops the lock when the holder exits or
+    crashes, so there are no stale locks and no PID checks. Processes
+    forked while the lock is held share it, but only the process that took
+    it releases it.
     """
-    import os
     
-    current_pid = os.getpid()
+    def __init__(self, name: str):
+        self.name = name
+        self.path = get_lock_file(name)
+        self.info_path = get_lock_info_file(name)
+        self._fd: Optional[int] = None
+        self._owner: Optional[int] = None
     
-    if LOCK_FILE.exists():
+    def acquire(self, info: dict) -> bool:
+        """
+        Take the lock without waiting and publish `info` about the holder.
+        
+        Returns:
+            True if this process now holds the lock, False if another does
+        """
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
         try:
-            with open(LOCK_FILE, 'r') as f:
-                lock_data = json.load(f)
-            
-            old_pid = lock_data.get('pid')
-            old_agent = lock_data.get('agent', 'unknown')
-            old_started = lock_data.get('started', 'unknown')
-            
-            # Check if the old process is still running
-            if old_pid:
-                try:
-                    # Send signal 0 to check if process exists
-                    os.kill(old_pid, 0)
-                    # Process exists - another instance is running
-                    print("=" * 70, file=sys.stderr)
-                    print("ERROR: Another orchestrator instance is already running!", file=sys.stderr)
-                    print("=" * 70, file=sys.stderr)
-                    print("", file=sys.stderr)
-                    print(f"   Existing instance:", file=sys.stderr)
-                    print(f"   - PID: {old_pid}", file=sys.stderr)
-                    print(f"   - Agent: {old_agent}", file=sys.stderr)
-                    print(f"   - Started: {old_started}", file=sys.stderr)
-                    print("", file=sys.stderr)
-                    print("   To stop the existing instance:", file=sys.stderr)
-                    print(f"   - kill {old_pid}", file=sys.stderr)
-                    print("   - Or: pkill -f 'orchestrator.py'", file=sys.stderr)
-                    print("", file=sys.stderr)
-                    print("   To force remove the lock (if process is stuck):", file=sys.stderr)
-                    print(f"   - rm {LOCK_FILE}", file=sys.stderr)
-                    print("=" * 70, file=sys.stderr)
-                    sys.exit(1)
-                except OSError:
-                    # Process doesn't exist - stale lock file, we can proceed
-                    print(f"Removing stale lock file (PID {old_pid} no longer running)")
-        except (json.JSONDecodeError, IOError, KeyError):
-            # Corrupted lock file, remove it
-            print("Removing corrupted lock file")
-    
-    # Create/update lock file with current process info
-    lock_data = {
-        'pid': current_pid,
-        'agent': None,  # Will be updated after agent is determined
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._fd, self._owner = fd, os.getpid()
+        try:
+            tmp = self.info_path.with_name(f"{self.info_path.name}.{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(info))
+            os.replace(tmp, self.info_path)
+        except OSError as e:
+            print(f"Warning: Could not write lock metadata: {e}", file=sys.stderr)
+        return True
+    
+    def holder(self) -> dict:
+        """Metadata published by the current holder ({} if unavailable)."""
+        try:
+            return json.loads(self.info_path.read_text())
+        except (OSError, json.JSONDecodeError):
+            return {}
+    
+    def release(self):
+        """Release the lock (no-op in forked children and when not held)."""
+        if self._fd is None or os.getpid() != self._owner:
+            return
+        try:
+            self.info_path.unlink(missing_ok=True)
+        except OSError:
+            pass
+        fcntl.flock(self._fd, fcntl.LOCK_UN)
+        os.close(self._fd)
+        self._fd = None
+
+
+_INSTANCE_LOCKS: Dict[str, InstanceLock] = {}
+
+
+def check_single_instance(agent_id: str) -> InstanceLock:
+    """
+    Ensure only one orchestrator instance is running for an agent.
+    Takes the agent's InstanceLock, so different agents can run side by
+    side in one repo and two instances starting at once can't both win.
+    
+    Args:
+        agent_id: Agent this instance runs as
+    
+    Returns:
+        The held lock (released by remove_lock_file or when the process exits)
+    
+    Raises:
+        SystemExit if another instance is already running for the agent
+    """
+    lock = InstanceLock(agent_id)
+    info = {
+        'pid': os.getpid(),
+        'agent': agent_id,
         'started': datetime.now().isoformat(),
     }
     
     try:
-        with open(LOCK_FILE, 'w') as f:
-            json.dump(lock_data, f)
-    except IOError as e:
+        acquired = lock.acquire(info)
+    except OSError as e:
         print(f"Warning: Could not create lock file: {e}", file=sys.stderr)
+        return lock
+    
+    if not acquired:
+        holder = lock.holder()
+        old_pid = holder.get('pid', 'unknown')
+        print("=" * 70, file=sys.stderr)
+        print(f"ERROR: Another orchestrator instance is already running for {agent_id}!", file=sys.stderr)
+        print("=" * 70, file=sys.stderr)
+        print("", file=sys.stderr)
+        print(f"   Existing instance:", file=sys.stderr)
+        print(f"   - PID: {old_pid}", file=sys.stderr)
+        print(f"   - Agent: {holder.get('agent', agent_id)}", file=sys.stderr)
+        print(f"   - Started: {holder.get('started', 'unknown')}", file=sys.stderr)
+        print("", file=sys.stderr)
+        print("   To stop the existing instance:", file=sys.stderr)
+        print(f"   - kill {old_pid}", file=sys.stderr)
+        print("   - Or: pkill -f 'orchestrator.py'", file=sys.stderr)
+        print("", file=sys.stderr)
+        print(f"   The lock ({lock.path.name}) is released as soon as that process exits.", file=sys.stderr)
+        print("=" * 70, file=sys.stderr)
+        sys.exit(1)
+    
+    _INSTANCE_LOCKS[agent_id] = lock
+    return lock
 
 
-def update_lock_file(agent_name: str):
-    """Update the lock file with the agent name after it's determined."""
-    if LOCK_FILE.exists():
-        try:
-            with open(LOCK_FILE, 'r') as f:
-                lock_data = json.load(f)
-            lock_data['agent'] = agent_name
-            with open(LOCK_FILE, 'w') as f:
-                json.dump(lock_data, f)
-        except (json.JSONDecodeError, IOError):
-            pass
-
-
-def remove_lock_file():
-    """Remove the lock file when orchestrator exits."""
-    try:
-        if LOCK_FILE.exists():
-            LOCK_FILE.unlink()
-    except IOError:
-        pass
+def remove_lock_file(agent_id: str):
+    """Release the agent's lock when orchestrator exits."""
+    lock = _INSTANCE_LOCKS.pop(agent_id, None)
+    if lock:
+        lock.release()
 
 
 def load_config() -> dict:
@@ -169,32 +274,161 @@ def get_agent_from_config() -> dict:
     return AGENTS[agent_id]
 
 
-def read_file(path: Path) -> str:
-    """Read file content or return empty string."""
-    return path.read_text() if path.exists() else ""
+@dataclass
+class PromptInfo:
+    """Size, content hash and per-section token ledger of an assembled prompt."""
+    bytes: int
+    hash: str
+    ledger: Optional[PromptLedger] = None
+    reused: bool = False
+
+
+class PromptCache:
+    """
+    Assembled prompts and the files they are built from.
+    
+    File contents are cached by (path, mtime, size), and a prompt is only
+    reassembled when one of its input files (or the task) changed, so
+    repeated work cycles skip the disk reads and templating. The size and
+    SHA-256 of the last prompt are kept for logging, which shows when
+    consecutive prompts are identical and can hit Claude's prompt cache.
+    """
+    
+    def __init__(self):
+        self._files: Dict[str, Tuple[tuple, str]] = {}
+        self._prompts: Dict[tuple, Tuple[tuple, str, PromptInfo]] = {}
+        self.last: Optional[PromptInfo] = None
+        self.builds = 0
+        self.hits = 0
+    
+    @staticmethod
+    def file_key(path: Path) -> tuple:
+        """(path, mtime, size) identifying a file's current version."""
+        try:
+            stat = path.stat()
+            return (str(path), stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return (str(path), None, None)
+    
+    def read(self, path: Path) -> str:
+        """Read file content (from cache if unchanged) or return empty string."""
+        key = self.file_key(path)
+        cached = self._files.get(key[0])
+        if cached and cached[0] == key:
+            return cached[1]
+        text = path.read_text() if key[1] is not None else ""
+        self._files[key[0]] = (key, text)
+        return text
+    
+    def get(self, name: tuple, inputs: List[Path], build: Callable[[], Tuple[str, PromptLedger]],
+            extra: tuple = ()) -> str:
+        """
+        Return the prompt for `name`, rebuilding it only if an input changed.
+        
+        Args:
+            name: Identifies the prompt (e.g. agent and mode); one is kept per name
+            inputs: Files the prompt is built from
+            build: Assembles the prompt (reading files via read()); returns (prompt, ledger)
+            extra: Other values the prompt depends on (e.g. the task)
+        """
+        key = tuple(extra) + tuple(self.file_key(path) for path in inputs)
+        cached = self._prompts.get(name)
+        if cached and cached[0] == key:
+            self.hits += 1
+            self.last = PromptInfo(cached[2].bytes, cached[2].hash, cached[2].ledger, reused=True)
+            return cached[1]
+        
+        prompt, ledger = build()
+        self.builds += 1
+        data = prompt.encode()
+        info = PromptInfo(len(data), hashlib.sha256(data).hexdigest(), ledger)
+        self._prompts[name] = (key, prompt, info)
+        self.last = info
+        return prompt
+
+
+PROMPT_CACHE = PromptCache()
+
+# Docs embedded by the legacy (use_references=False) prompt
+LEGACY_PROMPT_DOCS = ("AGENT_PROTOCOL.md", "SLACK_INTERFACE.md", "ARCHITECTURE.md")
+
+# Where the full text of a trimmed prompt section can be read
+PROMPT_SECTION_FILES = {
+    "prd": "agent-docs/PRD.md",
+    "architecture": "agent-docs/ARCHITECTURE.md",
+    "protocol": "agent-docs/AGENT_PROTOCOL.md",
+    "slack_docs": "agent-docs/SLACK_INTERFACE.md",
+}
 
 
 def build_prompt(agent: dict, task: str = "", use_references: bool = True) -> str:
     """Build the prompt for an agent from their spec and memory.
     
+    Prompts are cached and only reassembled when the settings, memory, PRD
+    or (legacy) docs change on disk; see PromptCache. PROMPT_CACHE.last has
+    the size, hash and section ledger of the returned prompt.
+    
     Args:
         agent: Agent configuration dict
         task: Optional specific task
         use_references: If True, use file references instead of embedding content (saves ~100KB)
+    
+    Raises:
+        PromptBudgetError: If the prompt cannot fit WORK_PROMPT_TOKEN_BUDGET
     """
+    docs = REPO_ROOT / "agent-docs"
+    inputs = [CONFIG_PATH, REPO_ROOT / "memory" / f"{agent['name'].lower()}_memory.md", docs / "PRD.md"]
+    if not use_references:
+        inputs += [docs / agent["spec"]] + [docs / name for name in LEGACY_PROMPT_DOCS]
+    return PROMPT_CACHE.get((agent['name'], use_references), inputs,
+                            lambda: assemble_prompt(agent, task, use_references), extra=(task,))
+
+
+def assemble_prompt(agent: dict, task: str = "", use_references: bool = True) -> Tuple[str, PromptLedger]:
+    """
+    Assemble a prompt from scratch (use build_prompt for the cached version).
+    
+    The PRD (and, in legacy mode, the shared docs) is embedded as an
+    excerpt: the sections that best match the agent's role and task, with
+    the rest listed by title (see doc_excerpts). The agent's own spec is
+    always embedded whole. Sections are then trimmed
+    to fit WORK_PROMPT_TOKEN_BUDGET (embedded docs first, then the PRD, then
+    memory); the task is never trimmed.
+    
+    Returns:
+        Tuple of (prompt, ledger of estimated tokens per section)
+    
+    Raises:
+        PromptBudgetError: If the prompt cannot fit the budget
+    """
+    read_file = PROMPT_CACHE.read
+    memory_path = REPO_ROOT / "memory" / f"{agent['name'].lower()}_memory.md"
     
     # Get default channel from config
     config = load_config()
     channel = config.get("default_channel_name", config.get("default_channel", "#logo-creator"))
     default_task = f"Check Slack {channel}, sync with team, do your work, update your memory file."
     
+    # Docs are embedded as the sections most relevant to the agent's role and task
+    query = build_query(agent, task or default_task)
+    
+    def excerpt(name: str) -> str:
+        text = read_file(REPO_ROOT / "agent-docs" / name)
+        return excerpt_doc(text, query, f"agent-docs/{name}") if text else ""
+    
     if use_references:
         # OPTIMIZED: Use file references instead of embedding content
-        # This reduces prompt size from ~100KB to ~3KB
-        memory = read_file(REPO_ROOT / "memory" / f"{agent['name'].lower()}_memory.md")
-        prd = read_file(REPO_ROOT / "agent-docs" / "PRD.md")
+        # The docs are read on demand; see the ledger printed per run for actual sizes
+        trim_order = ["prd", "memory"]
+        sections = {
+            "prd": excerpt("PRD.md")
+                   or "No PRD yet. Nova needs to interview the human (Babak/Arash) to create it. See agent-docs/PRD.md",
+            "memory": read_file(memory_path) or "No previous memory. This is your first session.",
+            "task": task or default_task,
+        }
         
-        return f"""# You are {agent['name']} {agent['emoji']}
+        def render(parts: dict) -> str:
+            return f"""# You are {agent['name']} {agent['emoji']}
 
 ## Your Identity
 - **Name:** {agent['name']}
@@ -217,13 +451,13 @@ Before starting work, read these files for full context:
 
 ## Current PRD
 
-{prd if prd else "No PRD yet. Nova needs to interview the human (Babak/Arash) to create it. See agent-docs/PRD.md"}
+{parts["prd"]}
 
 ---
 
 ## Your Memory
 
-{memory if memory else "No previous memory. This is your first session."}
+{parts["memory"]}
 
 ---
 
@@ -258,18 +492,23 @@ You are running in **headless CLI mode** - there is no human at the terminal.
 
 ## Current Task
 
-{task if task else default_task}
+{parts["task"]}
 """
     else:
         # LEGACY: Embed full content (large prompt ~100KB)
-        spec = read_file(REPO_ROOT / "agent-docs" / agent["spec"])
-        memory = read_file(REPO_ROOT / "memory" / f"{agent['name'].lower()}_memory.md")
-        prd = read_file(REPO_ROOT / "agent-docs" / "PRD.md")
-        protocol = read_file(REPO_ROOT / "agent-docs" / "AGENT_PROTOCOL.md")
-        slack_docs = read_file(REPO_ROOT / "agent-docs" / "SLACK_INTERFACE.md")
-        architecture = read_file(REPO_ROOT / "agent-docs" / "ARCHITECTURE.md")
+        trim_order = ["architecture", "slack_docs", "protocol", "spec", "prd", "memory"]
+        sections = {
+            "spec": read_file(REPO_ROOT / "agent-docs" / agent["spec"]),
+            "architecture": excerpt("ARCHITECTURE.md"),
+            "protocol": excerpt("AGENT_PROTOCOL.md"),
+            "slack_docs": excerpt("SLACK_INTERFACE.md"),
+            "prd": excerpt("PRD.md") or "No PRD yet. Nova needs to interview Arash to create it.",
+            "memory": read_file(memory_path) or "No previous memory. This is your first session.",
+            "task": task or default_task,
+        }
         
-        return f"""# You are {agent['name']} {agent['emoji']}
+        def render(parts: dict) -> str:
+            return f"""# You are {agent['name']} {agent['emoji']}
 
 ## Your Identity
 - **Name:** {agent['name']}
@@ -280,37 +519,37 @@ You are running in **headless CLI mode** - there is no human at the terminal.
 
 ## Your Specification
 
-{spec}
+{parts["spec"]}
 
 ---
 
 ## Architecture
 
-{architecture}
+{parts["architecture"]}
 
 ---
 
 ## Communication Protocol
 
-{protocol}
+{parts["protocol"]}
 
 ---
 
 ## Slack Interface Documentation
 
-{slack_docs}
+{parts["slack_docs"]}
 
 ---
 
 ## Current PRD
 
-{prd if prd else "No PRD yet. Nova needs to interview Arash to create it."}
+{parts["prd"]}
 
 ---
 
 ## Your Memory
 
-{memory if memory else "No previous memory. This is your first session."}
+{parts["memory"]}
 
 ---
 
@@ -333,32 +572,70 @@ You are running in **headless CLI mode** - there is no human at the terminal.
 
 ## Current Task
 
-{task if task else default_task}
+{parts["task"]}
 """
+    
+    identity = estimate_tokens(render({name: "" for name in sections}))
+    hints = {name: f"; full text in {path}" for name, path in PROMPT_SECTION_FILES.items()}
+    hints["spec"] = f"; full text in agent-docs/{agent['spec']}"
+    hints["memory"] = f"; full text in {memory_path.relative_to(REPO_ROOT)}"
+    sections, ledger = fit_sections({"identity": identity}, sections, WORK_PROMPT_TOKEN_BUDGET, trim_order, hints)
+    return render(sections), ledger
 
 
-def run_agent(agent: dict, task: str = "") -> None:
+def run_agent(agent: dict, task: str = "") -> ClaudeRunResult:
     """Run Claude Code for a single agent in headless autonomous mode."""
     
     print(f"\n{'='*60}")
     print(f"{agent['emoji']} Starting {agent['name']} ({agent['role']})")
     print(f"{'='*60}\n")
     
-    prompt = build_prompt(agent, task)
+    # Keep the memory file (embedded in every prompt) within budget
+    try:
+        compaction = compact_memory(agent['name'].lower())
+        if compaction.compacted:
+            print(f"🗜️  Compacted memory: {compaction.describe()}", flush=True)
+    except OSError as e:
+        print(f"⚠️  Memory compaction failed: {e}", flush=True)
+    
+    try:
+        prompt = build_prompt(agent, task)
+    except PromptBudgetError as e:
+        print(f"❌ Prompt over budget, not starting Claude: {e}", flush=True)
+        print("   Raise WORK_PROMPT_TOKEN_BUDGET or shorten the task", flush=True)
+        result = ClaudeRunResult(is_error=True)
+        record_run("work", agent['name'].lower(), result, task=task, refused=True, **e.ledger.to_record())
+        return result
+    info = PROMPT_CACHE.last
+    print(f"📝 Prompt: {info.bytes / 1024:.1f}KB, sha256 {info.hash[:12]}"
+          f"{' (unchanged, reused)' if info.reused else ''}", flush=True)
+    print(f"   Sections: {info.ledger.describe()}", flush=True)
     
     # Run Claude Code CLI
     # -p: Print mode (non-interactive)
     # Permissions are configured in ~/.claude/settings.json
-    # Timeout: 15 minutes (900 seconds) to allow for complex tasks
+    # Output is streamed as JSON events so progress is visible live; a run is
+    # killed early if it stops making progress, with a hard cap on runtime
+    def on_line(line):
+        # Pass through anything that is not a JSON event (CLI errors, notices)
+        if not line.lstrip().startswith("{"):
+            print(line, end="", flush=True)
+    
+    def on_event(event):
+        line = format_event(event)
+        if line:
+            print(line, flush=True)
+    
     try:
-        subprocess.run(
-            [str(REPO_ROOT / "claude-wrapper.sh"), "-p", prompt],
-            cwd=str(REPO_ROOT),
-            timeout=900,  # 15 minutes
+        result = run_claude(
+            ["-p", *STREAM_JSON_ARGS],
+            prompt=prompt,
+            idle_timeout=WORK_IDLE_TIMEOUT,
+            tool_idle_timeout=WORK_TOOL_IDLE_TIMEOUT,
+            max_runtime=WORK_MAX_RUNTIME,
+            on_line=on_line,
+            on_event=on_event,
         )
-    except subprocess.TimeoutExpired:
-        print("⏰ Claude CLI timed out after 15 minutes")
-        print("")
     except FileNotFoundError:
         print("❌ Claude CLI not found!")
         print("")
@@ -366,110 +643,473 @@ def run_agent(agent: dict, task: str = "") -> None:
         print("Please install Claude Code CLI first.")
         sys.exit(1)
     
-    print(f"\n✅ {agent['name']} completed\n")
+    record_run("work", agent['name'].lower(), result, task=task,
+               prompt_bytes=info.bytes, prompt_hash=info.hash, **info.ledger.to_record())
+    
+    if result.stalled:
+        print(f"⏰ Claude CLI made no progress for {WORK_IDLE_TIMEOUT // 60}+ minutes - stopped")
+        print("")
+    elif result.timed_out:
+        print(f"⏰ Claude CLI timed out after {WORK_MAX_RUNTIME // 60} minutes")
+        print("")
+    
+    slowest = sorted((s for s in result.steps if s.duration is not None), key=lambda s: s.duration, reverse=True)[:3]
+    if slowest:
+        print("⏱️  Slowest steps: " + ", ".join(f"{s.tool} {s.duration:.1f}s" for s in slowest))
+    
+    print(f"\n✅ {agent['name']} completed in {result.duration:.0f}s ({len(result.steps)} tool calls)\n")
+    return result
 
 
-def run_capability_tests() -> bool:
+def format_wait(seconds: float) -> str:
+    """Short human-readable wait, e.g. "45s" or "30 minutes"."""
+    return f"{seconds:.0f}s" if seconds < 120 else f"{seconds / 60:.0f} minutes"
+
+
+def get_repo_fingerprint() -> str:
     """
-    Run all capability tests and report results.
+    Hash of the commits made in this checkout and its uncommitted changes.
+    
+    Commits are read from the HEAD reflog, keeping only "commit" entries, so
+    other agents' work arriving through a pull doesn't count as this agent's
+    progress. Memory files are left out: every cycle updates them, so they
+    don't show whether a cycle got any work done.
+    """
+    digest = hashlib.sha1()
+    try:
+        reflog = subprocess.run(["git", "log", "-g", "--format=%H %gs", "-n", "200", "HEAD"],
+                                cwd=str(REPO_ROOT), capture_output=True, text=True, timeout=30)
+        for line in reflog.stdout.splitlines():
+            if line.partition(" ")[2].startswith("commit"):
+                digest.update(line.encode())
+    except (OSError, subprocess.SubprocessError):
+        pass
+    for cmd in (["git", "status", "--porcelain", "--", ".", ":(exclude)memory"],
+                ["git", "diff", "HEAD", "--", ".", ":(exclude)memory"]):
+        try:
+            result = subprocess.run(cmd, cwd=str(REPO_ROOT), capture_output=True, text=True, timeout=30)
+            digest.update(result.stdout.encode())
+        except (OSError, subprocess.SubprocessError):
+            pass
+    return digest.hexdigest()
+
+
+def get_assigned_issues(assignee: str = "@me") -> set:
+    """
+    Numbers of open GitHub issues assigned to a user.
+    
+    Args:
+        assignee: GitHub login ("@me" for the authenticated user)
     
     Returns:
-        True if all tests pass, False otherwise
+        Set of issue numbers, or None if gh is unavailable or fails
     """
-    print("\n" + "=" * 60)
-    print("🧪 CAPABILITY TESTS")
-    print("=" * 60)
+    if not shutil.which("gh"):
+        return None
+    try:
+        result = subprocess.run(
+            ["gh", "issue", "list", "--assignee", assignee, "--state", "open",
+             "--json", "number", "--limit", "100"],
+            cwd=str(REPO_ROOT), capture_output=True, text=True, timeout=30
+        )
+        if result.returncode != 0:
+            return None
+        return {issue["number"] for issue in json.loads(result.stdout or "[]")}
+    except (OSError, subprocess.SubprocessError, json.JSONDecodeError, KeyError, TypeError):
+        return None
+
+
+class WorkScheduler:
+    """
+    Re-runs an agent's work cycle on a cadence instead of once.
+    
+    After a cycle that committed or changed files in the agent's checkout,
+    or answered someone in a Slack thread, the next one runs
+    WORK_CYCLE_INTERVAL later. Each cycle that changed nothing doubles the
+    wait, up to WORK_CYCLE_MAX_INTERVAL. While waiting, the scheduler checks
+    every WORK_TRIGGER_POLL seconds for GitHub issues newly assigned to the
+    agent and for new Slack mentions of it, and starts the next cycle
+    early when it finds one. Mentions are looked up in the channel window
+    the monitor publishes (monitor.get_recent_messages_shared), so all the
+    agents on a host share one conversations.history call per poll.
+    
+    Agents other than Nova are gated on the task graph (task_graph.py): a
+    cycle only starts once the agent owns a task whose inputs (the PRD,
+    issues it depends on) are done, and the ready tasks are listed in the
+    cycle's prompt. A mention starts a cycle regardless. If GitHub issues
+    can't be listed, cycles are not gated.
     
-    results = {}
-    all_passed = True
+    Each cycle also waits for a passing preflight (config, GitHub and Claude
+    CLIs, Slack auth, scopes and channel access), which is cached so it
+    costs almost nothing while nothing changed.
+    """
+    
+    def __init__(self, agent: dict, task: str = "",
+                 interval: float = WORK_CYCLE_INTERVAL,
+                 max_interval: float = WORK_CYCLE_MAX_INTERVAL,
+                 trigger_poll: float = WORK_TRIGGER_POLL, gated: bool = True,
+                 preflight_checks: bool = True):
+        """
+        Args:
+            agent: Agent configuration dict
+            task: Task given to every cycle
+            interval: Seconds between cycles that made changes
+            max_interval: Upper bound for the idle backoff
+            trigger_poll: Seconds between checks for early triggers
+            gated: Wait for ready tasks in the task graph before each cycle
+            preflight_checks: Skip cycles while a capability check fails (see preflight)
+        """
+        self.agent = agent
+        self.agent_id = agent['name'].lower()
+        self.task = task
+        self.interval = interval
+        self.max_interval = max(max_interval, interval)
+        self.trigger_poll = trigger_poll
+        self.assignee = load_config().get("github_user", "@me")
+        self.gated = gated and self.agent_id != PRD_OWNER
+        self.preflight_checks = preflight_checks
+        # Issues assigned to the agent's own login count as its tasks (its name always does)
+        self.logins = {self.agent_id: {self.assignee}} if self.assignee != "@me" else {}
+        self.known_issues = None
+        self.cycle_started = 0.0
+        self.cycles = 0
+        self.idle_cycles = 0
     
-    # Test 1: Config file
-    print("\n📋 Test 1: Configuration File")
+    def new_assignments(self) -> set:
+        """Issues assigned to the agent since the current cycle started."""
+        issues = get_assigned_issues(self.assignee)
+        if issues is None or self.known_issues is None:
+            return set()
+        return issues - self.known_issues
+    
+    def new_mentions(self) -> list:
+        """Channel messages mentioning the agent posted since the current cycle started."""
+        from monitor import get_recent_messages_shared, normalize_raw_message, find_mentioned_agents
+        raw_messages = get_recent_messages_shared(WORK_TRIGGER_MESSAGES, max_age=self.trigger_poll)
+        mentions = []
+        for raw in raw_messages:
+            try:
+                if float(raw.get("ts", 0)) <= self.cycle_started:
+                    continue
+            except (TypeError, ValueError):
+                continue
+            msg = normalize_raw_message(raw)
+            if self.agent_id in find_mentioned_agents(msg):
+                mentions.append(msg)
+        return mentions
+    
+    def wait_for_next_cycle(self, delay: float) -> str:
+        """
+        Sleep until the next cycle is due or something triggers it early.
+        
+        Returns:
+            Why the next cycle starts
+        """
+        due = time.time() + delay
+        while time.time() < due:
+            time.sleep(max(0, min(self.trigger_poll, due - time.time())))
+            if time.time() >= due:
+                break
+            issues = self.new_assignments()
+            if issues:
+                return f"new issue assignment ({', '.join(f'#{n}' for n in sorted(issues))})"
+            mentions = self.new_mentions()
+            if mentions:
+                return f"{len(mentions)} new Slack mention(s)"
+        return "schedule"
+    
+    def wait_for_inputs(self) -> list:
+        """
+        Block until the agent owns a task whose inputs are ready.
+        
+        Returns:
+            The ready tasks; empty if woken by a Slack mention or if the
+            task graph can't be loaded
+        """
+        announced = False
+        self.cycle_started = time.time()
+        while True:
+            graph = TaskGraph.load(logins=self.logins)
+            if graph is None:
+                return []
+            ready = graph.ready_tasks(self.agent_id)
+            if ready:
+                if announced:
+                    print(f"▶️ Inputs ready for {self.agent['name']}: {', '.join(t.id for t in ready)}", flush=True)
+                return ready
+            if not announced:
+                print(f"⏸️ {self.agent['name']} has no task with ready inputs "
+                      f"(waiting on: {', '.join(graph.waiting_on(self.agent_id))}); not starting a cycle", flush=True)
+                announced = True
+            time.sleep(self.trigger_poll)
+            mentions = self.new_mentions()
+            if mentions:
+                print(f"⏰ Starting anyway: {len(mentions)} new Slack mention(s)", flush=True)
+                return []
+    
+    def run(self, max_cycles: int = None) -> None:
+        """
+        Run work cycles until interrupted (or max_cycles have run).
+        
+        Args:
+            max_cycles: Stop after this many cycles (None = run forever)
+        """
+        delay = self.interval
+        while True:
+            task = self.task
+            if self.gated:
+                ready = self.wait_for_inputs()
+                if ready:
+                    task += f"\n\nYour tasks with all inputs ready:\n{format_tasks(ready)}"
+            
+            if self.preflight_checks and not preflight():
+                print(f"⏸️  Not starting a cycle; checking again in {format_wait(CAPABILITY_FAILURE_TTL)}", flush=True)
+                time.sleep(CAPABILITY_FAILURE_TTL)
+                continue
+            
+            self.cycles += 1
+            self.cycle_started = time.time()
+            self.known_issues = get_assigned_issues(self.assignee)
+            before = get_repo_fingerprint()
+            
+            print(f"\n🔁 {self.agent['name']} work cycle #{self.cycles}", flush=True)
+            result = run_agent(self.agent, task)
+            
+            # Top-level posts are routine status updates, so only thread replies count
+            changed = get_repo_fingerprint() != before or bool(result.replies)
+            if changed:
+                self.idle_cycles = 0
+                delay = self.interval
+            else:
+                self.idle_cycles += 1
+                delay = min(delay * 2, self.max_interval)
+            
+            if max_cycles is not None and self.cycles >= max_cycles:
+                break
+            
+            outcome = "made changes" if changed else f"changed nothing ({self.idle_cycles} idle in a row)"
+            print(f"💤 Cycle #{self.cycles} {outcome}; next cycle in {format_wait(delay)} "
+                  f"unless an issue is assigned or {self.agent['name']} is mentioned", flush=True)
+            reason = self.wait_for_next_cycle(delay)
+            if reason != "schedule":
+                print(f"⏰ Starting early: {reason}", flush=True)
+                delay = self.interval
+
+
+@dataclass
+class CheckResult:
+    """Outcome of one capability check."""
+    name: str
+    title: str
+    passed: Optional[bool]  # None = skipped / warning only
+    lines: List[str]
+    duration: float = 0.0
+
+
+def check_config() -> CheckResult:
+    """Agent and channel configured in the settings file."""
     config = load_config()
+    lines, passed = [], True
     if config.get("default_agent"):
-        print(f"   ✅ Agent configured: {config.get('default_agent')}")
-        results["config"] = True
+        lines.append(f"✅ Agent configured: {config.get('default_agent')}")
     else:
-        print("   ❌ No agent configured")
-        results["config"] = False
-        all_passed = False
-    
+        lines.append("❌ No agent configured")
+        passed = False
     if config.get("default_channel"):
-        print(f"   ✅ Channel configured: {config.get('default_channel')}")
+        lines.append(f"✅ Channel configured: {config.get('default_channel')}")
     else:
-        print("   ⚠️  No default channel configured")
+        lines.append("⚠️  No default channel configured")
+    return CheckResult("config", "Configuration File", passed, lines)
+
+
+def check_github() -> CheckResult:
+    """GitHub CLI installed and authenticated."""
+    if not shutil.which("gh"):
+        return CheckResult("github", "GitHub CLI", False, ["❌ GitHub CLI (gh) not installed"])
+    try:
+        result = subprocess.run(["gh", "auth", "status"], capture_output=True, text=True,
+                                timeout=CAPABILITY_CHECK_TIMEOUT)
+    except Exception as e:
+        return CheckResult("github", "GitHub CLI", False, [f"❌ GitHub test error: {e}"])
+    if result.returncode == 0:
+        return CheckResult("github", "GitHub CLI", True, ["✅ GitHub CLI authenticated"])
+    return CheckResult("github", "GitHub CLI", False, ["❌ GitHub CLI not authenticated"])
+
+
+def check_claude() -> CheckResult:
+    """Claude CLI installed (mandatory)."""
+    if find_claude():
+        return CheckResult("claude", "Claude CLI (REQUIRED)", True, ["✅ Claude CLI installed"])
+    return CheckResult("claude", "Claude CLI (REQUIRED)", False,
+                       ["❌ Claude CLI not installed", "⚠️  Claude CLI is REQUIRED to run agents"])
+
+
+def check_files() -> CheckResult:
+    """Project files the agents rely on."""
+    lines, passed = [], True
+    for f in CAPABILITY_REQUIRED_FILES:
+        if (REPO_ROOT / f).exists():
+            lines.append(f"✅ {f}")
+        else:
+            lines.append(f"❌ {f} missing")
+            passed = False
+    return CheckResult("files", "Project Files", passed, lines)
+
+
+def _slack():
+    """SlackInterface for the checks (imported lazily: needs the requests package)."""
+    from slack_interface import SlackInterface
+    return SlackInterface(config_file=str(CONFIG_PATH))
+
+
+def check_slack_auth() -> CheckResult:
+    """Slack token present and accepted (auth.test)."""
+    slack = _slack()
+    if not slack.is_connected:
+        return CheckResult("slack_auth", "Slack Authentication", False, ["❌ No Slack token available"])
+    result = slack.test_auth(max_retries=1)
+    if result.get("ok"):
+        return CheckResult("slack_auth", "Slack Authentication", True,
+                           [f"✅ Authenticated as {result.get('user', '?')} in {result.get('team', '?')}"])
+    return CheckResult("slack_auth", "Slack Authentication", False,
+                       [f"❌ auth.test failed: {result.get('error', 'unknown error')}"])
+
+
+def check_slack_scopes() -> CheckResult:
+    """Slack token has the scopes the agents use."""
+    slack = _slack()
+    scopes = slack.get_scopes() if slack.is_connected else []
+    if not scopes:
+        return CheckResult("slack_scopes", "Slack Scopes", None,
+                           ["⚠️  No scopes reported (legacy token or auth failure)"])
+    missing = [scope for scope in REQUIRED_SLACK_SCOPES if scope not in scopes]
+    if missing:
+        return CheckResult("slack_scopes", "Slack Scopes", False, [f"❌ Missing scopes: {', '.join(missing)}"])
+    return CheckResult("slack_scopes", "Slack Scopes", True,
+                       [f"✅ {', '.join(REQUIRED_SLACK_SCOPES)} ({len(scopes)} scopes)"])
+
+
+def check_slack_channel() -> CheckResult:
+    """The configured channel exists and the token can see it."""
+    slack = _slack()
+    channel = slack.default_channel_name or slack.default_channel
+    if not channel:
+        return CheckResult("slack_channel", "Slack Channel Access", None, ["⚠️  No default channel configured"])
+    result = slack.get_channel_info(max_retries=1)
+    if not result.get("ok"):
+        return CheckResult("slack_channel", "Slack Channel Access", False,
+                           [f"❌ {channel}: {result.get('error', 'unknown error')}"])
+    info = result.get("channel") or {}
+    if info.get("is_member") is False:
+        return CheckResult("slack_channel", "Slack Channel Access", None,
+                           [f"⚠️  {channel} is reachable but the token is not a member"])
+    return CheckResult("slack_channel", "Slack Channel Access", True, [f"✅ {channel} ({info.get('id', '?')})"])
+
+
+CAPABILITY_CHECKS = [check_config, check_github, check_claude, check_files,
+                     check_slack_auth, check_slack_scopes, check_slack_channel]
+
+_CAPABILITY_CACHE: Optional[Tuple[float, tuple, List[CheckResult]]] = None
+
+
+def capability_fingerprint() -> tuple:
+    """Cheap snapshot of what the checks depend on; a change invalidates cached results."""
+    return (
+        PromptCache.file_key(CONFIG_PATH),
+        PromptCache.file_key(SLACK_TOKEN_FILE),
+        shutil.which("gh"),
+        find_claude(),
+        tuple((REPO_ROOT / f).exists() for f in CAPABILITY_REQUIRED_FILES),
+    )
+
+
+def _run_check(check: Callable[[], CheckResult]) -> CheckResult:
+    started = time.time()
+    try:
+        result = check()
+    except Exception as e:
+        name = check.__name__.replace("check_", "")
+        result = CheckResult(name, name.replace("_", " ").title(), False, [f"❌ Error: {e}"])
+    result.duration = time.time() - started
+    return result
+
+
+def run_capability_checks(use_cache: bool = True) -> Tuple[List[CheckResult], bool]:
+    """
+    Run every capability check at once in a thread pool.
     
-    # Test 2: GitHub CLI
-    print("\n📋 Test 2: GitHub CLI")
-    if shutil.which("gh"):
-        try:
-            result = subprocess.run(
-                ["gh", "auth", "status"],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            if result.returncode == 0:
-                print("   ✅ GitHub CLI authenticated")
-                results["github"] = True
-            else:
-                print("   ❌ GitHub CLI not authenticated")
-                results["github"] = False
-                all_passed = False
-        except Exception as e:
-            print(f"   ❌ GitHub test error: {e}")
-            results["github"] = False
-            all_passed = False
-    else:
-        print("   ❌ GitHub CLI (gh) not installed")
-        results["github"] = False
-        all_passed = False
-    
-    # Test 3: Claude CLI (MANDATORY)
-    print("\n📋 Test 3: Claude CLI (REQUIRED)")
-    if shutil.which("claude"):
-        print("   ✅ Claude CLI installed")
-        results["claude"] = True
-    else:
-        print("   ❌ Claude CLI not installed")
-        print("   ⚠️  Claude CLI is REQUIRED to run agents")
-        results["claude"] = False
-        all_passed = False
-    
-    # Test 4: Project Files
-    print("\n📋 Test 4: Project Files")
-    required_files = [
-        "slack_interface.py",
-        "agent-docs/ONBOARDING.md",
-        "agent-docs/AGENT_PROTOCOL.md",
-        "agent-docs/SLACK_INTERFACE.md",
-        "memory",
-    ]
-    files_ok = True
-    for f in required_files:
-        path = REPO_ROOT / f
-        if path.exists():
-            print(f"   ✅ {f}")
+    Results are cached: within CAPABILITY_CACHE_TTL (CAPABILITY_FAILURE_TTL
+    if a check failed), and while the config, Slack token file, CLI paths
+    and project files are unchanged, the cached results are returned.
+    
+    Args:
+        use_cache: Reuse fresh cached results instead of re-running
+    
+    Returns:
+        Tuple of (results in CAPABILITY_CHECKS order, whether they came from the cache)
+    """
+    global _CAPABILITY_CACHE
+    fingerprint = capability_fingerprint()
+    if use_cache and _CAPABILITY_CACHE:
+        checked_at, cached_fingerprint, results = _CAPABILITY_CACHE
+        ttl = CAPABILITY_CACHE_TTL if all(r.passed is not False for r in results) else CAPABILITY_FAILURE_TTL
+        if cached_fingerprint == fingerprint and time.time() - checked_at < ttl:
+            return results, True
+    
+    pool = ThreadPoolExecutor(max_workers=len(CAPABILITY_CHECKS), thread_name_prefix="capability")
+    futures = [pool.submit(_run_check, check) for check in CAPABILITY_CHECKS]
+    wait(futures, timeout=CAPABILITY_CHECK_TIMEOUT + 5)
+    results = []
+    for check, future in zip(CAPABILITY_CHECKS, futures):
+        if future.done():
+            results.append(future.result())
         else:
-            print(f"   ❌ {f} missing")
-            files_ok = False
-            all_passed = False
-    results["files"] = files_ok
+            name = check.__name__.replace("check_", "")
+            results.append(CheckResult(name, name.replace("_", " ").title(), False,
+                                       [f"❌ Timed out after {CAPABILITY_CHECK_TIMEOUT + 5}s"],
+                                       CAPABILITY_CHECK_TIMEOUT + 5))
+    # Don't wait for hung checks; their threads finish on their own
+    pool.shutdown(wait=False)
+    _CAPABILITY_CACHE = (time.time(), fingerprint, results)
+    return results, False
+
+
+def run_capability_tests() -> bool:
+    """
+    Run all capability tests and report results.
+    
+    Returns:
+        True if all tests pass, False otherwise
+    """
+    print("\n" + "=" * 60)
+    print("🧪 CAPABILITY TESTS")
+    print("=" * 60)
+    
+    started = time.time()
+    results, _ = run_capability_checks(use_cache=False)
+    elapsed = time.time() - started
+    
+    for i, result in enumerate(results, 1):
+        print(f"\n📋 Test {i}: {result.title}")
+        for line in result.lines:
+            print(f"   {line}")
     
     # Summary
     print("\n" + "=" * 60)
     print("📊 TEST SUMMARY")
     print("=" * 60)
     
-    for test, passed in results.items():
-        if passed is True:
+    for result in results:
+        if result.passed is True:
             status = "✅ PASS"
-        elif passed is False:
+        elif result.passed is False:
             status = "❌ FAIL"
         else:
             status = "⚠️  SKIP"
-        print(f"   {test:12} {status}")
+        print(f"   {result.name:14} {status}  ({result.duration:.1f}s)")
     
+    all_passed = all(result.passed is not False for result in results)
+    print(f"\n   Ran {len(results)} tests in parallel in {elapsed:.1f}s")
     print()
     if all_passed:
         print("🎉 All tests passed! Agent is ready to work.")
@@ -480,6 +1120,278 @@ def run_capability_tests() -> bool:
     return all_passed
 
 
+def preflight() -> bool:
+    """
+    Check the agent can work before a scheduled cycle (cached; see run_capability_checks).
+    
+    Returns:
+        True if no check failed
+    """
+    started = time.time()
+    results, cached = run_capability_checks()
+    failed = [result for result in results if result.passed is False]
+    if failed:
+        print(f"🚦 Preflight failed{' (cached)' if cached else ''}:", flush=True)
+        for result in failed:
+            print(f"   {result.name}: {'; '.join(result.lines)}", flush=True)
+        return False
+    if not cached:
+        print(f"🚦 Preflight passed in {time.time() - started:.1f}s", flush=True)
+    return True
+
+
+def write_agent_overlay(agent_id: str, base_config: dict) -> Path:
+    """
+    Write the settings file an agent runs with under --agents.
+    
+    The overlay is the shared config with default_agent set to the agent,
+    plus any per-agent keys from the config's "agent_overrides" entry, e.g.
+    {"agent_overrides": {"pixel": {"default_channel": "#design"}}}.
+    
+    Args:
+        agent_id: Agent the overlay is for
+        base_config: Shared settings (usually ~/.agent_settings.json)
+    
+    Returns:
+        Path of the overlay (.agents/<agent>/agent_settings.json)
+    """
+    workdir = TEAM_DIR / agent_id
+    workdir.mkdir(parents=True, exist_ok=True)
+    overlay = {k: v for k, v in base_config.items() if k != "agent_overrides"}
+    overlay["default_agent"] = agent_id
+    overlay.update(base_config.get("agent_overrides", {}).get(agent_id, {}))
+    
+    path = workdir / "agent_settings.json"
+    tmp = path.with_name(f"{path.name}.tmp")
+    # Holds the Slack tokens, so keep it private like the original
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w') as f:
+        json.dump(overlay, f, indent=2)
+    tmp.replace(path)
+    return path
+
+
+def _git(args: list, cwd: Path) -> subprocess.CompletedProcess:
+    return subprocess.run(["git", *args], cwd=str(cwd), capture_output=True, text=True, timeout=300)
+
+
+def prepare_agent_checkout(agent_id: str) -> Path:
+    """
+    Give an agent its own git clone under --agents.
+    
+    Agents edit files, commit and push from their checkout, so sharing one
+    would mix their changes in one index. Each agent gets a clone of this
+    repo in .agents/<agent>/repo/ (a local clone, so objects are hardlinked
+    rather than copied) whose origin is this repo's origin, so it pulls and
+    pushes exactly like an agent on its own VM. An existing clone is reused
+    as is; the agent pulls at the start of its work cycles.
+    
+    Args:
+        agent_id: Agent the clone is for
+    
+    Returns:
+        Path of the clone
+    
+    Raises:
+        RuntimeError: If the clone can't be created
+    """
+    checkout = TEAM_DIR / agent_id / "repo"
+    if (checkout / ".git").exists():
+        return checkout
+    checkout.parent.mkdir(parents=True, exist_ok=True)
+    result = _git(["clone", "--quiet", str(REPO_ROOT), str(checkout)], REPO_ROOT)
+    if result.returncode != 0:
+        raise RuntimeError(f"git clone into {checkout} failed: {result.stderr.strip()}")
+    origin = _git(["remote", "get-url", "origin"], REPO_ROOT).stdout.strip()
+    if origin:
+        _git(["remote", "set-url", "origin", origin], checkout)
+        _git(["fetch", "--quiet", "origin"], checkout)
+    else:
+        print(f"⚠️  This repo has no origin remote; {agent_id}'s clone pushes to {REPO_ROOT}", flush=True)
+    return checkout
+
+
+class AgentProcess:
+    """One agent's orchestrator, run as a child process of the team supervisor."""
+    
+    def __init__(self, agent_id: str, child_args: list, env: dict, checkout: Path):
+        self.agent_id = agent_id
+        self.agent = AGENTS[agent_id]
+        self.child_args = child_args
+        self.env = env
+        self.workdir = TEAM_DIR / agent_id
+        self.checkout = checkout
+        self.proc = None
+        self.started = 0.0
+        self.restarts = 0
+        self.crash_delay = 0
+        self.fast_failures = 0
+        self.restart_at = None
+        self.done = False
+    
+    def start(self) -> None:
+        """Start the child in the agent's clone, streaming its output with an agent prefix (and to its log)."""
+        self.started = time.time()
+        self.restart_at = None
+        self.proc = subprocess.Popen(
+            [sys.executable, str(self.checkout / "orchestrator.py"), *self.child_args],
+            cwd=str(self.checkout),
+            env=self.env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1,
+            start_new_session=True,  # Signalled as a group by the supervisor
+        )
+        prefix = f"{self.agent['emoji']} {self.agent['name']:6} │ "
+        
+        def pump(proc=self.proc):
+            with open(self.workdir / "orchestrator.log", "a") as log:
+                for line in proc.stdout:
+                    log.write(line)
+                    log.flush()
+                    print(prefix + line, end="", flush=True)
+        
+        threading.Thread(target=pump, name=f"{self.agent_id}-output", daemon=True).start()
+        print(f"🚀 Started {self.agent['name']} (pid {self.proc.pid}, checkout {self.checkout.relative_to(REPO_ROOT)})", flush=True)
+    
+    def check(self) -> None:
+        """Handle a child that exited: finished, or crashed and due for a restart."""
+        if self.done:
+            return
+        if self.restart_at is not None:
+            if time.time() >= self.restart_at:
+                self.start()
+            return
+        code = self.proc.poll()
+        if code is None:
+            return
+        if code == 0:
+            self.done = True
+            print(f"✅ {self.agent['name']} finished", flush=True)
+            return
+        
+        self.restarts += 1
+        if time.time() - self.started < AGENT_FAST_FAILURE_SECONDS:
+            self.fast_failures += 1
+            if self.fast_failures >= AGENT_MAX_FAST_FAILURES:
+                self.done = True
+                print(f"❌ {self.agent['name']} failed {self.fast_failures} times right after starting "
+                      f"(exit {code}); giving up - see {self.workdir / 'orchestrator.log'}", flush=True)
+                return
+        else:
+            self.fast_failures = 0
+        self.crash_delay = min(max(self.crash_delay * 2, 5), AGENT_RESTART_DELAY_MAX)
+        self.restart_at = time.time() + self.crash_delay
+        print(f"💥 {self.agent['name']} exited with code {code}; restart #{self.restarts} in {self.crash_delay}s", flush=True)
+    
+    def stop(self) -> None:
+        """Ask the child and everything it started to shut down."""
+        self.done = True
+        if self.proc and self.proc.poll() is None:
+            try:
+                os.killpg(self.proc.pid, signal.SIGTERM)
+            except (ProcessLookupError, PermissionError):
+                pass
+    
+    def wait(self, timeout: float) -> None:
+        """Wait for a stopped child, killing its process group if it lingers."""
+        if not self.proc:
+            return
+        try:
+            self.proc.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            try:
+                os.killpg(self.proc.pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                pass
+            self.proc.wait()
+
+
+def run_team(agent_ids: list, task: str = "", max_claude_runs: int = TEAM_MAX_CLAUDE_RUNS,
+             extra_args: list = None) -> None:
+    """
+    Run several agents on this host as managed child processes.
+    
+    Each agent gets its own orchestrator process with its own lock, a
+    working directory under .agents/ (logs, run logs and monitor state), its
+    own git clone to work in (see prepare_agent_checkout) and a settings
+    overlay passed via AGENT_SETTINGS_PATH. All of them share one cap on
+    concurrent Claude runs (CLAUDE_MAX_CONCURRENT). Crashed agents are
+    restarted with an increasing delay; the supervisor exits once every
+    agent has finished or been given up on.
+    
+    Args:
+        agent_ids: Agents to run
+        task: Optional task passed to every agent
+        max_claude_runs: Claude runs allowed at once across the team (0 = no cap)
+        extra_args: Additional orchestrator arguments for every agent (e.g. --once)
+    """
+    base_config = load_config()
+    if not base_config:
+        print(f"⚠️  No settings in {CONFIG_PATH}; agent overlays will only set default_agent", flush=True)
+    
+    child_args = (["--task", task] if task else []) + list(extra_args or [])
+    agents = []
+    for agent_id in agent_ids:
+        overlay = write_agent_overlay(agent_id, base_config)
+        try:
+            checkout = prepare_agent_checkout(agent_id)
+        except (RuntimeError, OSError, subprocess.SubprocessError) as e:
+            print(f"❌ {e}", flush=True)
+            sys.exit(1)
+        workdir = TEAM_DIR / agent_id
+        # Runtime files stay out of the clone so they never show up as the agent's changes
+        env = {
+            **os.environ,
+            "AGENT_SETTINGS_PATH": str(overlay),
+            "MONITOR_STATE_DIR": str(workdir),
+            "CLAUDE_RUNS_LOG": str(workdir / "claude_runs.jsonl"),
+            "SLACK_OUTBOX_FILE": str(workdir / "slack_outbox.jsonl"),
+            "ORCHESTRATOR_LOCK_DIR": str(LOCK_DIR),
+            "CLAUDE_MAX_CONCURRENT": str(max_claude_runs),
+            "CLAUDE_SLOTS_DIR": str(TEAM_DIR / "claude_slots"),
+            "CHANNEL_CACHE_FILE": str(TEAM_DIR / "channel_messages.json"),
+            "PYTHONUNBUFFERED": "1",
+        }
+        agents.append(AgentProcess(agent_id, child_args, env, checkout))
+    
+    names = ", ".join(f"{a.agent['emoji']} {a.agent['name']}" for a in agents)
+    cap = f"{max_claude_runs} at a time" if max_claude_runs > 0 else "no cap"
+    print(f"\n👥 Team supervisor (pid {os.getpid()}): {names}")
+    print(f"   Claude runs: {cap} across all agents")
+    print(f"   Working directories: {TEAM_DIR.relative_to(REPO_ROOT)}/<agent>/ (clone in <agent>/repo/)")
+    print(f"   Press Ctrl+C to stop\n", flush=True)
+    
+    stopping = False
+    
+    def request_stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+    
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+    
+    started = time.time()
+    for agent in agents:
+        agent.start()
+    
+    while not stopping and not all(a.done for a in agents):
+        for agent in agents:
+            agent.check()
+        time.sleep(1)
+    
+    if stopping:
+        print("\n👋 Stopping agents...", flush=True)
+        for agent in agents:
+            agent.stop()
+    for agent in agents:
+        agent.wait(timeout=30)
+    
+    restarts = sum(a.restarts for a in agents)
+    print(f"\n📊 Team supervisor stopped after {(time.time() - started) / 60:.0f} minutes with {restarts} restart(s)", flush=True)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='Agent Team Orchestrator',
@@ -490,15 +1402,29 @@ Examples:
   python orchestrator.py --task "Do X"      Run with specific task
   python orchestrator.py --list             List all agents
   python orchestrator.py --test             Run capability tests
+  python orchestrator.py --agents all       Run every agent on this host
+  python orchestrator.py --agents nova,bolt --max-claude 1
 
 Configuration:
   Agent identity is read from ~/.agent_settings.json
   Set with: python slack_interface.py config --set-agent nova
+  With --agents, each agent gets .agents/<agent>/agent_settings.json, built
+  from it plus the optional "agent_overrides": {"<agent>": {...}} entry,
+  and works in its own clone, .agents/<agent>/repo/
         """
     )
     parser.add_argument("--task", "-t", default="", help="Specific task for the agent")
     parser.add_argument("--list", "-l", action="store_true", help="List all available agents")
     parser.add_argument("--test", action="store_true", help="Run capability tests")
+    parser.add_argument("--once", action="store_true", help="Run a single work cycle instead of the work loop")
+    parser.add_argument("--cycle-interval", type=float, default=WORK_CYCLE_INTERVAL / 60,
+                        help=f"Minutes between work cycles that made changes (default: {WORK_CYCLE_INTERVAL // 60}); "
+                             f"idle cycles back off up to {WORK_CYCLE_MAX_INTERVAL // 60}")
+    parser.add_argument("--no-preflight", action="store_true",
+                        help="Start work cycles without checking Slack, GitHub and Claude access first")
+    parser.add_argument("--agents", help='Run several agents as child processes ("all" or comma-separated IDs)')
+    parser.add_argument("--max-claude", type=int, default=TEAM_MAX_CLAUDE_RUNS,
+                        help=f"With --agents: Claude runs allowed at once across all agents (default: {TEAM_MAX_CLAUDE_RUNS}, 0 = no cap)")
     
     args = parser.parse_args()
     
@@ -522,29 +1448,33 @@ Configuration:
         print()
         return
     
-    # Check for existing instance BEFORE doing anything else
-    check_single_instance()
+    if args.agents:
+        from monitor import parse_agents_arg
+        loop_args = ["--once"] if args.once else ["--cycle-interval", str(args.cycle_interval)]
+        loop_args += ["--no-preflight"] if args.no_preflight else []
+        run_team(parse_agents_arg(args.agents), args.task, args.max_claude, loop_args)
+        return
+    
+    # Get agent from config (will exit if not configured)
+    agent = get_agent_from_config()
+    agent_id = agent['name'].lower()
+    
+    # Check for an existing instance for this agent BEFORE doing anything else
+    check_single_instance(agent_id)
     
-    # Register cleanup handler to remove lock file on exit
+    # Register cleanup handler to release the lock on exit
     import atexit
-    import signal
     
-    atexit.register(remove_lock_file)
+    atexit.register(remove_lock_file, agent_id)
     
-    # Also handle SIGTERM and SIGINT to clean up lock file
+    # Also handle SIGTERM and SIGINT to release the lock
     def signal_handler(signum, frame):
-        remove_lock_file()
+        remove_lock_file(agent_id)
         sys.exit(0)
     
     signal.signal(signal.SIGTERM, signal_handler)
     signal.signal(signal.SIGINT, signal_handler)
     
-    # Get agent from config (will exit if not configured)
-    agent = get_agent_from_config()
-    
-    # Update lock file with agent name
-    update_lock_file(agent['name'])
-    
     # Show which agent we're running
     config = load_config()
     print(f"\n🔧 Config: {CONFIG_PATH}")
@@ -561,10 +1491,18 @@ Configuration:
         
         work_task = "Check Slack, sync with team, do your work, update your memory file."
         
+        def run_work():
+            """Run the work loop, or a single cycle with --once."""
+            if args.once:
+                run_agent(agent, work_task)
+            else:
+                WorkScheduler(agent, work_task, interval=args.cycle_interval * 60,
+                              preflight_checks=not args.no_preflight).run()
+        
         def run_monitor():
-            """Run monitor.py in a subprocess."""
+            """Run monitor.py under its supervisor so it restarts instead of exiting."""
             subprocess.run(
-                ["python", "monitor.py"],
+                ["python", "monitor.py", "--supervise"],
                 cwd=str(REPO_ROOT),
             )
         
@@ -573,16 +1511,16 @@ Configuration:
         
         if is_nova:
             print(f"\n🚀 Starting two parallel processes...")
-            print(f"   Process 1: Work mode (Claude agent)")
-            print(f"   Process 2: Monitor mode (Slack watcher)")
+            print(f"   Process 1: Work mode (Claude agent{', single cycle' if args.once else ', looping'})")
+            print(f"   Process 2: Monitor mode (Slack watcher, supervised)")
             print(f"   Press Ctrl+C to stop\n")
         else:
             print(f"\n🚀 Starting work process...")
-            print(f"   Process 1: Work mode (Claude agent)")
+            print(f"   Process 1: Work mode (Claude agent{', single cycle' if args.once else ', looping'})")
             print(f"   ℹ️  Monitor mode is only enabled for Nova (PM)")
             print(f"   Press Ctrl+C to stop\n")
         
-        p1 = multiprocessing.Process(target=run_agent, args=(agent, work_task))
+        p1 = multiprocessing.Process(target=run_work)
         
         processes = [p1]
         
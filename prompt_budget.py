@@ -0,0 +1,221 @@
+"""
+Prompt Budget
+
+Token estimates, budget enforcement and a per-section ledger for the prompts
+the orchestrator and monitor send to Claude.
+
+A prompt is measured as named sections (identity, prd, memory, task,
+messages, ...). Sections that may be shortened are trimmed, in a given
+order, until the prompt fits its budget; a prompt whose fixed sections alone
+exceed the budget is refused. The resulting PromptLedger is printed with
+each run and saved to the Claude runs log (see claude_runner.record_run),
+so the log shows which sections drive prompt size, cost and latency.
+
+Usage:
+    from prompt_budget import fit_sections, PromptBudgetError
+
+    sections, ledger = fit_sections({"identity": 420}, {"memory": memory, "task": task},
+                                    budget=30000, trim_order=["memory"])
+    print(ledger.describe())                 # identity 0.4k, memory 2.1k, task 0.1k = 2.6k/30.0k tokens
+
+    python prompt_budget.py                  # Section sizes vs. run duration, from the runs log
+    python prompt_budget.py --kind work      # Only work cycles
+"""
+
+import argparse
+import json
+import statistics
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+CHARS_PER_TOKEN = 4  # Rough estimate for English text and markdown
+MIN_SECTION_TOKENS = 200  # Trimmed sections keep at least this much
+TRIM_NOTE = "\n\n[... {tokens} tokens trimmed to fit the prompt budget{hint}]"
+
+
+class PromptBudgetError(Exception):
+    """A prompt cannot fit its budget even with every trimmable section trimmed."""
+
+    def __init__(self, ledger: "PromptLedger"):
+        self.ledger = ledger
+        super().__init__(f"prompt needs {ledger.total} tokens, budget is {ledger.budget} ({ledger.describe()})")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate for prompt text (~4 characters per token)."""
+    return len(text or "") // CHARS_PER_TOKEN + 1
+
+
+@dataclass
+class PromptLedger:
+    """Estimated tokens per prompt section, and what trimming removed."""
+    sections: Dict[str, int]
+    budget: int
+    trimmed: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def total(self) -> int:
+        return sum(self.sections.values())
+
+    def describe(self) -> str:
+        parts = ", ".join(f"{name} {tokens / 1000:.1f}k" for name, tokens in self.sections.items())
+        text = f"{parts} = {self.total / 1000:.1f}k/{self.budget / 1000:.1f}k tokens"
+        if self.trimmed:
+            text += " (trimmed " + ", ".join(f"{name} -{tokens / 1000:.1f}k" for name, tokens in self.trimmed.items()) + ")"
+        return text
+
+    def to_record(self) -> Dict:
+        """Fields for record_run."""
+        return {
+            "prompt_tokens": self.total,
+            "prompt_budget": self.budget,
+            "prompt_sections": dict(self.sections),
+            "prompt_trimmed": dict(self.trimmed),
+        }
+
+
+def trim_text(text: str, max_tokens: int, hint: str = "") -> str:
+    """
+    Cut text to about max_tokens, keeping the start and noting what was cut.
+
+    Args:
+        text: Text to trim
+        max_tokens: Token budget for the result, note included
+        hint: Appended to the note, e.g. "; full text in memory/bolt_memory.md"
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    note_tokens = estimate_tokens(TRIM_NOTE.format(tokens=0, hint=hint)) + 2
+    keep_chars = max(0, (max_tokens - note_tokens) * CHARS_PER_TOKEN)
+    cut = text[:keep_chars]
+    # End on a line boundary when there is one reasonably close
+    newline = cut.rfind("\n")
+    if newline > keep_chars * 0.8:
+        cut = cut[:newline]
+    removed = estimate_tokens(text) - estimate_tokens(cut)
+    return cut + TRIM_NOTE.format(tokens=removed, hint=hint)
+
+
+def fit_sections(fixed: Dict[str, int], sections: Dict[str, str], budget: int,
+                 trim_order: Sequence[str] = (), hints: Optional[Dict[str, str]] = None) -> Tuple[Dict[str, str], PromptLedger]:
+    """
+    Trim prompt sections until the whole prompt fits the budget.
+
+    Args:
+        fixed: Tokens of the parts that are never trimmed (e.g. the template
+            around the sections), keyed by section name
+        sections: Section texts, keyed by section name
+        budget: Token budget for the whole prompt (0 = no limit)
+        trim_order: Sections that may be trimmed, most expendable first
+        hints: Per-section text added to the trim note (where to find the full text)
+
+    Returns:
+        Tuple of (sections, possibly trimmed; ledger)
+
+    Raises:
+        PromptBudgetError: If the prompt is over budget with every trimmable
+            section cut to MIN_SECTION_TOKENS
+    """
+    hints = hints or {}
+    sections = dict(sections)
+    tokens = {**fixed, **{name: estimate_tokens(text) for name, text in sections.items()}}
+    trimmed = {}
+    for name in trim_order:
+        over = sum(tokens.values()) - budget
+        if budget <= 0 or over <= 0:
+            break
+        if name not in sections or tokens[name] <= MIN_SECTION_TOKENS:
+            continue
+        target = max(MIN_SECTION_TOKENS, tokens[name] - over)
+        sections[name] = trim_text(sections[name], target, hints.get(name, ""))
+        new_tokens = estimate_tokens(sections[name])
+        trimmed[name] = tokens[name] - new_tokens
+        tokens[name] = new_tokens
+
+    ledger = PromptLedger(tokens, budget, trimmed)
+    if budget > 0 and ledger.total > budget:
+        raise PromptBudgetError(ledger)
+    return sections, ledger
+
+
+def load_ledger(log_path: Path, kind: Optional[str] = None) -> List[Dict]:
+    """Runs from the runs log (and its rotated predecessor, <log>.1) that carry a prompt ledger."""
+    runs = []
+    for path in (log_path.with_name(f"{log_path.name}.1"), log_path):
+        try:
+            with open(path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if entry.get("prompt_sections") and (kind is None or entry.get("kind") == kind):
+                        runs.append(entry)
+        except OSError:
+            pass
+    return runs
+
+
+def _correlation(xs: List[float], ys: List[float]) -> Optional[float]:
+    if len(xs) < 3 or len(set(xs)) < 2 or len(set(ys)) < 2:
+        return None
+    return statistics.correlation(xs, ys)
+
+
+def summarize_ledger(runs: List[Dict]) -> List[Dict]:
+    """
+    Per-section averages over runs of one kind.
+
+    Returns:
+        One dict per section with its average tokens, share of the prompt,
+        how often it was trimmed and the correlation of its size with run
+        duration (None when there is too little variation to tell)
+    """
+    names = list(dict.fromkeys(name for run in runs for name in run["prompt_sections"]))
+    total = sum(run.get("prompt_tokens", 0) for run in runs) or 1
+    durations = [run.get("duration", 0.0) for run in runs]
+    rows = []
+    for name in names:
+        sizes = [run["prompt_sections"].get(name, 0) for run in runs]
+        rows.append({
+            "section": name,
+            "avg_tokens": sum(sizes) / len(runs),
+            "share": sum(sizes) / total,
+            "trimmed_runs": sum(1 for run in runs if name in (run.get("prompt_trimmed") or {})),
+            "duration_corr": _correlation(sizes, durations),
+        })
+    return sorted(rows, key=lambda row: row["avg_tokens"], reverse=True)
+
+
+def main():
+    from claude_runner import RUNS_LOG_FILE
+
+    parser = argparse.ArgumentParser(description="Show which prompt sections drive prompt size and run time")
+    parser.add_argument("--log", type=Path, default=RUNS_LOG_FILE, help=f"Runs log (default: {RUNS_LOG_FILE})")
+    parser.add_argument("--kind", help='Only runs of this kind ("work" or "monitor")')
+    args = parser.parse_args()
+
+    runs = load_ledger(args.log, args.kind)
+    if not runs:
+        print(f"❌ No runs with a prompt ledger in {args.log}", file=sys.stderr)
+        sys.exit(1)
+
+    for kind in sorted({run["kind"] for run in runs}):
+        kind_runs = [run for run in runs if run["kind"] == kind]
+        avg_total = sum(run.get("prompt_tokens", 0) for run in kind_runs) / len(kind_runs)
+        avg_duration = sum(run.get("duration", 0.0) for run in kind_runs) / len(kind_runs)
+        refused = sum(1 for run in kind_runs if run.get("refused"))
+        print(f"\n📊 {kind}: {len(kind_runs)} run(s), avg prompt {avg_total / 1000:.1f}k tokens, "
+              f"avg duration {avg_duration:.0f}s{f', {refused} refused' if refused else ''}")
+        print(f"   {'section':<12} {'avg tokens':>10} {'share':>6} {'trimmed':>8} {'corr(duration)':>15}")
+        for row in summarize_ledger(kind_runs):
+            corr = f"{row['duration_corr']:+.2f}" if row["duration_corr"] is not None else "-"
+            print(f"   {row['section']:<12} {row['avg_tokens']:>10.0f} {row['share']:>6.0%} "
+                  f"{row['trimmed_runs']:>8} {corr:>15}")
+    print()
+
+
+if __name__ == "__main__":
+    main()
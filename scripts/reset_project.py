@@ -33,6 +33,7 @@ PROJECT_ROOT = SCRIPT_DIR.parent
 PROTECTED_DIRS = {
     '.git',
     'scripts',
+    'benchmarks',
     'agent-docs',
     'avatars',
     'memory',
@@ -47,6 +48,12 @@ PROTECTED_FILES = {
     'claude-wrapper.sh',
     'orchestrator.py',
     'monitor.py',
+    'claude_runner.py',
+    'metrics.py',
+    'task_graph.py',
+    'memory_compactor.py',
+    'prompt_budget.py',
+    'doc_excerpts.py',
     'slack_interface.py',
     'agents_config.py',
     'requirements.txt',
@@ -245,6 +252,13 @@ def reset_memory_files(dry_run=False):
             filepath.write_text(template)
         reset_count += 1
     
+    # Sessions archived by memory_compactor.py belong to the old project too
+    archive_dir = memory_dir / 'archive'
+    if archive_dir.exists():
+        print_action("Deleting", "memory/archive/", dry_run)
+        if not dry_run:
+            shutil.rmtree(archive_dir, ignore_errors=True)
+    
     return reset_count
 
 def delete_github_issues(dry_run=False):
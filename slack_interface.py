@@ -10,6 +10,9 @@ Token Sources (in priority order):
     2. /dev/shm/mcp-token - Auto-populated when you click 'Connect' in chat
     3. Environment variables: SLACK_TOKEN, SLACK_BOT_TOKEN
 
+Set SLACK_API_BASE_URL to send API calls somewhere other than
+https://slack.com/api (e.g. benchmarks/fake_slack.py).
+
 Token Types:
     - User Token (xoxp-*): Full user permissions, can access all user's channels
     - Bot Token (xoxb-*): Bot permissions, limited to channels bot is invited to
@@ -241,8 +244,14 @@ def get_agent_avatar(agent_name: str) -> Optional[Dict[str, str]]:
 # - default_channel_id: Channel ID (e.g., "C0AAAAMBR1R") - preferred for API calls
 # - default_agent: Default agent for 'say' command
 # - workspace: Workspace name (informational)
+#
+# AGENT_SETTINGS_PATH points at a different file, e.g. the per-agent overlays
+# written by `orchestrator.py --agents`.
 
-DEFAULT_CONFIG_PATH = os.path.expanduser("~/.agent_settings.json")
+DEFAULT_CONFIG_PATH = os.environ.get("AGENT_SETTINGS_PATH") or os.path.expanduser("~/.agent_settings.json")
+
+# Slack Web API root; point it at a local fake server for offline benchmarks
+SLACK_API_BASE_URL = os.environ.get("SLACK_API_BASE_URL", "https://slack.com/api").rstrip("/")
 
 
 @dataclass
@@ -330,6 +339,55 @@ class SlackConfig:
         return self.default_channel_id or self.default_channel
 
 
+# ============================================================================
+# Outbox Log
+# ============================================================================
+# Every message posted with the 'say' command is recorded as one JSON line in
+# a local outbox log. The monitor passes a request ID with each reply it asks
+# for and reconciles the log afterwards to see exactly which messages were
+# answered. Once the log passes OUTBOX_MAX_BYTES it is rotated to
+# <log>.1 (replacing the previous one), which the monitor follows.
+
+DEFAULT_OUTBOX_PATH = os.environ.get(
+    "SLACK_OUTBOX_FILE",
+    str(Path(__file__).parent / ".slack_outbox.jsonl")
+)
+OUTBOX_MAX_BYTES = 1024 * 1024  # ~7000 posts
+
+
+def record_outbox(result: Dict, agent: Optional[str] = None,
+                  request_id: Optional[str] = None,
+                  thread_ts: Optional[str] = None,
+                  filepath: str = DEFAULT_OUTBOX_PATH) -> None:
+    """
+    Append a delivery record for a posted message to the outbox log.
+    
+    Args:
+        result: chat.postMessage response (must be ok)
+        agent: Agent the message was sent as
+        request_id: Caller-supplied ID linking the post to a request
+        thread_ts: Thread the message was posted to (None for main channel)
+        filepath: Path to the outbox log (default: .slack_outbox.jsonl in repo)
+    """
+    record = {
+        "request_id": request_id,
+        "agent": agent,
+        "channel": result.get("channel"),
+        "thread_ts": thread_ts,
+        "ts": result.get("ts"),
+        "time": time.time(),
+    }
+    try:
+        # Single append of one line, so concurrent writers don't interleave
+        with open(filepath, 'a') as f:
+            f.write(json.dumps(record) + "\n")
+            size = f.tell()
+        if size > OUTBOX_MAX_BYTES:
+            os.replace(filepath, f"{filepath}.1")
+    except OSError as e:
+        print(f"⚠️ Warning: Could not write outbox log: {e}", file=sys.stderr)
+
+
 # ============================================================================
 # Token Management
 # ============================================================================
@@ -464,7 +522,7 @@ def get_slack_tokens(filepath: str = '/dev/shm/mcp-token',
                         test_token = tokens.bot_token or tokens.access_token
                         import requests
                         response = requests.post(
-                            "https://slack.com/api/auth.test",
+                            f"{SLACK_API_BASE_URL}/auth.test",
                             headers={"Authorization": f"Bearer {test_token}"},
                             timeout=10
                         ).json()
@@ -507,6 +565,7 @@ class SlackClient:
     
     Attributes:
         tokens: SlackTokens instance with available tokens
+        http: HTTP session used for all requests (keeps connections alive)
         
     Example:
         tokens = get_slack_tokens()
@@ -514,16 +573,20 @@ class SlackClient:
         result = client.send_message(tokens.bot_token, "#general", "Hello!")
     """
     
-    BASE_URL = "https://slack.com/api"
+    BASE_URL = SLACK_API_BASE_URL
     
-    def __init__(self, tokens: SlackTokens):
+    def __init__(self, tokens: SlackTokens, http: Optional[Any] = None):
         """
         Initialize Slack client with tokens.
         
         Args:
             tokens: SlackTokens instance containing available tokens
+            http: Object with requests-style get/post methods. Defaults to a
+                requests.Session so consecutive calls reuse one HTTPS
+                connection; pass the requests module for one connection per call.
         """
         self.tokens = tokens
+        self.http = http if http is not None else requests.Session()
         self._scopes_cache: Dict[str, List[str]] = {}
     
     def _get_headers(self, token: str) -> Dict[str, str]:
@@ -631,9 +694,9 @@ class SlackClient:
         for attempt in range(max_retries + 1):
             try:
                 if params:
-                    response = requests.post(url, headers=headers, json=params, timeout=30)
+                    response = self.http.post(url, headers=headers, json=params, timeout=30)
                 else:
-                    response = requests.get(url, headers=headers, timeout=30)
+                    response = self.http.get(url, headers=headers, timeout=30)
                 
                 # Check for HTTP 429 rate limiting
                 if response.status_code == 429:
@@ -695,7 +758,7 @@ class SlackClient:
             return {"ok": False, "error": f"Failed after {max_retries} retries: {str(last_exception)}"}
         return {"ok": False, "error": f"Failed after {max_retries} retries"}
     
-    def test_auth(self, token: str) -> Dict:
+    def test_auth(self, token: str, max_retries: int = 5) -> Dict:
         """
         Test authentication and get token info.
         
@@ -704,11 +767,12 @@ class SlackClient:
         
         Args:
             token: Token to test
+            max_retries: Retry attempts on rate limits and errors (lower for quick checks)
             
         Returns:
             Dict with 'ok', 'user', 'team', 'url' on success
         """
-        return self._api_call("auth.test", token)
+        return self._api_call("auth.test", token, max_retries=max_retries)
     
     def get_scopes(self, token: str) -> List[str]:
         """
@@ -730,7 +794,7 @@ class SlackClient:
         headers = self._get_headers(token)
         
         try:
-            response = requests.get(url, headers=headers, timeout=30)
+            response = self.http.get(url, headers=headers, timeout=30)
             scopes_header = response.headers.get('x-oauth-scopes', '')
             scopes = [s.strip() for s in scopes_header.split(',') if s.strip()]
             self._scopes_cache[token] = scopes
@@ -875,7 +939,7 @@ class SlackClient:
         }
         
         try:
-            response = requests.get(url, headers=headers, params=params, timeout=30)
+            response = self.http.get(url, headers=headers, params=params, timeout=30)
             result = response.json()
         except requests.RequestException as e:
             print(f"❌ Error: {e}", file=sys.stderr)
@@ -1008,7 +1072,7 @@ class SlackClient:
                 for attempt in range(max_retries + 1):
                     try:
                         files = {'file': (path.name, open(path, 'rb'))}
-                        response = requests.post(url, headers=headers, data=data, files=files, timeout=60)
+                        response = self.http.post(url, headers=headers, data=data, files=files, timeout=60)
                         files['file'][1].close()
                         
                         if response.status_code == 429:
@@ -1050,7 +1114,7 @@ class SlackClient:
                 data['content'] = content
                 for attempt in range(max_retries + 1):
                     try:
-                        response = requests.post(url, headers=headers, data=data, timeout=60)
+                        response = self.http.post(url, headers=headers, data=data, timeout=60)
                         
                         if response.status_code == 429:
                             if attempt < max_retries:
@@ -1143,9 +1207,9 @@ class SlackClient:
             for attempt in range(max_retries + 1):
                 try:
                     if method == 'post':
-                        response = requests.post(url, **kwargs)
+                        response = self.http.post(url, **kwargs)
                     else:
-                        response = requests.get(url, **kwargs)
+                        response = self.http.get(url, **kwargs)
                     
                     # Check for rate limiting
                     if response.status_code == 429:
@@ -1274,7 +1338,7 @@ class SlackClient:
         except Exception as e:
             return {"ok": False, "error": f"Upload failed: {str(e)}"}
     
-    def get_channel_info(self, token: str, channel: str) -> Dict:
+    def get_channel_info(self, token: str, channel: str, max_retries: int = 5) -> Dict:
         """
         Get information about a channel.
         
@@ -1284,12 +1348,13 @@ class SlackClient:
         Args:
             token: Authentication token
             channel: Channel ID
+            max_retries: Retry attempts on rate limits and errors (lower for quick checks)
             
         Returns:
             API response with 'ok', 'channel' object on success
         """
         params = {"channel": channel}
-        return self._api_call("conversations.info", token, params)
+        return self._api_call("conversations.info", token, params, max_retries=max_retries)
     
     def join_channel(self, token: str, channel: str) -> Dict:
         """
@@ -1433,8 +1498,9 @@ def cmd_say(client: SlackClient, tokens: SlackTokens, args) -> None:
     """Send a message to the default channel as the configured agent."""
     config = SlackConfig.load(args.config_file)
     
-    # Use agent from config (REQUIRED - must be set first)
-    agent = config.default_agent.lower() if config.default_agent else None
+    # Use agent from -a/--agent, else from config (REQUIRED - must be set first)
+    agent = getattr(args, 'agent', None) or config.default_agent
+    agent = agent.lower() if agent else None
     
     if not agent:
         print("❌ No default agent configured", file=sys.stderr)
@@ -1486,9 +1552,13 @@ def cmd_say(client: SlackClient, tokens: SlackTokens, args) -> None:
                                   username=username, icon_emoji=icon_emoji, icon_url=icon_url)
     
     if result.get("ok"):
+        request_id = getattr(args, 'request_id', None) or os.environ.get("SLACK_REQUEST_ID")
+        record_outbox(result, agent=agent, request_id=request_id, thread_ts=thread)
         print(f"✅ Message sent successfully!")
         print(f"   Channel: {result.get('channel')}")
         print(f"   Timestamp: {result.get('ts')}")
+        if request_id:
+            print(f"   Request: {request_id}")
     else:
         print(f"❌ Failed to send: {result.get('error', 'Unknown error')}")
         sys.exit(1)
@@ -2033,6 +2103,8 @@ For more info: https://github.com/NinjaTech-AI/agent-team-logo-creator
     say_parser = subparsers.add_parser('say', help='Send message as configured agent')
     say_parser.add_argument('message', help='Message text')
     say_parser.add_argument('-t', '--thread', help='Thread timestamp for reply')
+    say_parser.add_argument('-a', '--agent', help='Send as this agent instead of the configured default')
+    say_parser.add_argument('--request-id', help='ID recorded in the outbox log to link this post to a request')
     
     # Read command (read messages from default channel)
     read_parser = subparsers.add_parser('read', help='Read messages from default channel')
@@ -2547,6 +2619,35 @@ class SlackInterface:
         if not self.is_connected:
             return []
         return self.client.get_scopes(self._token)
+    
+    def test_auth(self, max_retries: int = 5) -> Dict:
+        """
+        Check that the current token is valid (auth.test).
+        
+        Returns:
+            API response with 'ok', 'user', 'team' on success
+        """
+        if not self.is_connected:
+            return {"ok": False, "error": "not_connected"}
+        return self.client.test_auth(self._token, max_retries=max_retries)
+    
+    def get_channel_info(self, channel: Optional[str] = None, max_retries: int = 5) -> Dict:
+        """
+        Get information about a channel (default: the configured channel).
+        
+        Args:
+            channel: Channel name (#general) or ID
+            max_retries: Retry attempts on rate limits and errors
+        
+        Returns:
+            API response with 'ok', 'channel' object on success
+        """
+        channel = channel or self.default_channel
+        if not self.is_connected:
+            return {"ok": False, "error": "not_connected"}
+        if not channel:
+            return {"ok": False, "error": "no_channel_configured"}
+        return self.client.get_channel_info(self._token, self._resolve_channel_id(channel), max_retries=max_retries)
 
 
 # Convenience function for quick messaging
@@ -0,0 +1,296 @@
+"""
+Task Graph
+
+Dependency graph of the team's work, built from open GitHub issues, their
+labels and whether the PRD exists. The orchestrator uses it to start an
+agent's work cycle only when the agent has a task whose inputs are ready,
+instead of waking the agent up to discover there is nothing to do.
+
+Nodes:
+    prd        Nova's PRD; done once agent-docs/PRD.md exists locally or on
+               the remote (agents only pull inside a work cycle, so a fetch
+               is what tells a waiting agent that Nova has pushed it)
+    #<n>       An open issue. Owned by the agent it is assigned to (by agent
+               name or configured GitHub login), else by the agent whose
+               label it carries (agents_config "labels"), else by the
+               "## Assignee @agent" line Nova puts in issue bodies
+
+Edges:
+    Every issue depends on the PRD, and on any issue its body names with
+    "depends on #n", "blocked by #n" or "after #n" while that issue is open.
+    Issues labeled "blocked" are held until the label is removed.
+
+Usage:
+    from task_graph import TaskGraph
+
+    graph = TaskGraph.load()        # None if GitHub issues can't be listed (cached for ISSUE_CACHE_TTL)
+    graph.ready_tasks("bolt")       # Tasks Bolt can start now
+    graph.waiting_on("bolt")        # What Bolt's other tasks are waiting for
+
+    python task_graph.py            # Print the graph for every agent
+"""
+
+import json
+import re
+import shutil
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from agents_config import AGENTS
+
+REPO_ROOT = Path(__file__).parent
+PRD_PATH = REPO_ROOT / "agent-docs" / "PRD.md"
+PRD_OWNER = "nova"  # Writes the PRD and creates issues; never gated
+BLOCKED_LABEL = "blocked"
+ISSUE_LIMIT = 200  # Open issues fetched per load
+ISSUE_CACHE_TTL = 5 * 60  # Seconds a fetched issue list (and a negative PRD check) is reused
+
+DEPENDENCY_PATTERN = re.compile(r"(?:depends\s+on|blocked\s+by|after)\s*:?\s*(#\d+(?:\s*(?:,|and|&)\s*#\d+)*)", re.IGNORECASE)
+BODY_ASSIGNEE_PATTERN = re.compile(r"^#+\s*Assignee\s*\n+\s*@(\w+)", re.IGNORECASE | re.MULTILINE)
+
+
+@dataclass
+class Task:
+    """A node in the task graph."""
+    id: str
+    title: str
+    agent: Optional[str] = None
+    labels: List[str] = field(default_factory=list)
+    depends_on: List[str] = field(default_factory=list)
+    done: bool = False
+
+
+def fetch_open_issues(limit: int = ISSUE_LIMIT) -> Optional[List[Dict]]:
+    """
+    List open issues with their labels, assignees and bodies.
+
+    Returns:
+        Issue dicts from `gh issue list --json`, or None if gh is unavailable or fails
+    """
+    if not shutil.which("gh"):
+        return None
+    try:
+        result = subprocess.run(
+            ["gh", "issue", "list", "--state", "open", "--limit", str(limit),
+             "--json", "number,title,labels,assignees,body"],
+            cwd=str(REPO_ROOT), capture_output=True, text=True, timeout=30
+        )
+        if result.returncode != 0:
+            return None
+        return json.loads(result.stdout or "[]")
+    except (OSError, subprocess.SubprocessError, json.JSONDecodeError):
+        return None
+
+
+_ISSUE_CACHE: Dict[int, tuple] = {}  # limit -> (fetched, issues)
+_PRD_CACHE: Dict[Path, tuple] = {}  # path -> (checked, exists)
+
+
+def fetch_open_issues_cached(limit: int = ISSUE_LIMIT, max_age: float = ISSUE_CACHE_TTL) -> Optional[List[Dict]]:
+    """fetch_open_issues, reusing a result younger than max_age (failures are not cached)."""
+    cached = _ISSUE_CACHE.get(limit)
+    if cached and time.time() - cached[0] < max_age:
+        return cached[1]
+    issues = fetch_open_issues(limit)
+    if issues is not None:
+        _ISSUE_CACHE[limit] = (time.time(), issues)
+    return issues
+
+
+def prd_on_remote(prd_path: Path = PRD_PATH) -> Optional[bool]:
+    """
+    Whether the PRD has been pushed: fetch origin and look for the file there.
+
+    Returns:
+        True or False, or None if there is no remote to check (or git fails)
+    """
+    try:
+        rel_path = prd_path.resolve().relative_to(REPO_ROOT.resolve()).as_posix()
+        fetch = subprocess.run(["git", "fetch", "--quiet", "origin"],
+                               cwd=str(REPO_ROOT), capture_output=True, text=True, timeout=60)
+        if fetch.returncode != 0:
+            return None
+        for ref in ("origin/HEAD", "@{upstream}"):
+            if subprocess.run(["git", "rev-parse", "--verify", "--quiet", ref],
+                              cwd=str(REPO_ROOT), capture_output=True, timeout=30).returncode != 0:
+                continue
+            found = subprocess.run(["git", "cat-file", "-e", f"{ref}:{rel_path}"],
+                                   cwd=str(REPO_ROOT), capture_output=True, timeout=30)
+            return found.returncode == 0
+    except (OSError, ValueError, subprocess.SubprocessError):
+        pass
+    return None
+
+
+def prd_exists(prd_path: Path = PRD_PATH, max_age: float = ISSUE_CACHE_TTL) -> bool:
+    """
+    Whether the PRD is written, in this checkout or on the remote.
+
+    A PRD found is remembered for good; a missing one is checked on the
+    remote again once max_age has passed.
+    """
+    if prd_path.exists():
+        return True
+    cached = _PRD_CACHE.get(prd_path)
+    if cached and (cached[1] or time.time() - cached[0] < max_age):
+        return cached[1]
+    exists = bool(prd_on_remote(prd_path))
+    _PRD_CACHE[prd_path] = (time.time(), exists)
+    return exists
+
+
+def find_issue_owner(issue: Dict, logins: Dict[str, Set[str]]) -> Optional[str]:
+    """
+    Work out which agent an issue belongs to.
+
+    Args:
+        issue: Issue dict (number, title, labels, assignees, body)
+        logins: Dict mapping agent_id -> GitHub logins that mean that agent
+
+    Returns:
+        Agent ID, or None if the issue has no recognizable owner
+    """
+    for assignee in issue.get("assignees") or []:
+        login = (assignee.get("login") or "").lower()
+        for agent_id in AGENTS:
+            if login == agent_id or login in logins.get(agent_id, set()):
+                return agent_id
+
+    labels = {label.get("name", "").lower() for label in issue.get("labels") or []}
+    for agent_id, agent in AGENTS.items():
+        if labels & {label.lower() for label in agent.get("labels", [])}:
+            return agent_id
+
+    match = BODY_ASSIGNEE_PATTERN.search(issue.get("body") or "")
+    if match and match.group(1).lower() in AGENTS:
+        return match.group(1).lower()
+    return None
+
+
+def parse_dependencies(body: str) -> List[int]:
+    """Issue numbers named in "depends on #n" / "blocked by #n" / "after #n" phrases."""
+    numbers = []
+    for match in DEPENDENCY_PATTERN.finditer(body or ""):
+        numbers.extend(int(n) for n in re.findall(r"#(\d+)", match.group(1)))
+    return numbers
+
+
+class TaskGraph:
+    """Tasks keyed by ID ("prd", "#12"), with their owners and dependencies."""
+
+    def __init__(self, tasks: Dict[str, Task]):
+        self.tasks = tasks
+
+    @classmethod
+    def build(cls, issues: List[Dict], prd_exists: bool,
+              logins: Dict[str, Set[str]] = None) -> "TaskGraph":
+        """
+        Build the graph from open issues.
+
+        Args:
+            issues: Open issues (see fetch_open_issues)
+            prd_exists: Whether the PRD has been written
+            logins: Dict mapping agent_id -> extra GitHub logins for that agent
+
+        Returns:
+            The task graph
+        """
+        logins = {agent_id: {l.lower() for l in names} for agent_id, names in (logins or {}).items()}
+        tasks = {"prd": Task(id="prd", title="Write the PRD (agent-docs/PRD.md)", agent=PRD_OWNER, done=prd_exists)}
+        open_numbers = {issue["number"] for issue in issues}
+
+        for issue in issues:
+            number = issue["number"]
+            depends_on = ["prd"]
+            depends_on += [f"#{n}" for n in parse_dependencies(issue.get("body", ""))
+                           if n in open_numbers and n != number]
+            tasks[f"#{number}"] = Task(
+                id=f"#{number}",
+                title=issue.get("title", ""),
+                agent=find_issue_owner(issue, logins),
+                labels=[label.get("name", "") for label in issue.get("labels") or []],
+                depends_on=list(dict.fromkeys(depends_on)),
+            )
+        return cls(tasks)
+
+    @classmethod
+    def load(cls, prd_path: Path = PRD_PATH, logins: Dict[str, Set[str]] = None,
+             max_age: float = ISSUE_CACHE_TTL) -> Optional["TaskGraph"]:
+        """
+        Build the graph from the repo's GitHub issues and PRD (see prd_exists).
+
+        Args:
+            prd_path: Where the PRD lives
+            logins: Dict mapping agent_id -> extra GitHub logins for that agent
+            max_age: Seconds a previously fetched issue list is reused (0 = always fetch)
+
+        Returns:
+            The task graph, or None if issues could not be listed (gh missing or failing)
+        """
+        issues = fetch_open_issues_cached(max_age=max_age)
+        if issues is None:
+            return None
+        return cls.build(issues, prd_exists(prd_path, max_age), logins)
+
+    def blockers(self, task: Task) -> List[str]:
+        """Unfinished inputs of a task (including the "blocked" label)."""
+        waiting = [dep for dep in task.depends_on if dep in self.tasks and not self.tasks[dep].done]
+        if any(label.lower() == BLOCKED_LABEL for label in task.labels):
+            waiting.append(f"label:{BLOCKED_LABEL}")
+        return waiting
+
+    def agent_tasks(self, agent_id: str) -> List[Task]:
+        """Open tasks owned by an agent."""
+        return [task for task in self.tasks.values() if task.agent == agent_id and not task.done]
+
+    def ready_tasks(self, agent_id: str) -> List[Task]:
+        """Open tasks an agent can start now (all inputs done)."""
+        return [task for task in self.agent_tasks(agent_id) if not self.blockers(task)]
+
+    def waiting_on(self, agent_id: str) -> List[str]:
+        """Inputs an agent's blocked tasks are waiting for ("no tasks" if it has none)."""
+        tasks = self.agent_tasks(agent_id)
+        if not tasks:
+            return ["no tasks assigned"]
+        waiting = []
+        for task in tasks:
+            for blocker in self.blockers(task):
+                if blocker not in waiting:
+                    waiting.append(blocker)
+        return waiting
+
+    def ready_agents(self) -> List[str]:
+        """Agents with at least one ready task; these can run in parallel."""
+        return [agent_id for agent_id in AGENTS if self.ready_tasks(agent_id)]
+
+
+def format_tasks(tasks: List[Task]) -> str:
+    """Bullet list of tasks for prompts and logs."""
+    return "\n".join(f"- {task.id}: {task.title}" for task in tasks)
+
+
+def main():
+    graph = TaskGraph.load(max_age=0)
+    if graph is None:
+        print("❌ Could not list GitHub issues (is gh installed and authenticated?)", file=sys.stderr)
+        sys.exit(1)
+    print(f"\n📋 PRD: {'✅ written' if graph.tasks['prd'].done else '⏳ missing'} ({PRD_PATH.relative_to(REPO_ROOT)})")
+    for agent_id, agent in AGENTS.items():
+        ready = graph.ready_tasks(agent_id)
+        print(f"\n{agent['emoji']} {agent['name']}: {len(ready)} ready")
+        for task in graph.agent_tasks(agent_id):
+            blockers = graph.blockers(task)
+            status = "▶️ " if not blockers else f"⏸️  waiting on {', '.join(blockers)} -"
+            print(f"   {status} {task.id} {task.title}")
+    unowned = [task for task in graph.tasks.values() if task.agent is None]
+    if unowned:
+        print(f"\n❓ Unowned: {', '.join(task.id for task in unowned)}")
+    print()
+
+
+if __name__ == "__main__":
+    main()